@@ -0,0 +1,103 @@
+"""Compares `verify_access_token` dependency with `AccessTokenMiddleware`.
+
+Both apps have one protected route returning the claims, requests are sent
+straight to the ASGI app, so only the framework and the authentication
+overhead are measured.
+
+Run from the repository root:
+
+    python -m benchmarks.auth_middleware
+"""
+import time
+import asyncio
+
+from fastapi import Depends, FastAPI
+from loguru import logger
+
+from src.infrastructure.api.auth_middleware import AccessTokenMiddleware
+from src.infrastructure.api.dependencies import (
+    create_unit_of_work,
+    get_access_token_claims,
+    get_tokens_generator,
+    get_tokens_validator,
+    tokens_denylist,
+    verify_access_token,
+)
+
+
+ITERATIONS = 20_000
+
+
+def create_app(use_middleware: bool):
+    app = FastAPI()
+
+    @app.get("/protected")
+    async def protected(claims: dict = Depends(verify_access_token)) -> dict:
+        return claims
+
+    if use_middleware:
+        app.add_middleware(
+            AccessTokenMiddleware,
+            tokens_validator=get_tokens_validator(),
+            tokens_denylist=tokens_denylist,
+            unit_of_work_factory=create_unit_of_work,
+        )
+        app.dependency_overrides[verify_access_token] = get_access_token_claims
+
+    return app
+
+
+async def request(app, token: str) -> int:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/protected",
+        "raw_path": b"/protected",
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"bench"), (b"authorization", f"Bearer {token}".encode())],
+        "client": ("127.0.0.1", 12345),
+        "server": ("bench", 80),
+    }
+    status = 0
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await app(scope, receive, send)
+    return status
+
+
+async def measure(name: str, app, token: str):
+    status = await request(app, token)
+    started = time.perf_counter()
+    for _ in range(ITERATIONS):
+        await request(app, token)
+    us_per_request = (time.perf_counter() - started) / ITERATIONS * 1_000_000
+
+    print(f"{name:<28} {status} {us_per_request:>8.1f} us/request {1_000_000 / us_per_request:>10.0f} requests/s")
+
+
+async def main():
+    # NOTE: Debug logging of every payload would dominate the timings.
+    logger.remove()
+
+    valid_token = get_tokens_generator().generate_access_token(sub=1)
+    invalid_token = get_tokens_generator().generate_refresh_token(sub=1)
+    for use_middleware in (False, True):
+        app = create_app(use_middleware)
+        name = "middleware" if use_middleware else "dependency"
+        await measure(f"{name} (valid token)", app, valid_token)
+        await measure(f"{name} (invalid token)", app, invalid_token)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
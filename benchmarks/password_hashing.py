@@ -0,0 +1,53 @@
+"""Compares password hashing backends at equal security targets.
+
+Parameters are the OWASP Password Storage Cheat Sheet minimums, every scrypt
+row is an equivalent alternative of the others (memory is traded for CPU with `p`).
+
+Run from the repository root:
+
+    python -m benchmarks.password_hashing
+"""
+import time
+import resource
+
+from src.infrastructure.tools.password_manager import BcryptHasher, IPasswordHasher, ScryptHasher
+
+
+ITERATIONS = 5
+PASSWORD = "correct horse battery staple"
+
+HASHERS: list[tuple[str, IPasswordHasher, int]] = [
+    ("bcrypt rounds=10", BcryptHasher(rounds=10), 4 * 1024),
+    ("bcrypt rounds=12", BcryptHasher(rounds=12), 4 * 1024),
+    ("scrypt n=2^17 r=8 p=1", ScryptHasher(n=2 ** 17, r=8, p=1), 128 * 2 ** 17 * 8),
+    ("scrypt n=2^16 r=8 p=2", ScryptHasher(n=2 ** 16, r=8, p=2), 128 * 2 ** 16 * 8),
+    ("scrypt n=2^15 r=8 p=3", ScryptHasher(n=2 ** 15, r=8, p=3), 128 * 2 ** 15 * 8),
+    ("scrypt n=2^14 r=8 p=5", ScryptHasher(n=2 ** 14, r=8, p=5), 128 * 2 ** 14 * 8),
+    ("scrypt n=2^13 r=8 p=10", ScryptHasher(n=2 ** 13, r=8, p=10), 128 * 2 ** 13 * 8),
+]
+
+
+def measure(name: str, hasher: IPasswordHasher, memory_bytes: int):
+    password_hash = hasher.hash(PASSWORD)
+
+    started = time.process_time()
+    for _ in range(ITERATIONS):
+        hasher.verify(PASSWORD, password_hash)
+    cpu_ms = (time.process_time() - started) / ITERATIONS * 1000
+
+    print(
+        f"{name:<24} {cpu_ms:>8.1f} ms CPU/verify {1000 / cpu_ms:>8.1f} verify/s/core"
+        f" {memory_bytes / 1024 / 1024:>8.1f} MiB/verify"
+    )
+
+
+def main():
+    for name, hasher, memory_bytes in HASHERS:
+        measure(name, hasher, memory_bytes)
+
+    max_rss_mib = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"Max RSS: {max_rss_mib:.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+"""Soak test: drives the ASGI app at a fixed rate for a long time and looks for leaks.
+
+Every virtual user runs sessions of login, `/users/me` calls, refresh and
+logout. Every `--sample-interval` seconds the harness samples traced Python
+memory, RSS, open file descriptors, checked out pool connections and running
+tasks. At the end every metric growing (almost) monotonically is flagged and
+the top allocation sites since the first sample are printed. Exit code is 1
+when anything is flagged.
+
+The database must be migrated, SQLite databases are created on the fly.
+Run from the repository root:
+
+    python -m benchmarks.soak --dsn sqlite+aiosqlite:///soak.db --duration 3600 --rate 50
+"""
+import os
+import time
+import asyncio
+import argparse
+import tracemalloc
+from collections import Counter
+from dataclasses import dataclass, field
+
+from httpx import ASGITransport, AsyncClient
+from loguru import logger
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from settings import settings
+from src.infrastructure import database
+from src.infrastructure.api.app import app
+from src.infrastructure.database.models import Base
+
+
+SESSION_ME_REQUESTS = 20
+GROWTH_MIN_SAMPLES = 4
+GROWTH_MIN_RISING_SHARE = 0.8
+GROWTH_MIN_RATIO = 0.05
+
+
+@dataclass
+class Sample:
+    elapsed_seconds:    float
+    traced_bytes:       int
+    rss_bytes:          int
+    open_fds:           int
+    pool_checked_out:   int
+    tasks:              int
+
+
+@dataclass
+class SoakStats:
+    requests:   int = 0
+    slow:       int = 0
+    statuses:   Counter = field(default_factory=Counter)
+    samples:    list[Sample] = field(default_factory=list)
+
+
+def get_rss_bytes() -> int:
+    with open("/proc/self/statm") as statm:
+        return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+def get_open_fds() -> int:
+    return len(os.listdir("/proc/self/fd"))
+
+
+def take_sample(started: float) -> Sample:
+    traced_bytes, _ = tracemalloc.get_traced_memory()
+    return Sample(
+        elapsed_seconds=time.monotonic() - started,
+        traced_bytes=traced_bytes,
+        rss_bytes=get_rss_bytes(),
+        open_fds=get_open_fds(),
+        pool_checked_out=database.get_pool_stats().get("checked_out", 0),
+        tasks=len(asyncio.all_tasks()),
+    )
+
+
+def is_growing(values: list[float]) -> bool:
+    # NOTE: The first sample is taken before the warm up, so it's skipped.
+    values = values[1:]
+    if len(values) < GROWTH_MIN_SAMPLES or values[-1] <= values[0] * (1 + GROWTH_MIN_RATIO):
+        return False
+
+    deltas = [current - previous for previous, current in zip(values, values[1:])]
+    return sum(delta > 0 for delta in deltas) / len(deltas) >= GROWTH_MIN_RISING_SHARE
+
+
+async def run_virtual_user(
+    number:             int,
+    start_delay:        float,
+    request_interval:   float,
+    deadline:           float,
+    stats:              SoakStats,
+):
+    # NOTE: Every virtual user has its own client address, so the per-IP
+    # rate limits see the traffic of a real population of clients.
+    transport = ASGITransport(app=app, client=(f"10.0.{number // 250}.{number % 250 + 1}", 40000))
+    email, password = f"soak-{number}@example.com", "soak-password"
+    next_request_at = time.monotonic() + start_delay
+
+    async with AsyncClient(transport=transport, base_url="http://soak") as client:
+
+        async def request(method: str, url: str, **kwargs):
+            nonlocal next_request_at
+            await asyncio.sleep(max(0, next_request_at - time.monotonic()))
+            next_request_at = max(next_request_at + request_interval, time.monotonic() - request_interval)
+
+            response = await client.request(method, url, **kwargs)
+            stats.requests += 1
+            stats.statuses[f"{method} {url} {response.status_code}"] += 1
+            if time.monotonic() > next_request_at:
+                stats.slow += 1
+            return response
+
+        await request("POST", "/api/v1/auth/register", json={"email": email, "password": password})
+        while time.monotonic() < deadline:
+            login_response = await request("POST", "/api/v1/auth/login", json={"username": email, "password": password})
+            if login_response.status_code != 200:
+                continue
+
+            tokens = login_response.json()
+            for _ in range(SESSION_ME_REQUESTS):
+                await request("GET", "/api/v1/users/me", headers={"Authorization": f"Bearer {tokens['access_token']}"})
+
+            refresh_response = await request(
+                "POST",
+                "/api/v1/auth/refresh",
+                headers={"Authorization": f"Bearer {tokens['refresh_token']}"},
+            )
+            if refresh_response.status_code == 200:
+                tokens = refresh_response.json()
+            await request("POST", "/api/v1/auth/logout", headers={"Authorization": f"Bearer {tokens['access_token']}"})
+
+
+async def run_sampler(interval: float, started: float, deadline: float, stats: SoakStats):
+    while time.monotonic() < deadline:
+        await asyncio.sleep(min(interval, max(0, deadline - time.monotonic())))
+        sample = take_sample(started)
+        stats.samples.append(sample)
+        print(
+            f"{sample.elapsed_seconds:>8.0f} s {stats.requests:>9} requests"
+            f" {sample.traced_bytes / 1024 / 1024:>8.1f} MiB traced {sample.rss_bytes / 1024 / 1024:>8.1f} MiB RSS"
+            f" {sample.open_fds:>5} fds {sample.pool_checked_out:>4} checked out {sample.tasks:>5} tasks",
+            flush=True,
+        )
+
+
+def report(stats: SoakStats, baseline: tracemalloc.Snapshot, top: int) -> bool:
+    print("\nResponses:")
+    for status, count in sorted(stats.statuses.items()):
+        print(f"  {status:<40} {count:>9}")
+    print(f"  {'slower than the rate':<40} {stats.slow:>9}")
+
+    flagged = [
+        name
+        for name in ("traced_bytes", "rss_bytes", "open_fds", "pool_checked_out", "tasks")
+        if is_growing([getattr(sample, name) for sample in stats.samples])
+    ]
+    print(f"\nGrowing metrics: {', '.join(flagged) or 'none'}")
+
+    print(f"\nTop {top} allocation sites since the first sample:")
+    for statistic in tracemalloc.take_snapshot().compare_to(baseline, "lineno")[:top]:
+        print(f"  {statistic}")
+
+    return bool(flagged)
+
+
+async def soak(args: argparse.Namespace) -> bool:
+    settings.POSTGRES_DSN = args.dsn
+    if args.bcrypt_rounds is not None:
+        settings.BCRYPT_ROUNDS = args.bcrypt_rounds
+    if args.dsn.startswith("sqlite"):
+        engine = create_async_engine(args.dsn)
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+        await engine.dispose()
+
+    stats = SoakStats()
+    async with app.router.lifespan_context(app):
+        started = time.monotonic()
+        deadline = started + args.duration
+        stats.samples.append(take_sample(started))
+        baseline = tracemalloc.take_snapshot()
+
+        await asyncio.gather(
+            run_sampler(args.sample_interval, started, deadline, stats),
+            *(
+                run_virtual_user(
+                    number=number,
+                    start_delay=number / args.rate,
+                    request_interval=args.users / args.rate,
+                    deadline=deadline,
+                    stats=stats,
+                )
+                for number in range(args.users)
+            ),
+        )
+
+    return report(stats, baseline, args.top)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Soak test of the ASGI app")
+    parser.add_argument("--dsn", default=settings.POSTGRES_DSN)
+    parser.add_argument("--duration", type=float, default=3600, help="Seconds")
+    parser.add_argument("--rate", type=float, default=50, help="Requests per second")
+    parser.add_argument("--users", type=int, default=20, help="Concurrent virtual users")
+    parser.add_argument("--sample-interval", type=float, default=60, help="Seconds")
+    parser.add_argument(
+        "--bcrypt-rounds",
+        type=int,
+        help="Cheaper hashing for throwaway databases (existing users are rehashed on login)",
+    )
+    parser.add_argument("--trace-frames", type=int, default=1, help="Frames stored per traced allocation")
+    parser.add_argument("--top", type=int, default=10, help="Allocation sites to show")
+    args = parser.parse_args()
+
+    # NOTE: Per-request logging would dominate both the timings and the allocations.
+    logger.remove()
+    # NOTE: Every traced frame multiplies the tracing overhead, one frame
+    # is enough for the top allocation sites by line.
+    tracemalloc.start(args.trace_frames)
+    has_growth = asyncio.run(soak(args))
+    raise SystemExit(1 if has_growth else 0)
+
+
+if __name__ == "__main__":
+    main()
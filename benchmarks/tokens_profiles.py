@@ -0,0 +1,65 @@
+"""Compares the default and the compact tokens profiles.
+
+Reports encoded token size (bytes added to every `Authorization` header)
+and validation speed of `JWTTokensValidator` for each profile.
+
+Run from the repository root:
+
+    python -m benchmarks.tokens_profiles
+"""
+import time
+
+from loguru import logger
+
+from src.infrastructure.tools.tokens_tools import JWTTokensGenerator, JWTTokensValidator, TokensProfiles
+
+
+ITERATIONS = 20_000
+SECRET_KEY = "benchmark-secret-key"
+USER_ID = 123456
+
+GENERATORS: list[tuple[str, JWTTokensGenerator]] = [
+    (
+        name,
+        JWTTokensGenerator(
+            secret_key=SECRET_KEY,
+            access_token_exp_minutes=1,
+            refresh_token_exp_minutes=5,
+            profile=profile,
+            type_in_header=type_in_header,
+        ),
+    )
+    for name, profile, type_in_header in [
+        ("default", TokensProfiles.DEFAULT, False),
+        ("compact", TokensProfiles.COMPACT, False),
+        ("compact, typ header", TokensProfiles.COMPACT, True),
+    ]
+]
+
+
+def measure(name: str, tokens_generator: JWTTokensGenerator, tokens_validator: JWTTokensValidator):
+    token = tokens_generator.generate_access_token(sub=USER_ID)
+    header = f"Authorization: Bearer {token}"
+
+    started = time.perf_counter()
+    for _ in range(ITERATIONS):
+        tokens_validator.validate_access_token(token)
+    us_per_token = (time.perf_counter() - started) / ITERATIONS * 1_000_000
+
+    print(
+        f"{name:<20} {len(token):>5} B token {len(header):>5} B header"
+        f" {us_per_token:>8.1f} us/validate {1_000_000 / us_per_token:>10.0f} validate/s"
+    )
+
+
+def main():
+    # NOTE: Debug logging of every payload would dominate the timings.
+    logger.remove()
+
+    tokens_validator = JWTTokensValidator(secret_key=SECRET_KEY)
+    for name, tokens_generator in GENERATORS:
+        measure(name, tokens_generator, tokens_validator)
+
+
+if __name__ == "__main__":
+    main()
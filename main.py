@@ -1,6 +1,24 @@
+import argparse
+
 from src.infrastructure.api.app import app
+from src.infrastructure.cli import import_users, serve, sidecar, sweep_refresh_tokens
 import uvicorn
 
 
+def main():
+    parser = argparse.ArgumentParser(description="JWT authorization service")
+    subparsers = parser.add_subparsers(dest="command")
+    serve.add_parser(subparsers)
+    import_users.add_parser(subparsers)
+    sweep_refresh_tokens.add_parser(subparsers)
+    sidecar.add_parser(subparsers)
+
+    args = parser.parse_args()
+    if args.command is None:
+        uvicorn.run(app)
+    else:
+        args.handler(args)
+
+
 if __name__ == "__main__":
-    uvicorn.run(app)
+    main()
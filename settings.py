@@ -8,6 +8,95 @@ class Settings(BaseSettings):
     SECRET_KEY:                     str = "12345"
     ACCESS_TOKEN_EXPIRE_MINUTES:    int = 1
     REFRESH_TOKEN_EXPIRE_MINUTES:   int = 5
-    
-    
+    TOKENS_PROFILE:                 str = "default"
+    TOKENS_TYPE_IN_HEADER:          bool = False
+    AUTH_MIDDLEWARE_ENABLED:        bool = False
+
+    PASSWORD_HASH_SCHEME:           str = "bcrypt"
+    BCRYPT_ROUNDS:                  int = 12
+    SCRYPT_N:                       int = 2 ** 14
+    SCRYPT_R:                       int = 8
+    SCRYPT_P:                       int = 5
+
+    DB_POOL_SIZE:                   int = 10
+    DB_MAX_OVERFLOW:                int = 10
+    DB_POOL_TIMEOUT_SECONDS:        float = 2
+    DB_CONNECT_TIMEOUT_SECONDS:     float = 5
+    DB_STATEMENT_TIMEOUT_MS:        int = 5000
+    DB_BULK_STATEMENT_TIMEOUT_MS:   int = 0
+    DB_CIRCUIT_FAILURE_THRESHOLD:   int = 5
+    DB_CIRCUIT_RESET_SECONDS:       float = 10
+    WARMUP_RETRY_INTERVAL_SECONDS:  float = 5
+    DB_QUERIES_DEBUG_HEADERS:       bool = False
+
+    SQLITE_MMAP_SIZE:               int = 256 * 1024 * 1024
+    SQLITE_CACHE_SIZE_KIB:          int = 64 * 1024
+    SQLITE_BUSY_TIMEOUT_SECONDS:    float = 5
+    SQLITE_WRITE_TIMEOUT_SECONDS:   float = 30
+
+    LOOP_WATCHDOG_ENABLED:              bool = False
+    LOOP_WATCHDOG_THRESHOLD_SECONDS:    float = 0.1
+    LOOP_WATCHDOG_INTERVAL_SECONDS:     float = 0.02
+
+    SERVER_HOST:                        str = "0.0.0.0"
+    SERVER_PORT:                        int = 8000
+    SERVER_WORKERS:                     int | None = None
+    SERVER_GRACEFUL_SHUTDOWN_SECONDS:   int = 30
+    SERVER_FORWARDED_ALLOW_IPS:         str = "127.0.0.1"
+
+    REVOKED_TOKENS_SYNC_INTERVAL_SECONDS:   float = 30
+    REVOKED_TOKENS_FILTER_CAPACITY:         int = 100_000
+    REVOKED_TOKENS_FILTER_ERROR_RATE:       float = 0.001
+
+    REGISTERED_EMAILS_FILTER_ENABLED:           bool = True
+    REGISTERED_EMAILS_FILTER_CAPACITY:          int = 1_000_000
+    REGISTERED_EMAILS_FILTER_ERROR_RATE:        float = 0.01
+    REGISTERED_EMAILS_RELOAD_INTERVAL_SECONDS:  float = 300
+
+    TOKEN_VERSIONS_CACHE_TTL_SECONDS:       float = 30
+    TOKEN_VERSIONS_CACHE_MAX_SIZE:          int = 100_000
+    TOKEN_VERSIONS_LISTEN_RETRY_SECONDS:    float = 5
+
+    REFRESH_GRACE_SECONDS:                  float = 5
+
+    IDEMPOTENCY_ENABLED:                bool = True
+    IDEMPOTENCY_TTL_SECONDS:            float = 60
+    IDEMPOTENCY_CACHE_MAX_SIZE:         int = 10_000
+    IDEMPOTENCY_DB_ENABLED:             bool = False
+    IDEMPOTENCY_SWEEP_INTERVAL_SECONDS: float = 300
+
+    AUDIT_LOG_ENABLED:                  bool = True
+    AUDIT_QUEUE_MAX_SIZE:               int = 10_000
+    AUDIT_BATCH_SIZE:                   int = 500
+    AUDIT_FLUSH_INTERVAL_SECONDS:       float = 1
+
+    REFRESH_TOKENS_SWEEPER_ENABLED:             bool = True
+    REFRESH_TOKENS_SWEEP_INTERVAL_SECONDS:      float = 300
+    REFRESH_TOKENS_SWEEP_BATCH_SIZE:            int = 1000
+    REFRESH_TOKENS_SWEEP_BATCH_PAUSE_SECONDS:   float = 0.1
+
+    LOGIN_RATE_LIMIT_IP_PER_MINUTE:         int = 30
+    LOGIN_RATE_LIMIT_EMAIL_PER_MINUTE:      int = 10
+    REGISTER_RATE_LIMIT_IP_PER_MINUTE:      int = 10
+    REGISTER_RATE_LIMIT_EMAIL_PER_MINUTE:   int = 5
+    AVAILABILITY_RATE_LIMIT_IP_PER_MINUTE:  int = 120
+    RATE_LIMIT_MAX_KEYS:                    int = 100_000
+
+    SHARED_STATE_PATH:              str | None = None
+    SHARED_STATE_SLOTS:             int = 262_144
+    SHARED_STATE_STRIPES:           int = 64
+
+    SIDECAR_SOCKET_PATH:            str = "/tmp/jwt-auth-sidecar.sock"
+    SIDECAR_MAX_TOKEN_BYTES:        int = 8192
+
+    ADMIN_USER_IDS:                 list[int] = []
+
+    USERS_PAGE_MAX_LIMIT:           int = 1000
+    USERS_BATCH_MAX_IDS:            int = 100
+    USERS_EXPORT_BATCH_SIZE:        int = 1000
+
+    IMPORT_BATCH_SIZE:              int = 1000
+    IMPORT_HASH_WORKERS:            int | None = None
+
+
 settings = Settings()
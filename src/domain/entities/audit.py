@@ -0,0 +1,21 @@
+from enum import Enum
+from datetime import datetime
+from dataclasses import dataclass
+
+from .base import BaseEntity
+
+
+class AuditEventTypes(str, Enum):
+    LOGIN = "login"
+    LOGIN_FAILED = "login_failed"
+    REGISTER = "register"
+    REFRESH = "refresh"
+
+
+@dataclass
+class AuditEvent(BaseEntity):
+    event_type:     AuditEventTypes
+    created_at:     datetime
+    user_id:        int | None = None
+    email:          str | None = None
+    client_ip:      str | None = None
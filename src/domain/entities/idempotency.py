@@ -0,0 +1,14 @@
+from datetime import datetime
+from dataclasses import dataclass
+
+from .base import BaseEntity
+
+
+@dataclass
+class IdempotentResponse(BaseEntity):
+    key:            str
+    fingerprint:    str
+    status_code:    int
+    content_type:   str
+    body:           bytes
+    expires_at:     datetime
@@ -3,11 +3,17 @@ from dataclasses import dataclass
 from .base import BaseEntity
 
 
+def normalize_email(email: str) -> str:
+    return email.strip().lower()
+
+
 @dataclass
 class User(BaseEntity):
-    id:             int
-    email:          str
-    password_hash:  str
+    id:                 int
+    email:              str
+    password_hash:      str
+    email_normalized:   str | None = None
+    token_version:      int = 0
     
     def __eq__(self, obj):
         return self.__dict__ == obj.__dict__
@@ -0,0 +1,8 @@
+from abc import ABC, abstractmethod
+from ...entities.audit import AuditEvent
+
+
+class IAuditRepo(ABC):
+    @abstractmethod
+    async def add_events(self, events: list[AuditEvent]) -> int:
+        ...
@@ -14,3 +14,9 @@ class UserNotFound(CustomRepoException):
 @dataclass
 class RefreshTokenNotFound(CustomRepoException):
     message: str = "Refresh token not found"
+    
+    
+@dataclass
+class DatabaseUnavailable(CustomRepoException):
+    message:        str = "Database unavailable"
+    retry_after:    float = 0
@@ -0,0 +1,18 @@
+from abc import ABC, abstractmethod
+from datetime import datetime
+from ...entities.idempotency import IdempotentResponse
+
+
+class IIdempotencyRepo(ABC):
+    @abstractmethod
+    async def get_response(self, key: str, now: datetime) -> IdempotentResponse | None:
+        ...
+        
+    @abstractmethod
+    async def add_response(self, response: IdempotentResponse, now: datetime) -> bool:
+        # NOTE: False if a live response of the key is already stored.
+        ...
+        
+    @abstractmethod
+    async def delete_expired_responses(self, now: datetime) -> int:
+        ...
@@ -1,4 +1,6 @@
 from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import AsyncIterator
 from ...entities.users import User
 
 
@@ -9,20 +11,87 @@ class IUsersRepo(ABC):
         
     @abstractmethod
     async def get_by_email(self, email: str):
+        # NOTE: `email` is normalized (see `normalize_email`)
         ...
         
     @abstractmethod
     async def get_by_id(self, id: str):
         ...
     
+    @abstractmethod
+    async def get_many(self, ids: list[int]) -> list[User]:
+        # NOTE: Missing ids are skipped, users are returned in no particular order.
+        ...
+    
+    @abstractmethod
+    async def update_password_hash(self, user_id: int, password_hash: str):
+        ...
+    
+    @abstractmethod
+    async def get_token_version(self, user_id: int) -> int:
+        ...
+    
+    @abstractmethod
+    async def increment_token_version(self, user_id: int) -> int:
+        ...
+    
     @abstractmethod
     async def get_refresh_token(self, user_id: int):
         ...
     
     @abstractmethod
-    async def add_refresh_token(self, user_id: int, refresh_token: str):
+    async def add_refresh_token(self, user_id: int, refresh_token: str, expires_at: datetime):
+        ...
+        
+    @abstractmethod
+    async def update_refresh_token(self, user_id: int, refresh_token: str, expires_at: datetime):
+        ...
+        
+    @abstractmethod
+    async def delete_refresh_token(self, user_id: int):
+        ...
+        
+    @abstractmethod
+    async def delete_expired_refresh_tokens(self, now: datetime, limit: int) -> int:
+        ...
+        
+    @abstractmethod
+    async def revoke_token(self, jti: str, expires_at: datetime):
+        ...
+        
+    @abstractmethod
+    async def is_token_revoked(self, jti: str) -> bool:
+        ...
+        
+    @abstractmethod
+    async def get_revoked_tokens(self, now: datetime) -> list[str]:
+        ...
+        
+    @abstractmethod
+    async def delete_expired_revoked_tokens(self, now: datetime) -> int:
+        ...
+        
+    @abstractmethod
+    async def get_existing_emails(self, emails: list[str]) -> set[str]:
+        ...
+        
+    @abstractmethod
+    async def add_users(self, users: list[User]) -> int:
+        ...
+        
+    @abstractmethod
+    async def list_users(self, after_id: int | None, limit: int) -> list[User]:
+        ...
+        
+    @abstractmethod
+    def stream_users(self, batch_size: int) -> AsyncIterator[User]:
+        ...
+        
+    @abstractmethod
+    async def count_users(self) -> int:
         ...
         
     @abstractmethod
-    async def update_refresh_token(self, user_id: int, refresh_token: str):
+    def stream_emails(self, batch_size: int) -> AsyncIterator[str]:
+        # NOTE: Normalized emails of all users.
         ...
@@ -2,6 +2,8 @@ from typing import Type
 from abc import ABC, abstractmethod
 
 from ..repositories.users.interface import IUsersRepo
+from ..repositories.audit.interface import IAuditRepo
+from ..repositories.idempotency.interface import IIdempotencyRepo
 
 
 class IUnitOfWork(ABC):
@@ -14,6 +16,16 @@ class IUnitOfWork(ABC):
     def users(self,) -> IUsersRepo:
         ...
     
+    @property
+    @abstractmethod
+    def audit(self,) -> IAuditRepo:
+        ...
+    
+    @property
+    @abstractmethod
+    def idempotency(self,) -> IIdempotencyRepo:
+        ...
+    
     @abstractmethod
     async def commit(self,):
         ...
@@ -1,10 +1,133 @@
-from fastapi import APIRouter, FastAPI
+import asyncio
+from functools import partial
+from contextlib import asynccontextmanager
+import math
+from fastapi import APIRouter, FastAPI, Request
+from fastapi.responses import JSONResponse
+
+from settings import settings
+from src.domain.repositories.exc import DatabaseUnavailable
+from src.infrastructure.tools.refresh_tokens_sweeper import RefreshTokensSweeper
+from src.infrastructure.database import dispose_engine, init_engine, listen
+from src.infrastructure.database.repositories.users import TOKEN_VERSIONS_CHANNEL
+from .warmup import warm_up
+from .auth_middleware import AccessTokenMiddleware
+from .idempotency_middleware import IdempotencyMiddleware
+from .dependencies import (
+    audit_log,
+    create_unit_of_work,
+    get_access_token_claims,
+    get_tokens_validator,
+    idempotency_cache,
+    registered_emails,
+    shared_state,
+    shutdown_hashing_executor,
+    token_versions_cache,
+    tokens_denylist,
+    verify_access_token,
+)
+from .health import router as health_router
+from .metrics import LoopWatchdogMiddleware, QueryCounterMiddleware, loop_watchdog, router as metrics_router
 from .v1.auth.routes import router as auth_router
 from .v1.users.routes import router as users_router
 
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # NOTE: `/health/ready` reports ready only after the warm up,
+    # which is retried in the background until the database is reachable.
+    engine = init_engine()
+    if shared_state is not None:
+        shared_state.open()
+    if settings.LOOP_WATCHDOG_ENABLED:
+        loop_watchdog.start()
+    background_tasks = [
+        asyncio.create_task(warm_up(app=app, api=api, engine=engine)),
+        asyncio.create_task(
+            tokens_denylist.run_sync_loop(
+                unit_of_work_factory=create_unit_of_work,
+                interval_seconds=settings.REVOKED_TOKENS_SYNC_INTERVAL_SECONDS,
+            )
+        ),
+    ]
+    if settings.REGISTERED_EMAILS_FILTER_ENABLED:
+        background_tasks.append(
+            asyncio.create_task(
+                registered_emails.run_load_loop(
+                    unit_of_work_factory=create_unit_of_work,
+                    interval_seconds=settings.REGISTERED_EMAILS_RELOAD_INTERVAL_SECONDS,
+                )
+            )
+        )
+    if engine.dialect.driver == "asyncpg":
+        background_tasks.append(
+            asyncio.create_task(
+                token_versions_cache.run_listen_loop(
+                    listen=partial(listen, TOKEN_VERSIONS_CHANNEL),
+                    retry_interval_seconds=settings.TOKEN_VERSIONS_LISTEN_RETRY_SECONDS,
+                )
+            )
+        )
+    if settings.IDEMPOTENCY_ENABLED and settings.IDEMPOTENCY_DB_ENABLED:
+        background_tasks.append(
+            asyncio.create_task(
+                idempotency_cache.run_sweep_loop(
+                    interval_seconds=settings.IDEMPOTENCY_SWEEP_INTERVAL_SECONDS,
+                )
+            )
+        )
+    audit_flush_task = None
+    if settings.AUDIT_LOG_ENABLED:
+        audit_flush_task = asyncio.create_task(
+            audit_log.run_flush_loop(unit_of_work_factory=create_unit_of_work)
+        )
+        background_tasks.append(audit_flush_task)
+    if settings.REFRESH_TOKENS_SWEEPER_ENABLED:
+        refresh_tokens_sweeper = RefreshTokensSweeper(
+            batch_size=settings.REFRESH_TOKENS_SWEEP_BATCH_SIZE,
+            batch_pause_seconds=settings.REFRESH_TOKENS_SWEEP_BATCH_PAUSE_SECONDS,
+        )
+        background_tasks.append(
+            asyncio.create_task(
+                refresh_tokens_sweeper.run_sweep_loop(
+                    unit_of_work_factory=create_unit_of_work,
+                    interval_seconds=settings.REFRESH_TOKENS_SWEEP_INTERVAL_SECONDS,
+                )
+            )
+        )
+    
+    yield
+    
+    app.state.ready = False
+    for task in background_tasks:
+        task.cancel()
+    if settings.LOOP_WATCHDOG_ENABLED:
+        loop_watchdog.stop()
+    if audit_flush_task is not None:
+        # NOTE: The flush loop is stopped first, so the final flush
+        # writes everything queued, including an interrupted batch.
+        await asyncio.gather(audit_flush_task, return_exceptions=True)
+        await audit_log.flush(unit_of_work_factory=create_unit_of_work)
+    
+    await asyncio.to_thread(shutdown_hashing_executor)
+    await dispose_engine()
+    if shared_state is not None:
+        shared_state.close()
+
+
+async def database_unavailable_handler(request: Request, ex: DatabaseUnavailable) -> JSONResponse:
+    return JSONResponse(
+        {"detail": ex.message},
+        status_code=503,
+        headers={"Retry-After": str(max(1, math.ceil(ex.retry_after)))},
+    )
+
+
+app = FastAPI(lifespan=lifespan)
 api = FastAPI()
+# NOTE: Mounted apps have their own exception handlers.
+for application in (app, api):
+    application.add_exception_handler(DatabaseUnavailable, database_unavailable_handler)
 
 v1_router = APIRouter(prefix='/v1')
 v1_router.include_router(auth_router)
@@ -12,4 +135,42 @@ v1_router.include_router(users_router)
 
 api.include_router(v1_router)
 
+app.include_router(health_router)
+app.include_router(metrics_router)
 app.mount('/api', api, 'API')
+
+if settings.AUTH_MIDDLEWARE_ENABLED:
+    # NOTE: Routes receiving a refresh token or no token at all are excluded,
+    # so a stale access token header doesn't break them.
+    app.add_middleware(
+        AccessTokenMiddleware,
+        tokens_validator=get_tokens_validator(),
+        tokens_denylist=tokens_denylist,
+        unit_of_work_factory=create_unit_of_work,
+        token_versions_cache=token_versions_cache,
+        exclude_paths=[
+            "/api/v1/auth/login",
+            "/api/v1/auth/register",
+            "/api/v1/auth/availability",
+            "/api/v1/auth/refresh",
+        ],
+    )
+    api.dependency_overrides[verify_access_token] = get_access_token_claims
+
+if settings.IDEMPOTENCY_ENABLED:
+    # NOTE: Retries of these routes are the expensive ones (password hashing).
+    app.add_middleware(
+        IdempotencyMiddleware,
+        idempotency_cache=idempotency_cache,
+        secret_key=settings.SECRET_KEY,
+        paths={
+            "/api/v1/auth/login": "username",
+            "/api/v1/auth/register": "email",
+        },
+    )
+
+if settings.LOOP_WATCHDOG_ENABLED:
+    app.add_middleware(LoopWatchdogMiddleware, watchdog=loop_watchdog)
+
+# NOTE: Added last to be the outermost middleware and count every query.
+app.add_middleware(QueryCounterMiddleware, debug_headers=settings.DB_QUERIES_DEBUG_HEADERS)
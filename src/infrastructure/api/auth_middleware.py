@@ -0,0 +1,99 @@
+from typing import Callable, Iterable
+
+from loguru import logger
+
+from src.domain.uof.abstract import IUnitOfWork
+from src.domain.repositories.exc import DatabaseUnavailable
+from src.infrastructure.tools.tokens_denylist import TokensDenylist
+from src.infrastructure.tools.token_versions_cache import TokenVersionsCache
+from src.infrastructure.tools.tokens_tools import InvalidToken, JWTTokensValidator, TokenExpired, TokenRevoked
+
+
+ACCESS_TOKEN_CLAIMS_KEY = "access_token_claims"
+
+
+class AccessTokenMiddleware:
+    # NOTE: Raw ASGI alternative of the `verify_access_token` dependency.
+    # A bearer token of any request (except `exclude_paths`) is validated
+    # before routing, claims are stored in `scope["state"]` (`request.state`)
+    # and invalid tokens are answered with 401 without entering the router.
+    # Requests without a token are passed as is, protected routes reject them
+    # in `get_access_token_claims`.
+    def __init__(
+        self,
+        app,
+        tokens_validator:       JWTTokensValidator,
+        tokens_denylist:        TokensDenylist | None = None,
+        unit_of_work_factory:   Callable[[], IUnitOfWork] | None = None,
+        token_versions_cache:   TokenVersionsCache | None = None,
+        exclude_paths:          Iterable[str] = (),
+    ):
+        self.app = app
+        self.tokens_validator = tokens_validator
+        self.tokens_denylist = tokens_denylist
+        self.unit_of_work_factory = unit_of_work_factory
+        self.token_versions_cache = token_versions_cache
+        self.exclude_paths = frozenset(exclude_paths)
+
+    @staticmethod
+    def _get_bearer_token(scope) -> str | None:
+        for name, value in scope["headers"]:
+            if name == b"authorization":
+                scheme, _, token = value.partition(b" ")
+                if scheme.lower() == b"bearer" and token:
+                    return token.strip().decode("latin-1")
+                return None
+
+        return None
+
+    async def _validate(self, token: str) -> dict:
+        payload = self.tokens_validator.validate_access_token(token)
+        try:
+            if self.tokens_denylist is not None and "jti" in payload and await self.tokens_denylist.is_revoked(
+                payload["jti"],
+                self.unit_of_work_factory(),
+            ):
+                raise TokenRevoked
+            if self.token_versions_cache is not None:
+                await self.token_versions_cache.check(payload, self.unit_of_work_factory())
+        except DatabaseUnavailable:
+            # NOTE: Degraded mode, same as in `verify_access_token`.
+            logger.warning("Database unavailable, access token accepted without revocation checks")
+
+        return payload
+
+    @staticmethod
+    async def _send_error(send, status: int, detail: str):
+        body = f'{{"detail":"{detail}"}}'.encode()
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.exclude_paths:
+            return await self.app(scope, receive, send)
+
+        token = self._get_bearer_token(scope)
+        if token is None:
+            return await self.app(scope, receive, send)
+
+        try:
+            payload = await self._validate(token)
+        except TokenExpired:
+            return await self._send_error(send, 401, "TokenExpired")
+        except TokenRevoked:
+            return await self._send_error(send, 401, "Token revoked")
+        except InvalidToken:
+            return await self._send_error(send, 401, "Invalid token")
+        except Exception as ex:
+            logger.error(f"{type(ex)}: {ex}")
+            return await self._send_error(send, 500, "Internal server error")
+
+        scope.setdefault("state", {})[ACCESS_TOKEN_CLAIMS_KEY] = payload
+        await self.app(scope, receive, send)
@@ -1,24 +1,114 @@
+import math
+import struct
+import multiprocessing
+from functools import lru_cache
 from typing import Type
+from concurrent.futures import ProcessPoolExecutor
 from loguru import logger
-from fastapi import Depends, HTTPException
+from fastapi import Depends, HTTPException, Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
 from settings import settings
 from src.domain.repositories.users.interface import IUsersRepo
 from src.services.users.service import UsersService
-from src.services.exc import RefreshTokenNotFound
+from src.services.users.import_service import UsersImportService
 from src.domain.uof.abstract import IUnitOfWork
+from src.domain.repositories.exc import DatabaseUnavailable
 from src.infrastructure.database import async_session_maker
 from src.infrastructure.database.repositories.users import SqlAlchemyUsersRepo
 from src.infrastructure.database.uof import SQLAlchemyUnitOfWork
-from src.infrastructure.tools.tokens_tools import JWTTokensGenerator, JWTTokensValidator, InvalidToken,  TokenExpired
-from src.infrastructure.tools.password_manager import PasswordManager
+from src.infrastructure.tools.tokens_tools import JWTTokensGenerator, JWTTokensValidator, TokensProfiles, InvalidToken,  TokenExpired, TokenRevoked
+from src.infrastructure.tools.tokens_denylist import TokensDenylist
+from src.infrastructure.tools.token_versions_cache import TokenVersionsCache
+from src.infrastructure.tools.refresh_coalescer import RefreshCoalescer
+from src.infrastructure.tools.audit_log import AuditLog
+from src.infrastructure.tools.idempotency_cache import IdempotencyCache
+from src.infrastructure.tools.registered_emails import RegisteredEmailsFilter
+from src.infrastructure.tools.circuit_breaker import CircuitBreaker
+from src.infrastructure.tools.password_manager import get_password_manager
+from src.infrastructure.tools.rate_limiter import TOKEN_BUCKET_STRUCT, RateLimitExceeded, TokenBucketRateLimiter
+from src.infrastructure.tools.shared_state import SharedStateStore, SharedStateView
 from src.services.auth.service import AuthService
+from .auth_middleware import ACCESS_TOKEN_CLAIMS_KEY
 
 
 bearer_access_token = HTTPBearer(scheme_name="Access token")
 bearer_refresh_token = HTTPBearer(scheme_name="Refresh token")
 
+tokens_denylist = TokensDenylist(
+    capacity=settings.REVOKED_TOKENS_FILTER_CAPACITY,
+    error_rate=settings.REVOKED_TOKENS_FILTER_ERROR_RATE,
+)
+token_versions_cache = TokenVersionsCache(
+    ttl_seconds=settings.TOKEN_VERSIONS_CACHE_TTL_SECONDS,
+    max_size=settings.TOKEN_VERSIONS_CACHE_MAX_SIZE,
+)
+refresh_coalescer = RefreshCoalescer(
+    grace_seconds=settings.REFRESH_GRACE_SECONDS,
+)
+audit_log = AuditLog(
+    max_queue_size=settings.AUDIT_QUEUE_MAX_SIZE,
+    batch_size=settings.AUDIT_BATCH_SIZE,
+    flush_interval_seconds=settings.AUDIT_FLUSH_INTERVAL_SECONDS,
+)
+registered_emails = RegisteredEmailsFilter(
+    capacity=settings.REGISTERED_EMAILS_FILTER_CAPACITY,
+    error_rate=settings.REGISTERED_EMAILS_FILTER_ERROR_RATE,
+)
+
+# NOTE: Every unit of work goes through it, when the database keeps failing
+# requests fail fast with 503 instead of waiting for timeouts.
+db_circuit_breaker = CircuitBreaker(
+    name="database",
+    failure_threshold=settings.DB_CIRCUIT_FAILURE_THRESHOLD,
+    reset_timeout_seconds=settings.DB_CIRCUIT_RESET_SECONDS,
+)
+
+# NOTE: Shared by the workers of the host when configured,
+# otherwise every worker has its own in-process state.
+# The file is opened by the app lifespan, not at import.
+shared_state = SharedStateStore(
+    path=settings.SHARED_STATE_PATH,
+    slots=settings.SHARED_STATE_SLOTS,
+    stripes=settings.SHARED_STATE_STRIPES,
+) if settings.SHARED_STATE_PATH else None
+
+
+def get_shared_state_view(prefix: str, value_struct: struct.Struct) -> SharedStateView | None:
+    return shared_state.view(prefix, value_struct) if shared_state is not None else None
+
+
+login_ip_rate_limiter = TokenBucketRateLimiter.per_minute(
+    settings.LOGIN_RATE_LIMIT_IP_PER_MINUTE,
+    max_keys=settings.RATE_LIMIT_MAX_KEYS,
+    name="login_ip",
+    shared_state=get_shared_state_view("login_ip:", TOKEN_BUCKET_STRUCT),
+)
+login_email_rate_limiter = TokenBucketRateLimiter.per_minute(
+    settings.LOGIN_RATE_LIMIT_EMAIL_PER_MINUTE,
+    max_keys=settings.RATE_LIMIT_MAX_KEYS,
+    name="login_email",
+    shared_state=get_shared_state_view("login_email:", TOKEN_BUCKET_STRUCT),
+)
+register_ip_rate_limiter = TokenBucketRateLimiter.per_minute(
+    settings.REGISTER_RATE_LIMIT_IP_PER_MINUTE,
+    max_keys=settings.RATE_LIMIT_MAX_KEYS,
+    name="register_ip",
+    shared_state=get_shared_state_view("register_ip:", TOKEN_BUCKET_STRUCT),
+)
+register_email_rate_limiter = TokenBucketRateLimiter.per_minute(
+    settings.REGISTER_RATE_LIMIT_EMAIL_PER_MINUTE,
+    max_keys=settings.RATE_LIMIT_MAX_KEYS,
+    name="register_email",
+    shared_state=get_shared_state_view("register_email:", TOKEN_BUCKET_STRUCT),
+)
+availability_ip_rate_limiter = TokenBucketRateLimiter.per_minute(
+    settings.AVAILABILITY_RATE_LIMIT_IP_PER_MINUTE,
+    max_keys=settings.RATE_LIMIT_MAX_KEYS,
+    name="availability_ip",
+    shared_state=get_shared_state_view("availability_ip:", TOKEN_BUCKET_STRUCT),
+)
+
 
 def get_users_repo_class() -> Type[IUsersRepo]:
     return SqlAlchemyUsersRepo
@@ -34,21 +124,69 @@ def get_unit_of_work(
 ) -> IUnitOfWork:
     return SQLAlchemyUnitOfWork(
         async_session_maker=session_maker,
-        users_repo_class=users_repo_class
+        users_repo_class=users_repo_class,
+        circuit_breaker=db_circuit_breaker,
+    )
+
+
+def get_bulk_unit_of_work(
+    session_maker=Depends(get_session_maker),
+    users_repo_class=Depends(get_users_repo_class)
+) -> IUnitOfWork:
+    # NOTE: Export and import run statements longer than the default timeout.
+    return SQLAlchemyUnitOfWork(
+        async_session_maker=session_maker,
+        users_repo_class=users_repo_class,
+        circuit_breaker=db_circuit_breaker,
+        statement_timeout_ms=settings.DB_BULK_STATEMENT_TIMEOUT_MS,
+    )
+
+
+def create_unit_of_work() -> IUnitOfWork:
+    # NOTE: For background tasks that are running outside of the request scope.
+    return get_unit_of_work(
+        session_maker=get_session_maker(),
+        users_repo_class=get_users_repo_class(),
+    )
+
+
+# NOTE: Per-process unless responses are also stored in the database.
+idempotency_cache = IdempotencyCache(
+    ttl_seconds=settings.IDEMPOTENCY_TTL_SECONDS,
+    max_size=settings.IDEMPOTENCY_CACHE_MAX_SIZE,
+    unit_of_work_factory=create_unit_of_work if settings.IDEMPOTENCY_DB_ENABLED else None,
+)
+
+
+def get_tokens_validator() -> JWTTokensValidator:
+    return JWTTokensValidator(
+        secret_key=settings.SECRET_KEY,
+    )
+
+
+def get_tokens_generator() -> JWTTokensGenerator:
+    return JWTTokensGenerator(
+        secret_key=settings.SECRET_KEY,
+        access_token_exp_minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES,
+        refresh_token_exp_minutes=settings.REFRESH_TOKEN_EXPIRE_MINUTES,
+        profile=TokensProfiles(settings.TOKENS_PROFILE),
+        type_in_header=settings.TOKENS_TYPE_IN_HEADER,
     )
 
 
 def get_auth_service(
-    unit_of_work=Depends(get_unit_of_work)
+    unit_of_work=Depends(get_unit_of_work),
+    password_manager=Depends(get_password_manager),
 ) -> AuthService:
     return AuthService(
         unit_of_work=unit_of_work,
-        password_manager=PasswordManager(),
-        tokens_generator=JWTTokensGenerator(
-            secret_key=settings.SECRET_KEY,
-            access_token_exp_minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES,
-            refresh_token_exp_minutes=settings.REFRESH_TOKEN_EXPIRE_MINUTES,
-        )
+        password_manager=password_manager,
+        tokens_generator=get_tokens_generator(),
+        tokens_denylist=tokens_denylist,
+        token_versions_cache=token_versions_cache,
+        refresh_coalescer=refresh_coalescer,
+        audit_log=audit_log if settings.AUDIT_LOG_ENABLED else None,
+        registered_emails=registered_emails if settings.REGISTERED_EMAILS_FILTER_ENABLED else None,
     )
     
     
@@ -58,10 +196,50 @@ def get_users_service(
     return UsersService(
         unit_of_work=unit_of_work
     )
+
+
+def get_export_users_service(
+    unit_of_work=Depends(get_bulk_unit_of_work)
+) -> UsersService:
+    return UsersService(
+        unit_of_work=unit_of_work
+    )
     
     
-def verify_access_token(
-    credentials: HTTPAuthorizationCredentials = Depends(bearer_access_token)
+@lru_cache
+def get_hashing_executor() -> ProcessPoolExecutor:
+    # NOTE: "spawn" is used because forking a process with a running event loop
+    # and open connections is unsafe.
+    return ProcessPoolExecutor(
+        max_workers=settings.IMPORT_HASH_WORKERS,
+        mp_context=multiprocessing.get_context("spawn"),
+    )
+
+
+def shutdown_hashing_executor():
+    # NOTE: Called by the app lifespan, the pool exists only if an import ran.
+    # Queued hashing is cancelled, running batches are waited for.
+    if get_hashing_executor.cache_info().currsize:
+        get_hashing_executor().shutdown(cancel_futures=True)
+        get_hashing_executor.cache_clear()
+
+
+def get_users_import_service(
+    unit_of_work=Depends(get_bulk_unit_of_work),
+    password_manager=Depends(get_password_manager),
+    hashing_executor=Depends(get_hashing_executor),
+) -> UsersImportService:
+    return UsersImportService(
+        unit_of_work=unit_of_work,
+        password_manager=password_manager,
+        hashing_executor=hashing_executor,
+        batch_size=settings.IMPORT_BATCH_SIZE,
+    )
+    
+    
+async def verify_access_token(
+    credentials:    HTTPAuthorizationCredentials = Depends(bearer_access_token),
+    unit_of_work:   IUnitOfWork = Depends(get_unit_of_work),
 ) -> dict:
     try:
         access_token = credentials.credentials
@@ -71,8 +249,19 @@ def verify_access_token(
         
         logger.debug("Validate refresh token")
         payload = tokens_validator.validate_access_token(access_token)
+        
+        try:
+            if "jti" in payload and await tokens_denylist.is_revoked(payload["jti"], unit_of_work):
+                raise TokenRevoked
+            await token_versions_cache.check(payload, unit_of_work)
+        except DatabaseUnavailable:
+            # NOTE: Degraded mode, the signature and expiration are still
+            # verified, revocations that aren't synced yet are not.
+            logger.warning("Database unavailable, access token accepted without revocation checks")
     except TokenExpired:
         raise HTTPException(401, detail="TokenExpired")
+    except TokenRevoked:
+        raise HTTPException(401, detail="Token revoked")
     except InvalidToken:
         raise HTTPException(401, detail="Invalid token")
     except Exception as ex:
@@ -86,6 +275,9 @@ async def verify_refresh_token(
     credentials:    HTTPAuthorizationCredentials = Depends(bearer_refresh_token),
     auth_service:   AuthService = Depends(get_auth_service)
 ) -> dict:
+    # NOTE: The token is compared with the stored one on rotation
+    # (`AuthService.rotate_refresh_token`), so just rotated tokens
+    # can be answered within the grace window.
     try:
         logger.debug("Extract credentials refresh token")
         refresh_token = credentials.credentials
@@ -97,17 +289,58 @@ async def verify_refresh_token(
         logger.debug("Validate refresh token")
         payload = tokens_validator.validate_refresh_token(refresh_token)
         
-        logger.debug(f"Checking refresh token in db User(id={payload['sub']}).")
-        await auth_service.check_refresh_token(
-            user_id=int(payload['sub']),
-            refresh_token=refresh_token,
-        )
+        if "jti" in payload and await tokens_denylist.is_revoked(payload["jti"], auth_service.unit_of_work):
+            raise TokenRevoked
+        await token_versions_cache.check(payload, auth_service.unit_of_work)
     except TokenExpired:
         raise HTTPException(401, detail="Token expired")
-    except (InvalidToken, RefreshTokenNotFound):
+    except (InvalidToken, TokenRevoked):
         raise HTTPException(401, detail="Invalid token")
+    except DatabaseUnavailable:
+        raise
     except Exception as ex:
         logger.error(f"{type(ex)}: {ex}")
         raise HTTPException(500, detail="Internal server error")
     
     return payload
+
+
+def get_access_token_claims(request: Request) -> dict:
+    # NOTE: Replaces `verify_access_token` when `AccessTokenMiddleware`
+    # is enabled, the token is already validated by the middleware.
+    claims = getattr(request.state, ACCESS_TOKEN_CLAIMS_KEY, None)
+    if claims is None:
+        raise HTTPException(403, detail="Not authenticated")
+    
+    return claims
+
+
+def verify_admin_access_token(
+    payload: dict = Depends(verify_access_token)
+) -> dict:
+    if int(payload["sub"]) not in settings.ADMIN_USER_IDS:
+        raise HTTPException(403, detail="Forbidden")
+    
+    return payload
+
+
+def get_client_ip(request: Request) -> str:
+    return request.client.host if request.client else "unknown"
+
+
+def check_rate_limits(*limits: tuple[TokenBucketRateLimiter, str]):
+    # NOTE: Must be called before any password hashing, that's the whole point.
+    # All limiters are checked first, so a request rejected by one of them
+    # doesn't take tokens of the others. Keys (emails) are not logged.
+    try:
+        for rate_limiter, key in limits:
+            rate_limiter.check(key)
+        for rate_limiter, key in limits:
+            rate_limiter.acquire(key)
+    except RateLimitExceeded as ex:
+        logger.warning(f"Rate limit '{rate_limiter.name}' exceeded")
+        raise HTTPException(
+            429,
+            detail="Too many requests",
+            headers={"Retry-After": str(math.ceil(ex.retry_after))},
+        )
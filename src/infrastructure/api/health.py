@@ -0,0 +1,26 @@
+from fastapi import APIRouter, HTTPException, Request
+
+from src.infrastructure.database import get_pool_stats
+from .dependencies import db_circuit_breaker, tokens_denylist
+
+
+router = APIRouter(prefix="/health", tags=["Health"])
+
+
+@router.get("/live")
+async def live() -> dict:
+    return {
+        "status": "ok",
+        "pool": get_pool_stats(),
+        "database_circuit": db_circuit_breaker.state,
+    }
+
+
+@router.get("/ready")
+async def ready(request: Request) -> dict:
+    # NOTE: Before the first denylist sync every token is checked in the
+    # database, the worker gets traffic only once it's done.
+    if not getattr(request.app.state, "ready", False) or not tokens_denylist.ready:
+        raise HTTPException(503, detail="Not ready")
+
+    return {"status": "ready"}
@@ -0,0 +1,154 @@
+import hmac
+import hashlib
+from typing import Mapping
+
+import orjson
+from loguru import logger
+
+from src.domain.entities.users import normalize_email
+from src.infrastructure.tools.idempotency_cache import IdempotencyCache, IdempotencyKeyReused
+
+
+IDEMPOTENCY_KEY_HEADER = b"idempotency-key"
+REPLAYED_HEADER = b"idempotent-replayed"
+
+
+class IdempotencyMiddleware:
+    # NOTE: Raw ASGI. POST requests to `paths` with an `Idempotency-Key`
+    # header run once per key: retries with the same key and body get the
+    # stored response without entering the router (no password hashing,
+    # no writes, no rate limit tokens). 5xx and 429 responses are not
+    # stored, they are meant to be retried. The same key with another body
+    # is rejected with 422. Request bodies are fingerprinted with an HMAC,
+    # so stored fingerprints of login requests don't expose passwords.
+    # Keys are scoped to the caller: `paths` maps every path to the body
+    # field with the email (the client IP if there is none), so clients
+    # picking the same key don't share responses or get 422 for each other.
+    def __init__(
+        self,
+        app,
+        idempotency_cache:  IdempotencyCache,
+        secret_key:         str,
+        paths:              Mapping[str, str],
+        max_key_length:     int = 255,
+    ):
+        self.app = app
+        self.idempotency_cache = idempotency_cache
+        self.secret_key = secret_key.encode()
+        self.paths = dict(paths)
+        self.max_key_length = max_key_length
+
+    @staticmethod
+    def _get_idempotency_key(scope) -> str | None:
+        for name, value in scope["headers"]:
+            if name == IDEMPOTENCY_KEY_HEADER:
+                return value.decode("latin-1").strip()
+
+        return None
+
+    @staticmethod
+    async def _read_body(receive) -> bytes | None:
+        chunks = []
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return None
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                return b"".join(chunks)
+
+    @staticmethod
+    async def _send_response(send, status: int, content_type: bytes, body: bytes, headers: list = ()):
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [
+                (b"content-type", content_type),
+                (b"content-length", str(len(body)).encode()),
+                *headers,
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+    async def _send_error(self, send, status: int, detail: str):
+        await self._send_response(send, status, b"application/json", f'{{"detail":"{detail}"}}'.encode())
+
+    def _get_fingerprint(self, scope, body: bytes) -> str:
+        message = scope["method"].encode() + b" " + scope["path"].encode() + b"\n" + body
+        return hmac.new(self.secret_key, message, hashlib.sha256).hexdigest()
+
+    def _get_caller(self, scope, body: bytes) -> str:
+        # NOTE: Keys are stored and logged, so the email is hashed.
+        try:
+            email = orjson.loads(body)[self.paths[scope["path"]]]
+            caller = f"email:{normalize_email(email)}"
+        except (orjson.JSONDecodeError, KeyError, TypeError, AttributeError):
+            client = scope.get("client")
+            caller = f"ip:{client[0] if client else 'unknown'}"
+
+        return hmac.new(self.secret_key, caller.encode(), hashlib.sha256).hexdigest()[:32]
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST" or scope["path"] not in self.paths:
+            return await self.app(scope, receive, send)
+
+        idempotency_key = self._get_idempotency_key(scope)
+        if idempotency_key is None:
+            return await self.app(scope, receive, send)
+        if not idempotency_key or len(idempotency_key) > self.max_key_length:
+            return await self._send_error(send, 400, "Invalid idempotency key")
+
+        body = await self._read_body(receive)
+        if body is None:
+            return
+
+        key = f"{scope['path']}:{self._get_caller(scope, body)}:{idempotency_key}"
+        fingerprint = self._get_fingerprint(scope, body)
+        try:
+            stored_response = await self.idempotency_cache.acquire(key, fingerprint)
+        except IdempotencyKeyReused:
+            return await self._send_error(send, 422, "Idempotency key is reused with another request")
+
+        if stored_response is not None:
+            logger.debug(f"Replaying stored response of idempotency key '{key}'")
+            return await self._send_response(
+                send,
+                stored_response.status_code,
+                stored_response.content_type.encode("latin-1"),
+                stored_response.body,
+                [(REPLAYED_HEADER, b"true")],
+            )
+
+        body_received = False
+
+        async def receive_body():
+            nonlocal body_received
+            if body_received:
+                return await receive()
+            body_received = True
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        status, content_type, chunks = None, b"", []
+
+        async def send_and_capture(message):
+            nonlocal status, content_type
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                content_type = dict(message.get("headers", [])).get(b"content-type", b"")
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+            await send(message)
+
+        response = None
+        try:
+            await self.app(scope, receive_body, send_and_capture)
+            if status is not None and status < 500 and status != 429:
+                response = self.idempotency_cache.create_response(
+                    key=key,
+                    fingerprint=fingerprint,
+                    status_code=status,
+                    content_type=content_type.decode("latin-1"),
+                    body=b"".join(chunks),
+                )
+        finally:
+            await self.idempotency_cache.release(key, response)
@@ -0,0 +1,140 @@
+from dataclasses import dataclass, field
+
+from fastapi import APIRouter, Depends
+from fastapi.responses import PlainTextResponse
+
+from settings import settings
+from src.infrastructure.database.query_counter import QueryStats, track_queries
+from src.infrastructure.tools.loop_watchdog import LoopWatchdog
+from src.infrastructure.api.dependencies import audit_log, verify_admin_access_token
+
+
+@dataclass
+class RouteQueryMetrics:
+    requests:           int = 0
+    queries:            int = 0
+    max_queries:        int = 0
+    duration_seconds:   float = 0
+
+
+@dataclass
+class QueryMetrics:
+    # NOTE: Per-process, every worker exposes its own counters.
+    routes: dict[str, RouteQueryMetrics] = field(default_factory=dict)
+
+    def record(self, route: str, query_stats: QueryStats):
+        route_metrics = self.routes.setdefault(route, RouteQueryMetrics())
+        route_metrics.requests += 1
+        route_metrics.queries += query_stats.count
+        route_metrics.max_queries = max(route_metrics.max_queries, query_stats.count)
+        route_metrics.duration_seconds += query_stats.duration_seconds
+
+    def render(self) -> str:
+        # NOTE: Prometheus text exposition format.
+        lines = [
+            "# TYPE http_requests_total counter",
+            *(f'http_requests_total{{route="{route}"}} {metrics.requests}' for route, metrics in self.routes.items()),
+            "# TYPE db_queries_total counter",
+            *(f'db_queries_total{{route="{route}"}} {metrics.queries}' for route, metrics in self.routes.items()),
+            "# TYPE db_queries_per_request_max gauge",
+            *(f'db_queries_per_request_max{{route="{route}"}} {metrics.max_queries}' for route, metrics in self.routes.items()),
+            "# TYPE db_query_seconds_total counter",
+            *(f'db_query_seconds_total{{route="{route}"}} {metrics.duration_seconds:.6f}' for route, metrics in self.routes.items()),
+        ]
+        return "\n".join(lines) + "\n"
+
+
+query_metrics = QueryMetrics()
+loop_watchdog = LoopWatchdog(
+    threshold_seconds=settings.LOOP_WATCHDOG_THRESHOLD_SECONDS,
+    interval_seconds=settings.LOOP_WATCHDOG_INTERVAL_SECONDS,
+)
+
+
+def get_route_label(scope) -> str:
+    route = scope.get("route")
+    if route is None:
+        return "unmatched"
+
+    return scope.get("root_path", "") + route.path
+
+
+class QueryCounterMiddleware:
+    # NOTE: Counts database round trips and their time per request.
+    # With `debug_headers` they are returned in `X-DB-Queries` and `X-DB-Time-Ms`
+    # (queries made by a streaming body after the headers are only in metrics).
+    # Metrics are labeled by the route template, so their count is bounded.
+    def __init__(self, app, metrics: QueryMetrics = query_metrics, debug_headers: bool = False):
+        self.app = app
+        self.metrics = metrics
+        self.debug_headers = debug_headers
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        with track_queries() as query_stats:
+
+            async def send_with_headers(message):
+                if message["type"] == "http.response.start":
+                    message["headers"] = [
+                        *message.get("headers", []),
+                        (b"x-db-queries", str(query_stats.count).encode()),
+                        (b"x-db-time-ms", f"{query_stats.duration_seconds * 1000:.3f}".encode()),
+                    ]
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_headers if self.debug_headers else send)
+            finally:
+                self.metrics.record(get_route_label(scope), query_stats)
+
+
+class LoopWatchdogMiddleware:
+    # NOTE: Lets the watchdog attribute event loop stalls to the route
+    # of the request being handled, resolved only when a stall happens.
+    def __init__(self, app, watchdog: LoopWatchdog = loop_watchdog):
+        self.app = app
+        self.watchdog = watchdog
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        with self.watchdog.track_task(lambda: get_route_label(scope)):
+            await self.app(scope, receive, send)
+
+
+router = APIRouter(tags=["Metrics"])
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics() -> PlainTextResponse:
+    content = query_metrics.render()
+    if settings.LOOP_WATCHDOG_ENABLED:
+        content += loop_watchdog.render()
+    if settings.AUDIT_LOG_ENABLED:
+        content += audit_log.render()
+    return PlainTextResponse(content, media_type="text/plain; version=0.0.4")
+
+
+async def loop_stalls() -> list[dict]:
+    # NOTE: Stacks expose source paths, so this is an admin endpoint.
+    return [
+        {
+            "route": offender.route,
+            "count": offender.count,
+            "max_seconds": round(offender.max_seconds, 6),
+            "stack": offender.stack,
+        }
+        for offender in loop_watchdog.worst_offenders()
+    ]
+
+
+if settings.LOOP_WATCHDOG_ENABLED:
+    router.add_api_route(
+        "/metrics/loop-stalls",
+        loop_stalls,
+        methods=["GET"],
+        dependencies=[Depends(verify_admin_access_token)],
+    )
@@ -0,0 +1,18 @@
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+
+
+def dump_dto(content: Any) -> bytes:
+    # NOTE: orjson serialises dataclasses natively.
+    return orjson.dumps(content)
+
+
+class DTOResponse(JSONResponse):
+    # NOTE: Services return trusted dataclass DTOs, so they are serialised once
+    # right here. Routes returning a response instance skip FastAPI's
+    # `response_model` validation and `jsonable_encoder`, `response_model`
+    # is still declared on the route for the OpenAPI schema.
+    def render(self, content: Any) -> bytes:
+        return dump_dto(content)
@@ -1,10 +1,33 @@
+from datetime import datetime, timezone
 from loguru import logger
-from fastapi import APIRouter, Body, Depends, Form, HTTPException
+from fastapi import APIRouter, Body, Depends, Form, HTTPException, Query, Request
+from fastapi.security import HTTPAuthorizationCredentials
 
-from src.infrastructure.api.dependencies import AuthService, get_auth_service, verify_refresh_token
+from settings import settings
+from src.infrastructure.api.dependencies import (
+    AuthService,
+    JWTTokensValidator,
+    availability_ip_rate_limiter,
+    bearer_refresh_token,
+    check_rate_limits,
+    get_auth_service,
+    get_client_ip,
+    get_tokens_validator,
+    login_email_rate_limiter,
+    login_ip_rate_limiter,
+    register_email_rate_limiter,
+    register_ip_rate_limiter,
+    verify_access_token,
+    verify_refresh_token,
+)
+from src.infrastructure.api.responses import DTOResponse
+from src.infrastructure.tools.tokens_tools import InvalidToken, TokenExpired
+from src.services.users.dto import UserDTO
+from src.domain.entities.users import normalize_email
 from src.infrastructure.api.v1.users.schemas import UserResponse
-from src.infrastructure.api.v1.auth.schemas import TokensResponse
-from src.services.exc import InvalidPassword, UserAlreadyRegistred, UserNotFound
+from src.infrastructure.api.v1.auth.schemas import AvailabilityResponse, TokensResponse
+from src.domain.repositories.exc import DatabaseUnavailable
+from src.services.exc import InvalidPassword, RefreshTokenNotFound, UserAlreadyRegistred, UserNotFound
 
 
 router = APIRouter(
@@ -13,57 +36,148 @@ router = APIRouter(
 )
 
 
-@router.post("/login")
+@router.post("/login", response_model=TokensResponse, response_class=DTOResponse)
 async def login(
-    username: str = Body(),
-    password: str = Body(),
+    request:        Request,
+    username:       str = Body(),
+    password:       str = Body(),
     auth_service:   AuthService = Depends(get_auth_service),
-) -> TokensResponse:
+) -> DTOResponse:
+    check_rate_limits(
+        (login_ip_rate_limiter, get_client_ip(request)),
+        (login_email_rate_limiter, normalize_email(username)),
+    )
     try:
-        new_tokens = await auth_service.login_user(email=username, password=password)
+        new_tokens = await auth_service.login_user(
+            email=username,
+            password=password,
+            client_ip=get_client_ip(request),
+        )
     except (UserNotFound, InvalidPassword) as ex:
         logger.error(ex.message)
         raise HTTPException(403, detail="Invalid email or password")
+    except DatabaseUnavailable:
+        raise
     except Exception as ex:
         logger.error(ex)
         raise HTTPException(500)
     
-    return TokensResponse(
-        access_token=new_tokens.access_token,
-        refresh_token=new_tokens.refresh_token,
-    )
+    return DTOResponse(new_tokens)
     
 
-@router.post("/register")
+@router.post("/register", response_model=UserResponse, response_class=DTOResponse)
 async def register(
+    request:        Request,
     email:          str = Body(),
     password:       str = Body(),
     auth_service:   AuthService = Depends(get_auth_service)
-) -> UserResponse:
+) -> DTOResponse:
+    check_rate_limits(
+        (register_ip_rate_limiter, get_client_ip(request)),
+        (register_email_rate_limiter, normalize_email(email)),
+    )
     try:
         new_user = await auth_service.register_user(
             email=email,
             password=password,
+            client_ip=get_client_ip(request),
         )
     except UserAlreadyRegistred as ex:
         raise HTTPException(409, detail=ex.message)
+    except DatabaseUnavailable:
+        raise
     except Exception as ex:
         logger.error(ex)
         raise HTTPException(500, detail="User registration failed")
     
-    return UserResponse(
-        id=new_user.id,
-        email=new_user.email
+    return DTOResponse(
+        UserDTO(
+            id=new_user.id,
+            email=new_user.email
+        )
     )
     
     
-@router.post("/refresh")
+@router.get("/availability", response_model=AvailabilityResponse, response_class=DTOResponse)
+async def check_email_availability(
+    request:        Request,
+    email:          str = Query(min_length=1, max_length=320),
+    auth_service:   AuthService = Depends(get_auth_service),
+) -> DTOResponse:
+    # NOTE: Advisory, registration still checks the database.
+    check_rate_limits((availability_ip_rate_limiter, get_client_ip(request)))
+    
+    return DTOResponse({
+        "email": email,
+        "available": await auth_service.is_email_available(email=email),
+    })
+    
+    
+@router.post("/refresh", response_model=TokensResponse, response_class=DTOResponse)
 async def refresh_tokens(
+    request: Request,
     token_payload: dict = Depends(verify_refresh_token),
+    credentials: HTTPAuthorizationCredentials = Depends(bearer_refresh_token),
     auth_service: AuthService = Depends(get_auth_service)
-) -> TokensResponse:
-    new_tokens = await auth_service.refresh_tokens(user_id=int(token_payload['sub']))
-    return TokensResponse(
-        access_token=new_tokens.access_token,
-        refresh_token=new_tokens.refresh_token,
+) -> DTOResponse:
+    try:
+        new_tokens = await auth_service.rotate_refresh_token(
+            user_id=int(token_payload['sub']),
+            refresh_token=credentials.credentials,
+            token_version=token_payload.get('ver', 0),
+            client_ip=get_client_ip(request),
+        )
+    except RefreshTokenNotFound:
+        raise HTTPException(401, detail="Invalid token")
+    return DTOResponse(new_tokens)
+    
+    
+@router.post("/logout", status_code=204)
+async def logout(
+    token_payload:  dict = Depends(verify_access_token),
+    auth_service:   AuthService = Depends(get_auth_service)
+):
+    await auth_service.logout_user(
+        user_id=int(token_payload['sub']),
+        jti=token_payload.get('jti'),
+        expires_at=datetime.fromtimestamp(token_payload['exp'], timezone.utc),
+    )
+
+
+@router.post("/logout-all", status_code=204)
+async def logout_all(
+    token_payload:  dict = Depends(verify_access_token),
+    auth_service:   AuthService = Depends(get_auth_service)
+):
+    try:
+        await auth_service.revoke_sessions(user_id=int(token_payload['sub']))
+    except UserNotFound as ex:
+        raise HTTPException(404, detail=ex.message)
+
+
+@router.post("/revoke", status_code=204)
+async def revoke_token(
+    token:              str = Body(embed=True),
+    token_payload:      dict = Depends(verify_access_token),
+    tokens_validator:   JWTTokensValidator = Depends(get_tokens_validator),
+    auth_service:       AuthService = Depends(get_auth_service)
+):
+    try:
+        revoked_payload = tokens_validator.decode_token(token)
+    except TokenExpired:
+        logger.debug("Token already expired, nothing to revoke")
+        return
+    except InvalidToken:
+        raise HTTPException(400, detail="Invalid token")
+    
+    is_admin = int(token_payload['sub']) in settings.ADMIN_USER_IDS
+    if revoked_payload['sub'] != token_payload['sub'] and not is_admin:
+        raise HTTPException(403, detail="Forbidden")
+    
+    if "jti" not in revoked_payload:
+        raise HTTPException(400, detail="Token can't be revoked")
+    
+    await auth_service.revoke_token(
+        jti=revoked_payload['jti'],
+        expires_at=datetime.fromtimestamp(revoked_payload['exp'], timezone.utc),
     )
@@ -4,3 +4,8 @@ from pydantic import BaseModel
 class TokensResponse(BaseModel):
     access_token:   str
     refresh_token:  str
+
+
+class AvailabilityResponse(BaseModel):
+    email:      str
+    available:  bool
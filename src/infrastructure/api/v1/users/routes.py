@@ -1,24 +1,145 @@
-from fastapi import APIRouter, Depends, HTTPException
+from typing import AsyncIterator
+from loguru import logger
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 
-from .schemas import UserResponse
+from settings import settings
+from .schemas import ImportReportResponse, UserResponse, UsersBatchResponse, UsersPageResponse
 from src.services.exc import UserNotFound
-from src.infrastructure.api.dependencies import UsersService, get_users_service, verify_access_token
+from src.domain.repositories.exc import DatabaseUnavailable
+from src.services.users.dto import ImportReportDTO
+from src.infrastructure.api.responses import DTOResponse, dump_dto
+from src.infrastructure.tools.users_import import ImportFormats, parse_users
+from src.infrastructure.api.dependencies import (
+    AuthService,
+    UsersService,
+    UsersImportService,
+    get_auth_service,
+    get_export_users_service,
+    get_users_service,
+    get_users_import_service,
+    verify_access_token,
+    verify_admin_access_token,
+)
 
 
 router = APIRouter(prefix="/users", tags=["Users"])
 
 
-@router.get("/me")
+@router.get("/me", response_model=UserResponse, response_class=DTOResponse)
 async def get_current_user(
     current_user:   dict = Depends(verify_access_token),
     users_service:  UsersService = Depends(get_users_service)
-) -> UserResponse:
+) -> DTOResponse:
     try:
         user = await users_service.get_user(id=int(current_user["sub"]))
     except UserNotFound as ex:
         raise HTTPException(400, detail=ex.message)
     
-    return UserResponse(
-        id=user.id,
-        email=user.email
-    )
+    return DTOResponse(user)
+
+
+@router.get(
+    "",
+    dependencies=[Depends(verify_admin_access_token)],
+    response_model=UsersPageResponse,
+    response_class=DTOResponse,
+)
+async def list_users(
+    after_id:       int | None = Query(None, description="Id of the last user of the previous page"),
+    limit:          int = Query(100, ge=1, le=settings.USERS_PAGE_MAX_LIMIT),
+    users_service:  UsersService = Depends(get_users_service),
+) -> DTOResponse:
+    users_page = await users_service.list_users(after_id=after_id, limit=limit)
+    
+    return DTOResponse(users_page)
+
+
+@router.post(
+    "/batch",
+    dependencies=[Depends(verify_admin_access_token)],
+    response_model=UsersBatchResponse,
+    response_class=DTOResponse,
+)
+async def get_users_batch(
+    ids:            list[int] = Body(embed=True, min_length=1, max_length=settings.USERS_BATCH_MAX_IDS),
+    users_service:  UsersService = Depends(get_users_service),
+) -> DTOResponse:
+    users_batch = await users_service.get_users(ids=ids)
+    
+    return DTOResponse(users_batch)
+
+
+@router.get(
+    "/export",
+    dependencies=[Depends(verify_admin_access_token)],
+    response_class=StreamingResponse,
+    responses={200: {"content": {"application/x-ndjson": {}}}},
+)
+async def export_users(
+    users_service:  UsersService = Depends(get_export_users_service),
+) -> StreamingResponse:
+    batch_size = settings.USERS_EXPORT_BATCH_SIZE
+    
+    async def generate_ndjson() -> AsyncIterator[bytes]:
+        lines = []
+        async for user in users_service.export_users(batch_size=batch_size):
+            lines.append(dump_dto(user))
+            if len(lines) >= batch_size:
+                yield b"\n".join(lines) + b"\n"
+                lines = []
+        
+        if lines:
+            yield b"\n".join(lines) + b"\n"
+    
+    return StreamingResponse(generate_ndjson(), media_type="application/x-ndjson")
+
+
+@router.post(
+    "/import",
+    dependencies=[Depends(verify_admin_access_token)],
+    response_model=ImportReportResponse,
+    response_class=DTOResponse,
+)
+async def import_users(
+    request:                Request,
+    import_format:          ImportFormats = Query(ImportFormats.NDJSON, alias="format"),
+    skip:                   int = Query(0, ge=0, description="Records processed by the previous run"),
+    users_import_service:   UsersImportService = Depends(get_users_import_service),
+) -> DTOResponse:
+    last_checkpoint = ImportReportDTO(processed=skip)
+    
+    async def save_checkpoint(report: ImportReportDTO):
+        nonlocal last_checkpoint
+        last_checkpoint = report
+    
+    try:
+        report = await users_import_service.import_users(
+            records=parse_users(request.stream(), import_format),
+            report=last_checkpoint,
+            on_checkpoint=save_checkpoint,
+        )
+    except UnicodeDecodeError:
+        raise HTTPException(400, detail=f"Body must be UTF-8 encoded, resume with skip={last_checkpoint.processed}")
+    except DatabaseUnavailable:
+        raise
+    except Exception as ex:
+        logger.error(f"{type(ex)}: {ex}")
+        raise HTTPException(500, detail=f"Users import failed, resume with skip={last_checkpoint.processed}")
+    
+    return DTOResponse(report)
+
+
+@router.post(
+    "/{user_id}/revoke-sessions",
+    dependencies=[Depends(verify_admin_access_token)],
+    status_code=204,
+)
+async def revoke_user_sessions(
+    user_id:        int,
+    auth_service:   AuthService = Depends(get_auth_service),
+):
+    try:
+        await auth_service.revoke_sessions(user_id=user_id)
+    except UserNotFound as ex:
+        raise HTTPException(404, detail=ex.message)
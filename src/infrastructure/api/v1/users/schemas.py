@@ -4,3 +4,21 @@ from pydantic import BaseModel
 class UserResponse(BaseModel):
     id:     int
     email:  str
+
+
+class UsersPageResponse(BaseModel):
+    items:          list[UserResponse]
+    next_after_id:  int | None
+
+
+class UsersBatchResponse(BaseModel):
+    items:      dict[str, UserResponse]
+    not_found:  list[int]
+
+
+class ImportReportResponse(BaseModel):
+    processed:  int
+    imported:   int
+    duplicates: int
+    existing:   int
+    invalid:    int
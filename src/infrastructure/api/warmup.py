@@ -0,0 +1,72 @@
+import asyncio
+from contextlib import AsyncExitStack
+
+from fastapi import FastAPI
+from loguru import logger
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, AsyncSession
+
+from settings import settings
+from src.domain.repositories.exc import RefreshTokenNotFound, UserNotFound
+from src.infrastructure.database.repositories.users import SqlAlchemyUsersRepo
+from .dependencies import get_tokens_generator
+from src.infrastructure.tools.password_manager import get_password_manager
+from src.infrastructure.tools.tokens_tools import JWTTokensValidator
+
+
+async def _warm_up_connection(connection: AsyncConnection):
+    # NOTE: Runs the hot statements of the service, so they are compiled and
+    # cached by SQLAlchemy and prepared by the driver on this connection.
+    async with AsyncSession(bind=connection) as session:
+        users_repo = SqlAlchemyUsersRepo(session)
+        for warm_up_query in (
+            lambda: users_repo.get_by_email(email="warmup@localhost"),
+            lambda: users_repo.get_by_id(id=0),
+            lambda: users_repo.get_refresh_token(user_id=0),
+        ):
+            try:
+                await warm_up_query()
+            except (UserNotFound, RefreshTokenNotFound):
+                ...
+
+        await users_repo.is_token_revoked(jti="warmup")
+        await session.rollback()
+
+
+async def warm_up_database(engine: AsyncEngine):
+    # NOTE: All connections are opened at once, so the whole pool is filled.
+    connections_count = getattr(engine.pool, "size", lambda: 1)()
+    async with AsyncExitStack() as stack:
+        connections = await asyncio.gather(*(
+            stack.enter_async_context(engine.connect())
+            for _ in range(connections_count)
+        ))
+        await asyncio.gather(*(_warm_up_connection(connection) for connection in connections))
+
+    logger.debug(f"Database warmed up with {connections_count} connections")
+
+
+def warm_up_tools():
+    tokens_generator = get_tokens_generator()
+    JWTTokensValidator(secret_key=settings.SECRET_KEY).validate_access_token(
+        tokens_generator.generate_access_token(sub=0)
+    )
+
+    password_manager = get_password_manager()
+    password_manager.verify_password("warmup", password_manager.hash_password("warmup"))
+
+
+async def warm_up(app: FastAPI, api: FastAPI, engine: AsyncEngine):
+    app.state.ready = False
+    while True:
+        try:
+            await warm_up_database(engine)
+            await asyncio.to_thread(warm_up_tools)
+            api.openapi()
+            app.openapi()
+            break
+        except Exception as ex:
+            logger.error(f"Warm up failed: {type(ex)}: {ex}")
+            await asyncio.sleep(settings.WARMUP_RETRY_INTERVAL_SECONDS)
+
+    app.state.ready = True
+    logger.info("Application warmed up and ready")
@@ -0,0 +1,77 @@
+import asyncio
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+from loguru import logger
+
+from settings import settings
+from src.services.users.import_service import UsersImportService
+from src.infrastructure.database import async_session_maker, dispose_engine, init_engine
+from src.infrastructure.database.uof import SQLAlchemyUnitOfWork
+from src.infrastructure.database.repositories.users import SqlAlchemyUsersRepo
+from src.infrastructure.tools.password_manager import get_password_manager
+from src.infrastructure.tools.users_import import ImportCheckpoint, ImportFormats, parse_users, read_file_chunks
+
+
+def add_parser(subparsers):
+    parser = subparsers.add_parser("import-users", help="Bulk import users from NDJSON or CSV file")
+    parser.add_argument("path", help="Path to the file with users")
+    parser.add_argument(
+        "--format",
+        dest="import_format",
+        choices=[import_format.value for import_format in ImportFormats],
+        help="File format, detected by extension if omitted",
+    )
+    parser.add_argument("--checkpoint", help="Path to the checkpoint file (default: <path>.checkpoint)")
+    parser.add_argument("--batch-size", type=int, default=settings.IMPORT_BATCH_SIZE)
+    parser.add_argument("--workers", type=int, default=settings.IMPORT_HASH_WORKERS)
+    parser.set_defaults(handler=run)
+
+
+def run(args: argparse.Namespace):
+    if args.import_format:
+        import_format = ImportFormats(args.import_format)
+    elif args.path.endswith(".csv"):
+        import_format = ImportFormats.CSV
+    else:
+        import_format = ImportFormats.NDJSON
+
+    asyncio.run(
+        import_users(
+            path=args.path,
+            import_format=import_format,
+            checkpoint=ImportCheckpoint(args.checkpoint or f"{args.path}.checkpoint"),
+            batch_size=args.batch_size,
+            workers=args.workers,
+        )
+    )
+
+
+async def import_users(
+    path:           str,
+    import_format:  ImportFormats,
+    checkpoint:     ImportCheckpoint,
+    batch_size:     int,
+    workers:        int | None,
+):
+    report = checkpoint.load()
+    if report:
+        logger.info(f"Resuming import from checkpoint '{checkpoint.path}': {report}")
+
+    init_engine()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        users_import_service = UsersImportService(
+            unit_of_work=SQLAlchemyUnitOfWork(
+                async_session_maker=async_session_maker,
+                users_repo_class=SqlAlchemyUsersRepo,
+            ),
+            password_manager=get_password_manager(),
+            hashing_executor=executor,
+            batch_size=batch_size,
+        )
+        await users_import_service.import_users(
+            records=parse_users(read_file_chunks(path), import_format),
+            report=report,
+            on_checkpoint=checkpoint.save,
+        )
+    await dispose_engine()
@@ -0,0 +1,76 @@
+import os
+import argparse
+import importlib
+import importlib.util
+
+import uvicorn
+from loguru import logger
+from alembic import command
+from alembic.config import Config
+
+from settings import settings
+from src.infrastructure.tools.shared_state import SharedStateStore
+
+
+APP_IMPORT_STRING = "src.infrastructure.api.app:app"
+
+
+def add_parser(subparsers):
+    parser = subparsers.add_parser("serve", help="Run production server with multiple workers")
+    parser.add_argument("--host", default=settings.SERVER_HOST)
+    parser.add_argument("--port", type=int, default=settings.SERVER_PORT)
+    parser.add_argument("--workers", type=int, default=settings.SERVER_WORKERS, help="Default: number of available CPUs")
+    parser.add_argument("--no-migrate", action="store_true", help="Don't apply migrations before start")
+    parser.set_defaults(handler=run)
+
+
+def get_workers_count() -> int:
+    # NOTE: CPUs available to the process (cgroups/affinity aware),
+    # not the number of CPUs of the host.
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+
+    return os.cpu_count() or 1
+
+
+def run_migrations():
+    logger.info("Applying migrations")
+    command.upgrade(Config("alembic.ini"), "head")
+
+
+def run(args: argparse.Namespace):
+    # NOTE: Migrations are applied once in the supervisor process,
+    # before workers are started, so workers never race on them.
+    if not args.no_migrate:
+        run_migrations()
+
+    # NOTE: State of the previous run is dropped before workers are started,
+    # they open the file in the app lifespan (importing the app doesn't).
+    if settings.SHARED_STATE_PATH:
+        SharedStateStore.remove(settings.SHARED_STATE_PATH)
+
+    # NOTE: uvicorn starts workers with "spawn", so every worker imports the app
+    # (and creates its own engine) by itself. The app is imported here as well
+    # to fail fast on a broken app before any worker is started.
+    module_name, _ = APP_IMPORT_STRING.split(":")
+    importlib.import_module(module_name)
+
+    workers = args.workers or get_workers_count()
+    loop = "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+    http = "httptools" if importlib.util.find_spec("httptools") else "h11"
+    logger.info(f"Starting {workers} workers on {args.host}:{args.port} ({loop=}, {http=})")
+
+    # NOTE: On SIGTERM uvicorn stops accepting connections and waits up to
+    # `timeout_graceful_shutdown` for in-flight requests, then the app lifespan
+    # shutdown disposes the engine of every worker.
+    uvicorn.run(
+        APP_IMPORT_STRING,
+        host=args.host,
+        port=args.port,
+        workers=workers,
+        loop=loop,
+        http=http,
+        timeout_graceful_shutdown=settings.SERVER_GRACEFUL_SHUTDOWN_SECONDS,
+        proxy_headers=True,
+        forwarded_allow_ips=settings.SERVER_FORWARDED_ALLOW_IPS,
+    )
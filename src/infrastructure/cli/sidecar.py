@@ -0,0 +1,73 @@
+import asyncio
+import argparse
+from functools import partial
+
+from settings import settings
+from src.infrastructure.database import dispose_engine, init_engine, listen
+from src.infrastructure.database.repositories.users import TOKEN_VERSIONS_CHANNEL
+from src.infrastructure.api.dependencies import create_unit_of_work, get_tokens_validator
+from src.infrastructure.tools.tokens_denylist import TokensDenylist
+from src.infrastructure.tools.token_versions_cache import TokenVersionsCache
+from src.infrastructure.tools.tokens_sidecar import TokensSidecarServer
+
+
+def add_parser(subparsers):
+    parser = subparsers.add_parser("sidecar", help="Verify access tokens over a Unix domain socket")
+    parser.add_argument("--socket", default=settings.SIDECAR_SOCKET_PATH)
+    parser.add_argument("--no-denylist", action="store_true", help="Don't check revoked tokens")
+    parser.set_defaults(handler=run)
+
+
+def run(args: argparse.Namespace):
+    try:
+        asyncio.run(serve_sidecar(socket_path=args.socket, check_revoked=not args.no_denylist))
+    except KeyboardInterrupt:
+        pass
+
+
+async def serve_sidecar(socket_path: str, check_revoked: bool):
+    tokens_denylist = None
+    token_versions_cache = None
+    background_tasks = []
+    if check_revoked:
+        engine = init_engine()
+        tokens_denylist = TokensDenylist(
+            capacity=settings.REVOKED_TOKENS_FILTER_CAPACITY,
+            error_rate=settings.REVOKED_TOKENS_FILTER_ERROR_RATE,
+        )
+        token_versions_cache = TokenVersionsCache(
+            ttl_seconds=settings.TOKEN_VERSIONS_CACHE_TTL_SECONDS,
+            max_size=settings.TOKEN_VERSIONS_CACHE_MAX_SIZE,
+        )
+        background_tasks.append(
+            asyncio.create_task(
+                tokens_denylist.run_sync_loop(
+                    unit_of_work_factory=create_unit_of_work,
+                    interval_seconds=settings.REVOKED_TOKENS_SYNC_INTERVAL_SECONDS,
+                )
+            )
+        )
+        if engine.dialect.driver == "asyncpg":
+            background_tasks.append(
+                asyncio.create_task(
+                    token_versions_cache.run_listen_loop(
+                        listen=partial(listen, TOKEN_VERSIONS_CHANNEL),
+                        retry_interval_seconds=settings.TOKEN_VERSIONS_LISTEN_RETRY_SECONDS,
+                    )
+                )
+            )
+
+    sidecar = TokensSidecarServer(
+        tokens_validator=get_tokens_validator(),
+        tokens_denylist=tokens_denylist,
+        unit_of_work_factory=create_unit_of_work,
+        token_versions_cache=token_versions_cache,
+        max_token_size=settings.SIDECAR_MAX_TOKEN_BYTES,
+    )
+    try:
+        await sidecar.serve(socket_path=socket_path)
+    finally:
+        for task in background_tasks:
+            task.cancel()
+        if check_revoked:
+            await dispose_engine()
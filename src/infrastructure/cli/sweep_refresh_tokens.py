@@ -0,0 +1,37 @@
+import asyncio
+import argparse
+
+from settings import settings
+from src.infrastructure.database import async_session_maker, dispose_engine, init_engine
+from src.infrastructure.database.uof import SQLAlchemyUnitOfWork
+from src.infrastructure.database.repositories.users import SqlAlchemyUsersRepo
+from src.infrastructure.tools.refresh_tokens_sweeper import RefreshTokensSweeper
+
+
+def add_parser(subparsers):
+    parser = subparsers.add_parser("sweep-refresh-tokens", help="Delete expired refresh tokens once (e.g. from cron)")
+    parser.add_argument("--batch-size", type=int, default=settings.REFRESH_TOKENS_SWEEP_BATCH_SIZE)
+    parser.add_argument("--batch-pause", type=float, default=settings.REFRESH_TOKENS_SWEEP_BATCH_PAUSE_SECONDS)
+    parser.set_defaults(handler=run)
+
+
+def run(args: argparse.Namespace):
+    asyncio.run(
+        sweep_refresh_tokens(
+            refresh_tokens_sweeper=RefreshTokensSweeper(
+                batch_size=args.batch_size,
+                batch_pause_seconds=args.batch_pause,
+            )
+        )
+    )
+
+
+async def sweep_refresh_tokens(refresh_tokens_sweeper: RefreshTokensSweeper):
+    init_engine()
+    await refresh_tokens_sweeper.sweep(
+        unit_of_work_factory=lambda: SQLAlchemyUnitOfWork(
+            async_session_maker=async_session_maker,
+            users_repo_class=SqlAlchemyUsersRepo,
+        )
+    )
+    await dispose_engine()
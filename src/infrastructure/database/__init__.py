@@ -1,8 +1,124 @@
-from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+import asyncio
+from typing import Callable
+
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
 from settings import settings
+from .query_counter import install_query_counter
+from .sqlite import WRITER_ENGINE_KEY, SQLiteSession, install_sqlite_pragmas, is_sqlite, is_sqlite_file
+
+# NOTE: The engine is created by the app lifespan (or by CLI commands) with
+# `init_engine` and disposed with `dispose_engine`, the session maker is
+# created unbound and bound to the engine on init.
+engine: AsyncEngine | None = None
+# NOTE: SQLite database files only, writes go through it (see `SQLiteSession`).
+writer_engine: AsyncEngine | None = None
+async_session_maker = async_sessionmaker()
+
+
+def get_engine_options(dsn: str) -> dict:
+    if is_sqlite(dsn) and not is_sqlite_file(dsn):
+        return {}
+
+    # NOTE: A request waits for a pooled connection at most
+    # `DB_POOL_TIMEOUT_SECONDS`, instead of queueing behind a slow database.
+    options = {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+    }
+    if make_url(dsn).get_driver_name() == "asyncpg":
+        # NOTE: The server cancels statements running longer than
+        # `DB_STATEMENT_TIMEOUT_MS`, bulk operations override it per
+        # transaction (see `SQLAlchemyUnitOfWork`).
+        options["connect_args"] = {
+            "timeout": settings.DB_CONNECT_TIMEOUT_SECONDS,
+            "server_settings": {"statement_timeout": str(settings.DB_STATEMENT_TIMEOUT_MS)},
+        }
+
+    return options
+
+
+def init_engine(dsn: str | None = None) -> AsyncEngine:
+    global engine
+    if engine is None:
+        dsn = dsn or settings.POSTGRES_DSN
+        engine = create_async_engine(dsn, **get_engine_options(dsn))
+        install_query_counter(engine)
+        async_session_maker.configure(bind=engine)
+        if is_sqlite(dsn):
+            init_sqlite_writer_engine(dsn)
+
+    return engine
+
+
+def init_sqlite_writer_engine(dsn: str):
+    # NOTE: In-memory databases are per connection, they keep a single engine.
+    global writer_engine
+    install_sqlite_pragmas(engine, query_only=is_sqlite_file(dsn))
+    if not is_sqlite_file(dsn):
+        return
+
+    writer_engine = create_async_engine(
+        dsn,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=settings.SQLITE_WRITE_TIMEOUT_SECONDS,
+    )
+    install_sqlite_pragmas(writer_engine)
+    install_query_counter(writer_engine)
+    async_session_maker.configure(
+        sync_session_class=SQLiteSession,
+        info={WRITER_ENGINE_KEY: writer_engine.sync_engine},
+    )
+
+
+async def dispose_engine():
+    global engine, writer_engine
+    if writer_engine is not None:
+        await writer_engine.dispose()
+        writer_engine = None
+        async_session_maker.configure(sync_session_class=None, info=None)
+    if engine is not None:
+        await engine.dispose()
+        engine = None
+
+
+def get_pool_stats() -> dict:
+    if engine is None:
+        return {}
+
+    pool = engine.pool
+    if not hasattr(pool, "checkedout"):
+        return {"status": pool.status()}
+
+    return {
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+    }
+
+
+async def listen(channel: str, callback: Callable[[str], None]):
+    # NOTE: PostgreSQL (asyncpg) LISTEN, `callback` gets notifications payloads.
+    # Holds one pooled connection until cancelled or the connection is lost.
+    async with engine.connect() as connection:
+        raw_connection = await connection.get_raw_connection()
+        driver_connection = raw_connection.driver_connection
+        connection_lost = asyncio.Event()
+
+        def on_notification(_connection, _pid, _channel, payload):
+            callback(payload)
 
-engine = create_async_engine(settings.POSTGRES_DSN)
-async_session_maker = async_sessionmaker(bind=engine)
+        await driver_connection.add_listener(channel, on_notification)
+        driver_connection.add_termination_listener(lambda *args: connection_lost.set())
+        try:
+            await connection_lost.wait()
+        finally:
+            if not driver_connection.is_closed():
+                await driver_connection.remove_listener(channel, on_notification)
+        raise ConnectionError(f"Connection listening '{channel}' is lost")
 
 
 async def get_async_session():
@@ -2,6 +2,7 @@ from logging.config import fileConfig
 
 from sqlalchemy import engine_from_config
 from sqlalchemy import pool
+from sqlalchemy.engine import make_url
 
 from alembic import context
 
@@ -11,7 +12,19 @@ from src.infrastructure.database.models import *
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
 config = context.config
-config.set_main_option('sqlalchemy.url', settings.POSTGRES_DSN + "?async_fallback=True")
+
+
+def get_migrations_url(dsn: str) -> str:
+    # NOTE: Migrations run synchronously, aiosqlite has no sync fallback,
+    # so SQLite databases are migrated with the stdlib driver.
+    url = make_url(dsn)
+    if url.get_backend_name() == "sqlite":
+        return url.set(drivername="sqlite").render_as_string(hide_password=False)
+
+    return url.update_query_dict({"async_fallback": "True"}).render_as_string(hide_password=False)
+
+
+config.set_main_option('sqlalchemy.url', get_migrations_url(settings.POSTGRES_DSN).replace("%", "%%"))
 
 # Interpret the config file for Python logging.
 # This line sets up loggers basically.
@@ -68,8 +81,12 @@ def run_migrations_online() -> None:
     )
 
     with connectable.connect() as connection:
+        # NOTE: SQLite can't alter columns, batch operations
+        # recreate the table there and are plain ALTERs elsewhere.
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection,
+            target_metadata=target_metadata,
+            render_as_batch=connection.dialect.name == "sqlite",
         )
 
         with context.begin_transaction():
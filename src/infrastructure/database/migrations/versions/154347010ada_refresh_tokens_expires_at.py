@@ -0,0 +1,51 @@
+"""refresh tokens expires_at
+
+Revision ID: 154347010ada
+Revises: 0d3f68ceb3b0
+Create Date: 2026-10-19 10:03:27.918442
+
+"""
+from datetime import datetime, timedelta, timezone
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from settings import settings
+
+
+# revision identifiers, used by Alembic.
+revision: str = '154347010ada'
+down_revision: Union[str, Sequence[str], None] = '0d3f68ceb3b0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # NOTE: Existing tokens get an upper bound of their expiration instead of
+    # their own `exp` claim: none of them outlives "now + refresh lifetime".
+    # A constant default is set without rewriting the table (PostgreSQL 11+),
+    # no row is read or updated one by one. Tokens that are already expired
+    # are deleted by the sweeper once the bound has passed.
+    expires_at_bound = datetime.now(timezone.utc) + timedelta(minutes=settings.REFRESH_TOKEN_EXPIRE_MINUTES)
+    op.add_column(
+        'refresh_tokens',
+        sa.Column(
+            'expires_at',
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.literal(expires_at_bound, sa.DateTime(timezone=True)),
+        ),
+    )
+
+    with op.batch_alter_table('refresh_tokens') as batch_op:
+        batch_op.alter_column('expires_at', server_default=None)
+    op.create_index(op.f('ix_refresh_tokens_expires_at'), 'refresh_tokens', ['expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_refresh_tokens_expires_at'), table_name='refresh_tokens')
+    with op.batch_alter_table('refresh_tokens') as batch_op:
+        batch_op.drop_column('expires_at')
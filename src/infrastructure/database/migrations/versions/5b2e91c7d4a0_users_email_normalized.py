@@ -0,0 +1,59 @@
+"""users email_normalized
+
+Revision ID: 5b2e91c7d4a0
+Revises: 154347010ada
+Create Date: 2026-10-19 11:42:05.310274
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b2e91c7d4a0'
+down_revision: Union[str, Sequence[str], None] = '154347010ada'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+users = sa.table(
+    'users',
+    sa.column('email', sa.String()),
+    sa.column('email_normalized', sa.String()),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('users', sa.Column('email_normalized', sa.String(), nullable=True))
+    op.execute(users.update().values(email_normalized=sa.func.lower(sa.func.trim(users.c.email))))
+
+    # Emails differing only by case or surrounding spaces must be merged by hand
+    # before the unique index can be created.
+    connection = op.get_bind()
+    duplicates = connection.execute(
+        sa.select(users.c.email_normalized)
+        .group_by(users.c.email_normalized)
+        .having(sa.func.count() > 1)
+    ).scalars().all()
+    if duplicates:
+        raise RuntimeError(f"Duplicate users emails after normalization: {duplicates}")
+
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.alter_column('email_normalized', nullable=False)
+    op.create_index(
+        'ix_users_email_normalized',
+        'users',
+        ['email_normalized'],
+        unique=True,
+        postgresql_include=['id', 'email', 'password_hash'],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_users_email_normalized', table_name='users')
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.drop_column('email_normalized')
@@ -0,0 +1,47 @@
+"""users token_version
+
+Revision ID: 9c4d7e2a1f35
+Revises: 5b2e91c7d4a0
+Create Date: 2026-10-19 13:08:41.527093
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c4d7e2a1f35'
+down_revision: Union[str, Sequence[str], None] = '5b2e91c7d4a0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('users', sa.Column('token_version', sa.Integer(), server_default='0', nullable=False))
+
+    # The login covering index includes the new column, so it is rebuilt.
+    op.drop_index('ix_users_email_normalized', table_name='users')
+    op.create_index(
+        'ix_users_email_normalized',
+        'users',
+        ['email_normalized'],
+        unique=True,
+        postgresql_include=['id', 'email', 'password_hash', 'token_version'],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_users_email_normalized', table_name='users')
+    op.create_index(
+        'ix_users_email_normalized',
+        'users',
+        ['email_normalized'],
+        unique=True,
+        postgresql_include=['id', 'email', 'password_hash'],
+    )
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.drop_column('token_version')
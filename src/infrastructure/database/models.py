@@ -1,4 +1,5 @@
-from sqlalchemy import ForeignKey, Integer, String
+from datetime import datetime
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, LargeBinary, String
 from sqlalchemy.orm import Mapped, mapped_column, DeclarativeBase
 
 
@@ -8,10 +9,21 @@ class Base(DeclarativeBase):
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        # NOTE: Covering index, login lookup by email is an index-only scan.
+        Index(
+            "ix_users_email_normalized",
+            "email_normalized",
+            unique=True,
+            postgresql_include=["id", "email", "password_hash", "token_version"],
+        ),
+    )
     
-    id:             Mapped[int] = mapped_column(Integer, primary_key=True)
-    email:          Mapped[str] = mapped_column(String, nullable=False)
-    password_hash:  Mapped[str] = mapped_column(String, nullable=False)
+    id:                 Mapped[int] = mapped_column(Integer, primary_key=True)
+    email:              Mapped[str] = mapped_column(String, nullable=False)
+    email_normalized:   Mapped[str] = mapped_column(String, nullable=False)
+    password_hash:      Mapped[str] = mapped_column(String, nullable=False)
+    token_version:      Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
     
     
 class RefreshToken(Base):
@@ -20,3 +32,37 @@ class RefreshToken(Base):
     id:         Mapped[int] = mapped_column(Integer, primary_key=True)
     token:      Mapped[str] = mapped_column(String, nullable=False)
     user_id:    Mapped[int] = mapped_column(Integer, ForeignKey("users.id", ondelete="CASCADE"))
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, index=True)
+    
+    
+class RevokedToken(Base):
+    __tablename__ = "revoked_tokens"
+    
+    jti:        Mapped[str] = mapped_column(String, primary_key=True)
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, index=True)
+    
+    
+class AuditEvent(Base):
+    __tablename__ = "audit_events"
+    
+    # NOTE: No foreign key to users, the trail outlives deleted users
+    # and failed logins may have no user at all.
+    id:         Mapped[int] = mapped_column(Integer, primary_key=True)
+    event_type: Mapped[str] = mapped_column(String, nullable=False)
+    user_id:    Mapped[int | None] = mapped_column(Integer, nullable=True, index=True)
+    email:      Mapped[str | None] = mapped_column(String, nullable=True)
+    client_ip:  Mapped[str | None] = mapped_column(String, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, index=True)
+    
+    
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_keys"
+    
+    # NOTE: Stored responses of requests with an `Idempotency-Key`,
+    # key is "<path>:<caller hash>:<header value>".
+    key:            Mapped[str] = mapped_column(String, primary_key=True)
+    fingerprint:    Mapped[str] = mapped_column(String, nullable=False)
+    status_code:    Mapped[int] = mapped_column(Integer, nullable=False)
+    content_type:   Mapped[str] = mapped_column(String, nullable=False)
+    body:           Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    expires_at:     Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, index=True)
@@ -0,0 +1,99 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Iterator
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+
+@dataclass
+class QueryStats:
+    # NOTE: `count` is the number of database round trips: statements,
+    # commits and rollbacks. Statements are recorded only if asked, for tests.
+    count:              int = 0
+    duration_seconds:   float = 0
+    record_statements:  bool = False
+    statements:         list[str] = field(default_factory=list)
+
+    def add(self, statement: str, duration_seconds: float):
+        self.count += 1
+        self.duration_seconds += duration_seconds
+        if self.record_statements:
+            self.statements.append(statement)
+
+
+# NOTE: SQLAlchemy runs the sync engine events in a greenlet sharing the
+# context of the calling task, so the stats of the current request are found.
+_query_stats: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+
+
+def get_query_stats() -> QueryStats | None:
+    return _query_stats.get()
+
+
+@contextmanager
+def track_queries(record_statements: bool = False) -> Iterator[QueryStats]:
+    query_stats = QueryStats(record_statements=record_statements)
+    token = _query_stats.set(query_stats)
+    try:
+        yield query_stats
+    finally:
+        _query_stats.reset(token)
+
+
+@contextmanager
+def assert_max_queries(max_count: int) -> Iterator[QueryStats]:
+    # NOTE: Test helper, the engine must have the counter installed.
+    with track_queries(record_statements=True) as query_stats:
+        yield query_stats
+
+    if query_stats.count > max_count:
+        statements = "\n".join(f"  {statement}" for statement in query_stats.statements)
+        raise AssertionError(f"{query_stats.count} queries executed, {max_count} expected at most:\n{statements}")
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started_at = conn.info["query_started_at"].pop()
+    query_stats = _query_stats.get()
+    if query_stats is not None:
+        query_stats.add(statement, time.perf_counter() - started_at)
+
+
+def _handle_error(exception_context):
+    # NOTE: Failed statements are counted too, they are round trips as well.
+    conn = exception_context.connection
+    if conn is None or not conn.info.get("query_started_at"):
+        return
+
+    started_at = conn.info["query_started_at"].pop()
+    query_stats = _query_stats.get()
+    if query_stats is not None:
+        query_stats.add(exception_context.statement or "", time.perf_counter() - started_at)
+
+
+def _count_transaction_end(statement: str):
+    def listener(conn):
+        query_stats = _query_stats.get()
+        if query_stats is not None:
+            query_stats.add(statement, 0)
+
+    return listener
+
+
+def install_query_counter(engine: AsyncEngine | Engine):
+    sync_engine = engine.sync_engine if isinstance(engine, AsyncEngine) else engine
+    if event.contains(sync_engine, "before_cursor_execute", _before_cursor_execute):
+        return
+
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(sync_engine, "handle_error", _handle_error)
+    event.listen(sync_engine, "commit", _count_transaction_end("COMMIT"))
+    event.listen(sync_engine, "rollback", _count_transaction_end("ROLLBACK"))
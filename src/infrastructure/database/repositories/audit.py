@@ -0,0 +1,32 @@
+from dataclasses import dataclass
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.domain.entities.audit import AuditEvent
+from src.domain.repositories.audit.interface import IAuditRepo
+
+from ..models import AuditEvent as AuditEventDBModel
+
+
+@dataclass
+class SqlAlchemyAuditRepo(IAuditRepo):
+    _session: AsyncSession
+        
+    async def add_events(self, events: list[AuditEvent]) -> int:
+        if not events:
+            return 0
+        
+        # NOTE: One multi-row INSERT ... VALUES, a single round trip per batch.
+        stmt = insert(AuditEventDBModel).values([
+            {
+                "event_type": event.event_type.value,
+                "user_id": event.user_id,
+                "email": event.email,
+                "client_ip": event.client_ip,
+                "created_at": event.created_at,
+            }
+            for event in events
+        ])
+        await self._session.execute(stmt)
+        
+        return len(events)
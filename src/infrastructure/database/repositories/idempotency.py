@@ -0,0 +1,72 @@
+from datetime import datetime, timezone
+from dataclasses import dataclass
+from sqlalchemy import delete, insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.domain.entities.idempotency import IdempotentResponse
+from src.domain.repositories.idempotency.interface import IIdempotencyRepo
+
+from ..models import IdempotencyKey as IdempotencyKeyDBModel
+
+
+@dataclass
+class SqlAlchemyIdempotencyRepo(IIdempotencyRepo):
+    _session: AsyncSession
+        
+    async def get_response(self, key: str, now: datetime) -> IdempotentResponse | None:
+        stmt = (
+            select(IdempotencyKeyDBModel)
+            .where(
+                IdempotencyKeyDBModel.key == key,
+                IdempotencyKeyDBModel.expires_at > now,
+            )
+        )
+        result = await self._session.execute(stmt)
+        
+        db_response: IdempotencyKeyDBModel = result.scalar_one_or_none()
+        if not db_response:
+            return None
+        
+        # NOTE: SQLite returns naive datetimes, they are stored in UTC.
+        expires_at = db_response.expires_at
+        if expires_at.tzinfo is None:
+            expires_at = expires_at.replace(tzinfo=timezone.utc)
+        
+        return IdempotentResponse(
+            key=db_response.key,
+            fingerprint=db_response.fingerprint,
+            status_code=db_response.status_code,
+            content_type=db_response.content_type,
+            body=db_response.body,
+            expires_at=expires_at,
+        )
+        
+    async def add_response(self, response: IdempotentResponse, now: datetime) -> bool:
+        await self._session.execute(
+            delete(IdempotencyKeyDBModel)
+            .where(
+                IdempotencyKeyDBModel.key == response.key,
+                IdempotencyKeyDBModel.expires_at <= now,
+            )
+        )
+        # NOTE: Another worker may have stored the key meanwhile,
+        # the first response is kept.
+        try:
+            async with self._session.begin_nested():
+                await self._session.execute(
+                    insert(IdempotencyKeyDBModel).values(**response.asdict())
+                )
+        except IntegrityError:
+            return False
+        
+        return True
+        
+    async def delete_expired_responses(self, now: datetime) -> int:
+        stmt = (
+            delete(IdempotencyKeyDBModel)
+            .where(IdempotencyKeyDBModel.expires_at <= now)
+        )
+        result = await self._session.execute(stmt)
+        
+        return result.rowcount
@@ -1,14 +1,24 @@
-from typing import Any
+from datetime import datetime
+from typing import Any, AsyncIterator
 from loguru import logger
 from dataclasses import dataclass
-from sqlalchemy import select, update
+from sqlalchemy import ARRAY, any_, bindparam, delete, func, insert, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.domain.entities.users import User
 from src.domain.repositories.users.interface import IUsersRepo
 from src.domain.repositories.exc import CustomRepoException, RefreshTokenNotFound, UserNotFound
 
-from ..models import RefreshToken as RefreshTokenDBModel, User as UserDBModel
+from ..models import (
+    RefreshToken as RefreshTokenDBModel,
+    RevokedToken as RevokedTokenDBModel,
+    User as UserDBModel,
+)
+
+
+# NOTE: PostgreSQL channel notified with "<user_id>:<token_version>"
+# when a token version is incremented.
+TOKEN_VERSIONS_CHANNEL = "token_versions"
 
 
 @dataclass
@@ -18,6 +28,7 @@ class SqlAlchemyUsersRepo(IUsersRepo):
     async def add_user(self, user: User) -> User:
         user_db = UserDBModel(
             email=user.email,
+            email_normalized=user.email_normalized,
             password_hash=user.password_hash,
         )
         
@@ -25,10 +36,15 @@ class SqlAlchemyUsersRepo(IUsersRepo):
         await self._session.flush()
         await self._session.refresh(user_db)
         
+        return self._to_entity(user_db)
+        
+    def _to_entity(self, db_user: UserDBModel) -> User:
         return User(
-            id=user_db.id,
-            email=user_db.email,
-            password_hash=user_db.password_hash,
+            id=db_user.id,
+            email=db_user.email,
+            password_hash=db_user.password_hash,
+            email_normalized=db_user.email_normalized,
+            token_version=db_user.token_version,
         )
         
     async def _get_user(self, *conditions: Any) -> User:
@@ -41,11 +57,7 @@ class SqlAlchemyUsersRepo(IUsersRepo):
         if not db_user:
             raise UserNotFound
         
-        return User(
-            id=db_user.id,
-            email=db_user.email,
-            password_hash=db_user.password_hash
-        )
+        return self._to_entity(db_user)
         
     async def get_by_id(
         self,
@@ -60,8 +72,67 @@ class SqlAlchemyUsersRepo(IUsersRepo):
         email: str,
     ) -> User:
         return await self._get_user(
-            UserDBModel.email == email
+            UserDBModel.email_normalized == email
+        )
+            
+    async def get_many(self, ids: list[int]) -> list[User]:
+        if not ids:
+            return []
+        
+        if self._session.get_bind().dialect.name == "postgresql":
+            # NOTE: A single array parameter, the statement text is the same
+            # for any number of ids, so it's prepared once (IN has one
+            # parameter per id and a statement per list length).
+            condition = UserDBModel.id == any_(bindparam("ids", ids, type_=ARRAY(UserDBModel.id.type)))
+        else:
+            condition = UserDBModel.id.in_(ids)
+        result = await self._session.execute(select(UserDBModel).where(condition))
+        
+        return [self._to_entity(db_user) for db_user in result.scalars()]
+        
+    async def update_password_hash(self, user_id: int, password_hash: str):
+        stmt = (
+            update(UserDBModel)
+            .where(UserDBModel.id == user_id)
+            .values(password_hash=password_hash)
+        )
+        await self._session.execute(stmt)
+            
+    async def get_token_version(self, user_id: int) -> int:
+        stmt = (
+            select(UserDBModel.token_version)
+            .where(UserDBModel.id == user_id)
+        )
+        result = await self._session.execute(stmt)
+        
+        token_version = result.scalar_one_or_none()
+        if token_version is None:
+            raise UserNotFound
+        
+        return token_version
+            
+    async def increment_token_version(self, user_id: int) -> int:
+        stmt = (
+            update(UserDBModel)
+            .where(UserDBModel.id == user_id)
+            .values(token_version=UserDBModel.token_version + 1)
+            .returning(UserDBModel.token_version)
         )
+        result = await self._session.execute(stmt)
+        
+        token_version = result.scalar_one_or_none()
+        if token_version is None:
+            raise UserNotFound
+        
+        connection = await self._session.connection()
+        if connection.dialect.name == "postgresql":
+            # NOTE: Notifications are delivered on commit, so listeners
+            # never see a version of a rolled back transaction.
+            await self._session.execute(
+                select(func.pg_notify(TOKEN_VERSIONS_CHANNEL, f"{user_id}:{token_version}"))
+            )
+        
+        return token_version
             
     async def get_refresh_token(self, user_id: int) -> str:
         stmt = (
@@ -76,14 +147,15 @@ class SqlAlchemyUsersRepo(IUsersRepo):
         
         return refresh_token
 
-    async def update_refresh_token(self, user_id: int, refresh_token: str):
+    async def update_refresh_token(self, user_id: int, refresh_token: str, expires_at: datetime):
         stmt = (
             update(RefreshTokenDBModel)
             .where(
                 RefreshTokenDBModel.user_id == user_id
             )
             .values(
-                token=refresh_token
+                token=refresh_token,
+                expires_at=expires_at,
             )
         )
         result = await self._session.execute(stmt)
@@ -100,10 +172,156 @@ class SqlAlchemyUsersRepo(IUsersRepo):
             logger.error(error_msg)
             raise CustomRepoException(message=f"Updating row FAILED: {error_msg}")
             
-    async def add_refresh_token(self, user_id: int, refresh_token: str):
+    async def add_refresh_token(self, user_id: int, refresh_token: str, expires_at: datetime):
         refresh_token_db = RefreshTokenDBModel(
             user_id=user_id,
-            token=refresh_token
+            token=refresh_token,
+            expires_at=expires_at,
         )
         
         self._session.add(refresh_token_db)
+        
+    async def delete_refresh_token(self, user_id: int):
+        stmt = (
+            delete(RefreshTokenDBModel)
+            .where(RefreshTokenDBModel.user_id == user_id)
+        )
+        await self._session.execute(stmt)
+        
+    async def delete_expired_refresh_tokens(self, now: datetime, limit: int) -> int:
+        # NOTE: Rows are deleted by bounded batches of ids,
+        # so a single statement never holds locks on the whole table.
+        expired_ids = (
+            select(RefreshTokenDBModel.id)
+            .where(RefreshTokenDBModel.expires_at <= now)
+            .limit(limit)
+        )
+        stmt = (
+            delete(RefreshTokenDBModel)
+            .where(RefreshTokenDBModel.id.in_(expired_ids.scalar_subquery()))
+        )
+        result = await self._session.execute(stmt)
+        
+        return result.rowcount
+        
+    async def revoke_token(self, jti: str, expires_at: datetime):
+        await self._session.merge(
+            RevokedTokenDBModel(
+                jti=jti,
+                expires_at=expires_at,
+            )
+        )
+        
+    async def is_token_revoked(self, jti: str) -> bool:
+        stmt = (
+            select(RevokedTokenDBModel.jti)
+            .where(RevokedTokenDBModel.jti == jti)
+        )
+        result = await self._session.execute(stmt)
+        
+        return result.scalar_one_or_none() is not None
+        
+    async def get_revoked_tokens(self, now: datetime) -> list[str]:
+        stmt = (
+            select(RevokedTokenDBModel.jti)
+            .where(RevokedTokenDBModel.expires_at > now)
+        )
+        result = await self._session.execute(stmt)
+        
+        return list(result.scalars())
+        
+    async def delete_expired_revoked_tokens(self, now: datetime) -> int:
+        stmt = (
+            delete(RevokedTokenDBModel)
+            .where(RevokedTokenDBModel.expires_at <= now)
+        )
+        result = await self._session.execute(stmt)
+        
+        return result.rowcount
+        
+    async def get_existing_emails(self, emails: list[str]) -> set[str]:
+        if not emails:
+            return set()
+        
+        stmt = (
+            select(UserDBModel.email_normalized)
+            .where(UserDBModel.email_normalized.in_(emails))
+        )
+        result = await self._session.execute(stmt)
+        
+        return set(result.scalars().all())
+        
+    async def add_users(self, users: list[User]) -> int:
+        if not users:
+            return 0
+        
+        connection = await self._session.connection()
+        if connection.dialect.driver == "asyncpg":
+            # NOTE: COPY is the fastest way to load rows into PostgreSQL,
+            # it skips per-row statement parsing and planning entirely.
+            raw_connection = await connection.get_raw_connection()
+            await raw_connection.driver_connection.copy_records_to_table(
+                UserDBModel.__tablename__,
+                records=[(user.email, user.email_normalized, user.password_hash) for user in users],
+                columns=["email", "email_normalized", "password_hash"],
+            )
+        else:
+            await self._session.execute(
+                insert(UserDBModel),
+                [
+                    {
+                        "email": user.email,
+                        "email_normalized": user.email_normalized,
+                        "password_hash": user.password_hash,
+                    }
+                    for user in users
+                ]
+            )
+        
+        logger.debug(f"{len(users)} rows inserted into table '{UserDBModel.__tablename__}'.")
+        return len(users)
+        
+    async def list_users(self, after_id: int | None, limit: int) -> list[User]:
+        # NOTE: Keyset pagination, the primary key index is used to seek
+        # to the first row of the page, so the cost doesn't grow with the page number.
+        stmt = (
+            select(UserDBModel)
+            .order_by(UserDBModel.id)
+            .limit(limit)
+        )
+        if after_id is not None:
+            stmt = stmt.where(UserDBModel.id > after_id)
+        
+        result = await self._session.execute(stmt)
+        
+        return [self._to_entity(db_user) for db_user in result.scalars()]
+        
+    async def stream_users(self, batch_size: int) -> AsyncIterator[User]:
+        # NOTE: `stream` uses a server-side cursor (where the driver supports it)
+        # and `yield_per` fetches rows by batches, so memory usage is constant.
+        stmt = (
+            select(UserDBModel)
+            .order_by(UserDBModel.id)
+            .execution_options(yield_per=batch_size)
+        )
+        
+        result = await self._session.stream(stmt)
+        async for db_user in result.scalars():
+            yield self._to_entity(db_user)
+            
+    async def count_users(self) -> int:
+        result = await self._session.execute(select(func.count()).select_from(UserDBModel))
+        
+        return result.scalar_one()
+        
+    async def stream_emails(self, batch_size: int) -> AsyncIterator[str]:
+        # NOTE: Only the indexed column is selected, so PostgreSQL can
+        # answer with an index-only scan.
+        stmt = (
+            select(UserDBModel.email_normalized)
+            .execution_options(yield_per=batch_size)
+        )
+        
+        result = await self._session.stream(stmt)
+        async for email in result.scalars():
+            yield email
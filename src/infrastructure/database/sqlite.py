@@ -0,0 +1,74 @@
+from sqlalchemy import event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.dml import UpdateBase
+
+from settings import settings
+
+
+WRITER_ENGINE_KEY = "sqlite_writer_engine"
+WRITING_KEY = "sqlite_writing"
+
+
+def is_sqlite(dsn: str) -> bool:
+    return make_url(dsn).get_backend_name() == "sqlite"
+
+
+def is_sqlite_file(dsn: str) -> bool:
+    database = make_url(dsn).database
+    return is_sqlite(dsn) and bool(database) and database != ":memory:" and "mode=memory" not in dsn
+
+
+def get_pragmas(query_only: bool = False) -> list[str]:
+    pragmas = [
+        # NOTE: WAL lets readers run concurrently with the writer, with NORMAL
+        # synchronisation a commit is durable after a checkpoint (an OS crash
+        # may lose the last transactions, never corrupt the database).
+        "PRAGMA journal_mode=WAL",
+        "PRAGMA synchronous=NORMAL",
+        f"PRAGMA mmap_size={settings.SQLITE_MMAP_SIZE}",
+        f"PRAGMA cache_size=-{settings.SQLITE_CACHE_SIZE_KIB}",
+        f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_SECONDS * 1000)}",
+        "PRAGMA temp_store=MEMORY",
+        "PRAGMA foreign_keys=ON",
+    ]
+    if query_only:
+        pragmas.append("PRAGMA query_only=ON")
+
+    return pragmas
+
+
+def install_sqlite_pragmas(engine: AsyncEngine | Engine, query_only: bool = False):
+    sync_engine = engine.sync_engine if isinstance(engine, AsyncEngine) else engine
+    pragmas = get_pragmas(query_only=query_only)
+
+    @event.listens_for(sync_engine, "connect")
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+
+
+class SQLiteSession(Session):
+    # NOTE: SQLite has a single writer. Reads go to the readers pool, the
+    # first write of a transaction (a flush or an INSERT/UPDATE/DELETE) and
+    # everything after it go to the writer engine, a pool of one connection,
+    # so writers of this process queue for it instead of failing with
+    # "database is locked". A transaction starting with a write never has
+    # to upgrade a read lock, which is what deadlocks concurrent writers.
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if self.info.get(WRITING_KEY) or self._flushing or isinstance(clause, UpdateBase):
+            self.info[WRITING_KEY] = True
+            return self.info[WRITER_ENGINE_KEY]
+
+        return super().get_bind(mapper, clause=clause, **kwargs)
+
+
+@event.listens_for(SQLiteSession, "after_transaction_end")
+def _reset_writing(session: Session, transaction):
+    if transaction.parent is None:
+        session.info.pop(WRITING_KEY, None)
@@ -1,37 +1,114 @@
+import asyncio
 import inspect
 from typing import Type
+from sqlalchemy import exc, text
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.domain.uof.abstract import IUnitOfWork
+from src.domain.repositories.exc import DatabaseUnavailable
 from src.infrastructure.database.repositories.users import SqlAlchemyUsersRepo
+from src.infrastructure.database.repositories.audit import SqlAlchemyAuditRepo
+from src.infrastructure.database.repositories.idempotency import SqlAlchemyIdempotencyRepo
+from src.infrastructure.tools.circuit_breaker import CircuitBreaker, CircuitOpen
+
+
+def is_database_failure(ex: BaseException | None) -> bool:
+    # NOTE: Errors of the database or the connection to it (timeouts included),
+    # not errors caused by the request itself (constraints, bad data).
+    if isinstance(ex, (exc.IntegrityError, exc.DataError, exc.ProgrammingError)):
+        return False
+
+    return isinstance(ex, (exc.DBAPIError, exc.TimeoutError, asyncio.TimeoutError, OSError))
 
 
 class SQLAlchemyUnitOfWork(IUnitOfWork):
     def __init__(
         self,
         async_session_maker,
-        users_repo_class: Type[SqlAlchemyUsersRepo] | None = None
+        users_repo_class: Type[SqlAlchemyUsersRepo] | None = None,
+        audit_repo_class: Type[SqlAlchemyAuditRepo] = SqlAlchemyAuditRepo,
+        idempotency_repo_class: Type[SqlAlchemyIdempotencyRepo] = SqlAlchemyIdempotencyRepo,
+        circuit_breaker: CircuitBreaker | None = None,
+        statement_timeout_ms: int | None = None,
     ):
         if not inspect.isclass(users_repo_class):
             raise TypeError(f"Excpected a class, got object of class '{type(users_repo_class).__name__}'")
         
         self.__async_session_maker = async_session_maker
         self.__users_repo_class = users_repo_class
+        self.__audit_repo_class = audit_repo_class
+        self.__idempotency_repo_class = idempotency_repo_class
+        self.__circuit_breaker = circuit_breaker
+        # NOTE: Overrides the connection default (`DB_STATEMENT_TIMEOUT_MS`)
+        # for this unit of work only, 0 disables it. PostgreSQL only.
+        self.__statement_timeout_ms = statement_timeout_ms
         self.__session: AsyncSession | None = None
         self.__users = None
+        self.__audit = None
+        self.__idempotency = None
     
     @property
     def users(self,):
         return self.__users
     
+    @property
+    def audit(self,):
+        return self.__audit
+    
+    @property
+    def idempotency(self,):
+        return self.__idempotency
+    
     async def commit(self) -> None:
         await self.__session.commit()
     
     async def rollback(self) -> None:
         await self.__session.rollback()
 
+    def __record_outcome(self, ex: BaseException | None):
+        if self.__circuit_breaker is None:
+            return
+        
+        if is_database_failure(ex):
+            self.__circuit_breaker.record_failure()
+        elif isinstance(ex, asyncio.CancelledError):
+            self.__circuit_breaker.record_cancel()
+        else:
+            self.__circuit_breaker.record_success()
+
     async def __aenter__(self,) -> "SQLAlchemyUnitOfWork":
+        if self.__circuit_breaker is not None:
+            try:
+                self.__circuit_breaker.before_call()
+            except CircuitOpen as ex:
+                raise DatabaseUnavailable(retry_after=ex.retry_after)
+        
         self.__session = self.__async_session_maker()
         self.__session.begin()
         self.__users = self.__users_repo_class(self.__session)
+        self.__audit = self.__audit_repo_class(self.__session)
+        self.__idempotency = self.__idempotency_repo_class(self.__session)
+        if self.__statement_timeout_ms is not None and self.__session.get_bind().dialect.name == "postgresql":
+            try:
+                await self.__session.execute(text(f"SET LOCAL statement_timeout = {int(self.__statement_timeout_ms)}"))
+            except BaseException as ex:
+                await self.__aexit__(type(ex), ex, ex.__traceback__)
+                raise
         return self
+    
+    async def __aexit__(self, exc_type, *args):
+        # NOTE: The session is closed even if commit or rollback fails,
+        # so its connection is always returned to the pool.
+        try:
+            await super().__aexit__(exc_type, *args)
+        except BaseException as ex:
+            self.__record_outcome(ex)
+            raise
+        else:
+            self.__record_outcome(args[0] if args else None)
+        finally:
+            await self.__session.close()
+            self.__session = None
+            self.__users = None
+            self.__audit = None
+            self.__idempotency = None
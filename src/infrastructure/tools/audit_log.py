@@ -0,0 +1,100 @@
+import asyncio
+from typing import Callable
+from dataclasses import dataclass, field
+
+from loguru import logger
+
+from src.domain.entities.audit import AuditEvent
+from src.domain.uof.abstract import IUnitOfWork
+
+
+@dataclass
+class AuditLog:
+    # NOTE: Write-behind audit trail. Requests only put events on a bounded
+    # in-process queue, a background task writes them in multi-row inserts
+    # of up to `batch_size` events or every `flush_interval_seconds`.
+    # Auth requests never wait for the audit: when the queue is full (the
+    # database can't keep up) new events are dropped and counted instead.
+    # Events still queued when the process is killed are lost.
+    max_queue_size:         int = 10_000
+    batch_size:             int = 500
+    flush_interval_seconds: float = 1
+    written:                int = field(init=False, default=0)
+    dropped:                int = field(init=False, default=0)
+    _queue:                 asyncio.Queue = field(init=False, repr=False)
+    _batch:                 list[AuditEvent] = field(init=False, repr=False, default_factory=list)
+    _dropping:              bool = field(init=False, repr=False, default=False)
+
+    def __post_init__(self):
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+
+    def __len__(self) -> int:
+        return self._queue.qsize() + len(self._batch)
+
+    def record(self, event: AuditEvent):
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # NOTE: Logged once until the next successful write, not per event.
+            if not self._dropping:
+                logger.warning("Audit queue is full, events are dropped")
+            self._dropping = True
+            self.dropped += 1
+
+    def _take_queued(self):
+        while len(self._batch) < self.batch_size and not self._queue.empty():
+            self._batch.append(self._queue.get_nowait())
+
+    async def _collect_batch(self):
+        if not self._batch:
+            self._batch.append(await self._queue.get())
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.flush_interval_seconds
+        self._take_queued()
+        while len(self._batch) < self.batch_size:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                self._batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+            self._take_queued()
+
+    async def _flush_batch(self, unit_of_work: IUnitOfWork):
+        # NOTE: The batch is cleared only after the write, so a batch
+        # interrupted by the shutdown is written by `flush`.
+        try:
+            async with unit_of_work as uof:
+                await uof.audit.add_events(events=self._batch)
+            self.written += len(self._batch)
+            self._dropping = False
+        except Exception as ex:
+            self.dropped += len(self._batch)
+            logger.error(f"Audit events write failed, {len(self._batch)} events dropped: {type(ex)}: {ex}")
+
+        self._batch = []
+
+    async def flush(self, unit_of_work_factory: Callable[[], IUnitOfWork]):
+        # NOTE: Final flush on shutdown, after the flush loop is stopped.
+        self._take_queued()
+        while self._batch:
+            await self._flush_batch(unit_of_work_factory())
+            self._take_queued()
+
+    async def run_flush_loop(self, unit_of_work_factory: Callable[[], IUnitOfWork]):
+        while True:
+            await self._collect_batch()
+            await self._flush_batch(unit_of_work_factory())
+
+    def render(self) -> str:
+        # NOTE: Prometheus text exposition format.
+        return "\n".join([
+            "# TYPE audit_events_written_total counter",
+            f"audit_events_written_total {self.written}",
+            "# TYPE audit_events_dropped_total counter",
+            f"audit_events_dropped_total {self.dropped}",
+            "# TYPE audit_events_queued gauge",
+            f"audit_events_queued {len(self)}",
+        ]) + "\n"
@@ -0,0 +1,41 @@
+import math
+import hashlib
+from typing import Iterable
+
+
+class BloomFilter:
+    # NOTE: Probabilistic set without false negatives. `item in filter` is False
+    # only if the item was never added, True means "probably added" with
+    # `error_rate` probability of a false positive for `capacity` items.
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        capacity = max(capacity, 1)
+        self.size = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        self.hashes_count = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray(math.ceil(self.size / 8))
+
+    @classmethod
+    def from_items(cls, items: Iterable[str], capacity: int, error_rate: float = 0.001) -> "BloomFilter":
+        bloom_filter = cls(capacity=capacity, error_rate=error_rate)
+        for item in items:
+            bloom_filter.add(item)
+
+        return bloom_filter
+
+    def _positions(self, item: str):
+        # NOTE: Double hashing, k positions are derived from one 128-bit digest.
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        first_hash = int.from_bytes(digest[:8], "little")
+        second_hash = int.from_bytes(digest[8:], "little") | 1
+
+        for i in range(self.hashes_count):
+            yield (first_hash + i * second_hash) % self.size
+
+    def add(self, item: str):
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item: str) -> bool:
+        return all(
+            self._bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(item)
+        )
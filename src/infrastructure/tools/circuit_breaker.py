@@ -0,0 +1,69 @@
+import time
+from enum import Enum
+from typing import Callable
+from dataclasses import dataclass, field
+
+from loguru import logger
+
+
+class CircuitStates(str, Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+@dataclass
+class CircuitOpen(Exception):
+    retry_after: float
+
+
+@dataclass
+class CircuitBreaker:
+    # NOTE: Opens after `failure_threshold` consecutive failures, then calls
+    # fail fast with `CircuitOpen` for `reset_timeout_seconds`. After that a
+    # single probe call is let through (half-open): its success closes the
+    # circuit, its failure opens it again for another timeout.
+    name:                   str
+    failure_threshold:      int = 5
+    reset_timeout_seconds:  float = 10
+    clock:                  Callable[[], float] = time.monotonic
+    state:                  CircuitStates = field(init=False, default=CircuitStates.CLOSED)
+    _failures:              int = field(init=False, repr=False, default=0)
+    _opened_at:             float = field(init=False, repr=False, default=0)
+    _probing:               bool = field(init=False, repr=False, default=False)
+
+    def before_call(self):
+        if self.state == CircuitStates.CLOSED:
+            return
+
+        now = self.clock()
+        if self.state == CircuitStates.OPEN and now - self._opened_at >= self.reset_timeout_seconds:
+            logger.info(f"Circuit '{self.name}' is half-open, probing")
+            self.state = CircuitStates.HALF_OPEN
+            self._probing = False
+        if self.state == CircuitStates.HALF_OPEN and not self._probing:
+            self._probing = True
+            return
+
+        raise CircuitOpen(retry_after=max(0.0, self._opened_at + self.reset_timeout_seconds - now))
+
+    def record_success(self):
+        self._failures = 0
+        self._probing = False
+        if self.state != CircuitStates.CLOSED:
+            logger.info(f"Circuit '{self.name}' is closed")
+            self.state = CircuitStates.CLOSED
+
+    def record_failure(self):
+        self._failures += 1
+        self._probing = False
+        if self.state == CircuitStates.HALF_OPEN or (
+            self.state == CircuitStates.CLOSED and self._failures >= self.failure_threshold
+        ):
+            logger.warning(f"Circuit '{self.name}' is open after {self._failures} consecutive failures")
+            self.state = CircuitStates.OPEN
+            self._opened_at = self.clock()
+
+    def record_cancel(self):
+        # NOTE: A cancelled call proves nothing, another probe may be made.
+        self._probing = False
@@ -0,0 +1,141 @@
+import time
+import hmac
+import asyncio
+from typing import Callable
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+
+from loguru import logger
+
+from src.domain.entities.idempotency import IdempotentResponse
+from src.domain.uof.abstract import IUnitOfWork
+
+
+class IdempotencyKeyReused(Exception):
+    ...
+
+
+@dataclass
+class IdempotencyCache:
+    # NOTE: Responses of requests made with an idempotency key, kept for
+    # `ttl_seconds`. The first request of a key owns it until `release`,
+    # duplicates arriving meanwhile wait for its response. With
+    # `unit_of_work_factory` responses are also stored in the database,
+    # so retries routed to other workers get them as well (duplicates
+    # running at the same time on other workers are not waited for).
+    ttl_seconds:            float = 60
+    max_size:               int = 10_000
+    unit_of_work_factory:   Callable[[], IUnitOfWork] | None = None
+    clock:                  Callable[[], float] = time.monotonic
+    _results:               OrderedDict[str, tuple[IdempotentResponse, float]] = field(init=False, repr=False, default_factory=OrderedDict)
+    _in_flight:             dict[str, asyncio.Future] = field(init=False, repr=False, default_factory=dict)
+
+    def __len__(self) -> int:
+        return len(self._results)
+
+    def clear(self):
+        self._results.clear()
+
+    def create_response(
+        self,
+        key:            str,
+        fingerprint:    str,
+        status_code:    int,
+        content_type:   str,
+        body:           bytes,
+    ) -> IdempotentResponse:
+        return IdempotentResponse(
+            key=key,
+            fingerprint=fingerprint,
+            status_code=status_code,
+            content_type=content_type,
+            body=body,
+            expires_at=datetime.now(timezone.utc) + timedelta(seconds=self.ttl_seconds),
+        )
+
+    def _get_result(self, key: str) -> IdempotentResponse | None:
+        cached = self._results.get(key)
+        if cached is None:
+            return None
+        if cached[1] <= self.clock():
+            del self._results[key]
+            return None
+
+        return cached[0]
+
+    def _store_result(self, response: IdempotentResponse, ttl_seconds: float):
+        self._results[response.key] = (response, self.clock() + ttl_seconds)
+        self._results.move_to_end(response.key)
+        while len(self._results) > self.max_size:
+            self._results.popitem(last=False)
+
+    async def _load_result(self, key: str) -> IdempotentResponse | None:
+        # NOTE: The database store is best effort, the request is run
+        # (at most once per process) when it can't be read.
+        now = datetime.now(timezone.utc)
+        try:
+            async with self.unit_of_work_factory() as uof:
+                response = await uof.idempotency.get_response(key=key, now=now)
+        except Exception as ex:
+            logger.error(f"Idempotent response loading failed: {type(ex)}: {ex}")
+            return None
+
+        if response is not None:
+            self._store_result(response, (response.expires_at - now).total_seconds())
+        return response
+
+    async def _save_result(self, response: IdempotentResponse):
+        try:
+            async with self.unit_of_work_factory() as uof:
+                await uof.idempotency.add_response(response=response, now=datetime.now(timezone.utc))
+        except Exception as ex:
+            logger.error(f"Idempotent response saving failed: {type(ex)}: {ex}")
+
+    async def acquire(self, key: str, fingerprint: str) -> IdempotentResponse | None:
+        # NOTE: Returns the stored response of the key, or None when the
+        # caller owns the key: it must run the request and `release` the key.
+        database_checked = self.unit_of_work_factory is None
+        while True:
+            response = self._get_result(key)
+            if response is None and key in self._in_flight:
+                logger.debug(f"Request with idempotency key '{key}' is running, waiting for its response")
+                await asyncio.shield(self._in_flight[key])
+                continue
+            if response is None and not database_checked:
+                # NOTE: Checked again after the query, the key may
+                # have been acquired by a duplicate meanwhile.
+                database_checked = True
+                response = await self._load_result(key)
+                if response is None:
+                    continue
+
+            if response is not None:
+                if not hmac.compare_digest(response.fingerprint, fingerprint):
+                    raise IdempotencyKeyReused
+                return response
+
+            self._in_flight[key] = asyncio.get_running_loop().create_future()
+            return None
+
+    async def release(self, key: str, response: IdempotentResponse | None):
+        # NOTE: `response` is None when the request failed or its response
+        # isn't stored, then the next waiting duplicate runs the request.
+        in_flight = self._in_flight.pop(key)
+        if response is not None:
+            self._store_result(response, self.ttl_seconds)
+        in_flight.set_result(None)
+
+        if response is not None and self.unit_of_work_factory is not None:
+            await self._save_result(response)
+
+    async def run_sweep_loop(self, interval_seconds: float):
+        while True:
+            try:
+                async with self.unit_of_work_factory() as uof:
+                    deleted_count = await uof.idempotency.delete_expired_responses(now=datetime.now(timezone.utc))
+                logger.debug(f"Expired idempotent responses deleted: {deleted_count}")
+            except Exception as ex:
+                logger.error(f"Expired idempotent responses sweep failed: {type(ex)}: {ex}")
+
+            await asyncio.sleep(interval_seconds)
@@ -0,0 +1,162 @@
+import sys
+import time
+import asyncio
+import threading
+import traceback
+from typing import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+
+from loguru import logger
+
+
+UNKNOWN_ROUTE = "unknown"
+
+
+@dataclass
+class RouteStalls:
+    count:          int = 0
+    total_seconds:  float = 0
+    max_seconds:    float = 0
+
+
+@dataclass
+class StallOffender:
+    route:          str
+    stack:          list[str]
+    count:          int = 0
+    max_seconds:    float = 0
+
+
+@dataclass
+class LoopWatchdog:
+    # NOTE: Detects callbacks blocking the event loop. A heartbeat callback
+    # is scheduled every `interval_seconds` directly on the loop (no task
+    # step in between) and a watcher thread checks that it keeps coming.
+    # When it's late by more than `threshold_seconds` the watcher captures
+    # the stack of the loop thread and the route of the running task, the
+    # stall duration is measured by the heartbeat once the loop is free again.
+    threshold_seconds:  float = 0.1
+    interval_seconds:   float = 0.02
+    max_offenders:      int = 20
+    stack_limit:        int = 30
+    clock:              Callable[[], float] = time.monotonic
+    routes:             dict[str, RouteStalls] = field(init=False, default_factory=dict)
+    _offenders:         dict[tuple, StallOffender] = field(init=False, repr=False, default_factory=dict)
+    _task_routes:       dict[asyncio.Task, Callable[[], str]] = field(init=False, repr=False, default_factory=dict)
+    _beat_due_at:       float = field(init=False, repr=False, default=0)
+    _captured:          tuple | None = field(init=False, repr=False, default=None)
+    _loop:              asyncio.AbstractEventLoop | None = field(init=False, repr=False, default=None)
+    _loop_thread_id:    int | None = field(init=False, repr=False, default=None)
+    _beat_handle:       asyncio.TimerHandle | None = field(init=False, repr=False, default=None)
+    _watcher:           threading.Thread | None = field(init=False, repr=False, default=None)
+    _stopped:           threading.Event = field(init=False, repr=False, default_factory=threading.Event)
+
+    def start(self):
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._stopped.clear()
+        self._schedule_beat()
+        self._watcher = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._watcher.start()
+
+    def stop(self):
+        self._stopped.set()
+        if self._beat_handle is not None:
+            self._beat_handle.cancel()
+        if self._watcher is not None:
+            self._watcher.join()
+            self._watcher = None
+
+    @contextmanager
+    def track_task(self, get_route: Callable[[], str]) -> Iterator[None]:
+        # NOTE: Stalls inside the current task are attributed to `get_route()`,
+        # it's called only on a stall, so the route may be resolved lazily.
+        task = asyncio.current_task()
+        self._task_routes[task] = get_route
+        try:
+            yield
+        finally:
+            self._task_routes.pop(task, None)
+
+    def _schedule_beat(self):
+        self._beat_due_at = self.clock() + self.interval_seconds
+        self._beat_handle = self._loop.call_later(self.interval_seconds, self._beat)
+
+    def _beat(self):
+        lag = self.clock() - self._beat_due_at
+        captured, self._captured = self._captured, None
+        if lag > self.threshold_seconds:
+            if captured is not None and captured[0] == self._beat_due_at:
+                _, route, stack = captured
+            else:
+                route, stack = UNKNOWN_ROUTE, []
+            self._record(route, stack, lag)
+
+        if not self._stopped.is_set():
+            self._schedule_beat()
+
+    def _watch(self):
+        while not self._stopped.wait(self.interval_seconds):
+            beat_due_at = self._beat_due_at
+            if self.clock() - beat_due_at <= self.threshold_seconds:
+                continue
+            if self._captured is not None and self._captured[0] == beat_due_at:
+                continue
+
+            self._captured = (beat_due_at, *self._capture())
+
+    def _capture(self) -> tuple[str, list[str]]:
+        route = UNKNOWN_ROUTE
+        task = asyncio.current_task(self._loop)
+        get_route = self._task_routes.get(task) if task is not None else None
+        if get_route is not None:
+            try:
+                route = get_route()
+            except Exception:
+                pass
+
+        frame = sys._current_frames().get(self._loop_thread_id)
+        if frame is None:
+            return route, []
+
+        # NOTE: Innermost frame last, like in a traceback.
+        stack = traceback.extract_stack(frame, limit=self.stack_limit)
+        return route, [f"{entry.filename}:{entry.lineno} in {entry.name}" for entry in stack]
+
+    def _record(self, route: str, stack: list[str], duration_seconds: float):
+        route_stalls = self.routes.setdefault(route, RouteStalls())
+        route_stalls.count += 1
+        route_stalls.total_seconds += duration_seconds
+        route_stalls.max_seconds = max(route_stalls.max_seconds, duration_seconds)
+
+        key = (route, *stack)
+        offender = self._offenders.get(key)
+        if offender is None:
+            offender = self._offenders[key] = StallOffender(route=route, stack=stack)
+            # NOTE: Logged once per distinct stack, later ones are only counted.
+            logger.warning(
+                f"Event loop blocked for {duration_seconds * 1000:.0f} ms in '{route}':\n"
+                + "\n".join(f"  {entry}" for entry in stack[-10:])
+            )
+        offender.count += 1
+        offender.max_seconds = max(offender.max_seconds, duration_seconds)
+
+        if len(self._offenders) > self.max_offenders:
+            least_key = min(self._offenders, key=lambda key: self._offenders[key].max_seconds)
+            del self._offenders[least_key]
+
+    def worst_offenders(self) -> list[StallOffender]:
+        return sorted(self._offenders.values(), key=lambda offender: offender.max_seconds, reverse=True)
+
+    def render(self) -> str:
+        # NOTE: Prometheus text exposition format.
+        lines = [
+            "# TYPE event_loop_stalls_total counter",
+            *(f'event_loop_stalls_total{{route="{route}"}} {stalls.count}' for route, stalls in self.routes.items()),
+            "# TYPE event_loop_stall_seconds_total counter",
+            *(f'event_loop_stall_seconds_total{{route="{route}"}} {stalls.total_seconds:.6f}' for route, stalls in self.routes.items()),
+            "# TYPE event_loop_stall_seconds_max gauge",
+            *(f'event_loop_stall_seconds_max{{route="{route}"}} {stalls.max_seconds:.6f}' for route, stalls in self.routes.items()),
+        ]
+        return "\n".join(lines) + "\n"
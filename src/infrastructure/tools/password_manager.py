@@ -1,21 +1,187 @@
+import hmac
+import base64
+import hashlib
+import secrets
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+
 import bcrypt
-from dataclasses import dataclass
+
+from settings import settings
+
+
+BCRYPT_PREFIXES = ("$2a$", "$2b$", "$2y$")
+BCRYPT_HASH_LENGTH = 60
+
+SCRYPT_PREFIX = "$scrypt$"
+
+
+class IPasswordHasher(ABC):
+    @abstractmethod
+    def hash(self, password: str) -> str:
+        ...
+
+    @abstractmethod
+    def verify(self, password: str, password_hash: str) -> bool:
+        ...
+
+    @abstractmethod
+    def identify(self, password_hash: str) -> bool:
+        ...
+
+    @abstractmethod
+    def needs_rehash(self, password_hash: str) -> bool:
+        ...
 
 
 @dataclass
-class PasswordManager:
+class BcryptHasher(IPasswordHasher):
     rounds: int = 12
-      
-    def hash_password(self, password: str) -> str:
+
+    def hash(self, password: str) -> str:
         password_bytes = password.encode('utf-8')
-        
+
         salt = bcrypt.gensalt(rounds=self.rounds)
         hashed = bcrypt.hashpw(password_bytes, salt)
-        
+
         return hashed.decode('utf-8')
-    
-    def verify_password(self, password: str, hashed_password: str) -> bool:
+
+    def verify(self, password: str, password_hash: str) -> bool:
         password_bytes = password.encode('utf-8')
-        hashed_bytes = hashed_password.encode('utf-8')
-        
+        hashed_bytes = password_hash.encode('utf-8')
+
         return bcrypt.checkpw(password_bytes, hashed_bytes)
+
+    def identify(self, password_hash: str) -> bool:
+        return len(password_hash) == BCRYPT_HASH_LENGTH and password_hash.startswith(BCRYPT_PREFIXES)
+
+    def needs_rehash(self, password_hash: str) -> bool:
+        # NOTE: "$2b$12$..." - cost is the third part of the hash.
+        return int(password_hash.split("$")[2]) != self.rounds
+
+
+@dataclass
+class ScryptHasher(IPasswordHasher):
+    # NOTE: Memory cost is 128 * n * r bytes, CPU cost grows with n * r * p,
+    # so `p` can be raised to keep the same cost with less memory and vice versa.
+    # Hash format: $scrypt$ln=<log2(n)>,r=<r>,p=<p>$<salt>$<key>
+    n:          int = 2 ** 14
+    r:          int = 8
+    p:          int = 5
+    salt_size:  int = 16
+    key_size:   int = 32
+
+    def _derive_key(self, password: str, salt: bytes, n: int, r: int, p: int, key_size: int) -> bytes:
+        return hashlib.scrypt(
+            password.encode('utf-8'),
+            salt=salt,
+            n=n,
+            r=r,
+            p=p,
+            maxmem=128 * r * (n + p + 2) + 1024 * 1024,
+            dklen=key_size,
+        )
+
+    @staticmethod
+    def _b64encode(value: bytes) -> str:
+        return base64.b64encode(value).decode('ascii').rstrip("=")
+
+    @staticmethod
+    def _b64decode(value: str) -> bytes:
+        return base64.b64decode(value + "=" * (-len(value) % 4), validate=True)
+
+    def _parse(self, password_hash: str) -> tuple[int, int, int, bytes, bytes]:
+        # NOTE: Every malformed hash raises `ValueError` (`binascii.Error` is one).
+        try:
+            _, _, params, salt, key = password_hash.split("$")
+            params = dict(param.split("=") for param in params.split(","))
+
+            return 2 ** int(params["ln"]), int(params["r"]), int(params["p"]), self._b64decode(salt), self._b64decode(key)
+        except (KeyError, TypeError) as ex:
+            raise ValueError(f"Malformed scrypt hash: {ex}") from ex
+
+    def hash(self, password: str) -> str:
+        salt = secrets.token_bytes(self.salt_size)
+        key = self._derive_key(password, salt, self.n, self.r, self.p, self.key_size)
+
+        return (
+            f"{SCRYPT_PREFIX}ln={self.n.bit_length() - 1},r={self.r},p={self.p}"
+            f"${self._b64encode(salt)}${self._b64encode(key)}"
+        )
+
+    def verify(self, password: str, password_hash: str) -> bool:
+        # NOTE: A malformed hash fails the verification like a wrong password,
+        # `hashlib.scrypt` also raises `ValueError` on invalid parameters.
+        try:
+            n, r, p, salt, key = self._parse(password_hash)
+            return hmac.compare_digest(key, self._derive_key(password, salt, n, r, p, len(key)))
+        except ValueError:
+            return False
+
+    def identify(self, password_hash: str) -> bool:
+        return password_hash.startswith(SCRYPT_PREFIX)
+
+    def needs_rehash(self, password_hash: str) -> bool:
+        try:
+            n, r, p, _, _ = self._parse(password_hash)
+        except ValueError:
+            return True
+        return (n, r, p) != (self.n, self.r, self.p)
+
+
+@dataclass
+class PasswordManager:
+    rounds: int = 12
+
+    # NOTE: New hashes are made by the `scheme` hasher, existing hashes are
+    # verified by the hasher identified by the hash prefix, so `users.password_hash`
+    # may contain mixed formats while users are migrated on login (see `needs_rehash`).
+    scheme: str = "bcrypt"
+    scrypt_n: int = 2 ** 14
+    scrypt_r: int = 8
+    scrypt_p: int = 5
+    _hashers: dict[str, IPasswordHasher] = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self._hashers = {
+            "bcrypt": BcryptHasher(rounds=self.rounds),
+            "scrypt": ScryptHasher(n=self.scrypt_n, r=self.scrypt_r, p=self.scrypt_p),
+        }
+        if self.scheme not in self._hashers:
+            raise ValueError(f"Unknown password hashing scheme '{self.scheme}'")
+
+    def _identify(self, password_hash: str) -> IPasswordHasher | None:
+        return next(
+            (hasher for hasher in self._hashers.values() if hasher.identify(password_hash)),
+            None,
+        )
+
+    def hash_password(self, password: str) -> str:
+        return self._hashers[self.scheme].hash(password)
+
+    def verify_password(self, password: str, hashed_password: str) -> bool:
+        hasher = self._identify(hashed_password)
+        if hasher is None:
+            return False
+
+        return hasher.verify(password, hashed_password)
+
+    def needs_rehash(self, hashed_password: str) -> bool:
+        hasher = self._identify(hashed_password)
+        if hasher is not self._hashers[self.scheme]:
+            return True
+
+        return hasher.needs_rehash(hashed_password)
+
+    def is_password_hash(self, value: str) -> bool:
+        return self._identify(value) is not None
+
+
+def get_password_manager() -> PasswordManager:
+    return PasswordManager(
+        rounds=settings.BCRYPT_ROUNDS,
+        scheme=settings.PASSWORD_HASH_SCHEME,
+        scrypt_n=settings.SCRYPT_N,
+        scrypt_r=settings.SCRYPT_R,
+        scrypt_p=settings.SCRYPT_P,
+    )
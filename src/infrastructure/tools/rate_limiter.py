@@ -0,0 +1,90 @@
+import time
+import struct
+from typing import Callable
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+from src.infrastructure.tools.shared_state import SharedStateView
+
+
+# NOTE: Shared state value of a bucket: tokens, updated at.
+TOKEN_BUCKET_STRUCT = struct.Struct("<dd")
+
+
+@dataclass
+class RateLimitExceeded(Exception):
+    retry_after: float
+
+
+@dataclass
+class TokenBucketRateLimiter:
+    # NOTE: Every key has a bucket of `capacity` tokens refilled with
+    # `refill_per_second` rate, one request takes one token. A bucket is only
+    # two floats, buckets are kept in LRU order, so idle keys (which buckets are
+    # full again and therefore carry no state) are evicted from the head.
+    # With `shared_state` (a view of `TOKEN_BUCKET_STRUCT`) buckets are shared by all
+    # workers of the host and expire once refilled instead.
+    capacity:           int
+    refill_per_second:  float
+    name:               str = "rate limit"
+    max_keys:           int = 100_000
+    clock:              Callable[[], float] = time.monotonic
+    shared_state:       SharedStateView | None = None
+    _buckets:           OrderedDict = field(init=False, repr=False, default_factory=OrderedDict)
+
+    @classmethod
+    def per_minute(cls, limit: int, **kwargs) -> "TokenBucketRateLimiter":
+        return cls(capacity=limit, refill_per_second=limit / 60, **kwargs)
+
+    def _refill(self, bucket: tuple | None, now: float) -> float:
+        tokens, updated_at = bucket if bucket is not None else (self.capacity, now)
+        return min(self.capacity, tokens + (now - updated_at) * self.refill_per_second)
+
+    def check(self, key: str):
+        # NOTE: Raises like `acquire` would, without taking a token, so
+        # several limiters can be checked before any of them is charged.
+        now = self.clock()
+        bucket = self.shared_state.get(key) if self.shared_state is not None else self._buckets.get(key)
+        tokens = self._refill(bucket, now)
+        if tokens < 1:
+            raise RateLimitExceeded(retry_after=(1 - tokens) / self.refill_per_second)
+
+    def acquire(self, key: str):
+        now = self.clock()
+        if self.shared_state is not None:
+            return self._acquire_shared(key, now)
+
+        self._evict_idle(now)
+
+        tokens = self._refill(self._buckets.pop(key, None), now)
+
+        if tokens < 1:
+            self._buckets[key] = (tokens, now)
+            raise RateLimitExceeded(retry_after=(1 - tokens) / self.refill_per_second)
+
+        self._buckets[key] = (tokens - 1, now)
+
+    def _acquire_shared(self, key: str, now: float):
+        exceeded = False
+
+        def take_token(bucket: tuple | None) -> tuple[tuple, float]:
+            nonlocal exceeded
+            tokens = self._refill(bucket, now)
+            exceeded = tokens < 1
+            return (tokens if exceeded else tokens - 1, now), self.capacity / self.refill_per_second
+
+        tokens, _ = self.shared_state.update(key, take_token)
+        if exceeded:
+            raise RateLimitExceeded(retry_after=(1 - tokens) / self.refill_per_second)
+
+    def _evict_idle(self, now: float):
+        refill_seconds = self.capacity / self.refill_per_second
+        while self._buckets:
+            key, (_, updated_at) = next(iter(self._buckets.items()))
+            if now - updated_at < refill_seconds and len(self._buckets) < self.max_keys:
+                break
+
+            del self._buckets[key]
+
+    def __len__(self) -> int:
+        return len(self._buckets)
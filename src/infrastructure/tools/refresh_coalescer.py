@@ -0,0 +1,83 @@
+import time
+import asyncio
+import hashlib
+from functools import partial
+from typing import Awaitable, Callable
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+from loguru import logger
+
+from src.services.auth.dto import TokensDTO
+
+
+@dataclass
+class RefreshCoalescer:
+    # NOTE: Parallel requests of a client often refresh with the same token.
+    # Duplicates arriving while the rotation is running wait for its result,
+    # duplicates arriving up to `grace_seconds` after it get the same pair,
+    # later ones are rejected by the usual refresh token check (reuse).
+    # Per-process, duplicates routed to other workers are not coalesced.
+    grace_seconds:  float = 5
+    max_size:       int = 100_000
+    clock:          Callable[[], float] = time.monotonic
+    _results:       OrderedDict[bytes, tuple[int, TokensDTO, float]] = field(init=False, repr=False, default_factory=OrderedDict)
+    _in_flight:     dict[bytes, asyncio.Task] = field(init=False, repr=False, default_factory=dict)
+
+    def __len__(self) -> int:
+        return len(self._results)
+
+    @staticmethod
+    def _get_key(refresh_token: str) -> bytes:
+        return hashlib.sha256(refresh_token.encode()).digest()
+
+    def clear(self):
+        self._results.clear()
+
+    def discard_user(self, user_id: int):
+        # NOTE: Called on logout, so a rotated pair isn't handed out afterwards.
+        for key in [key for key, (cached_user_id, _, _) in self._results.items() if cached_user_id == user_id]:
+            del self._results[key]
+
+    def _get_result(self, key: bytes) -> TokensDTO | None:
+        cached = self._results.get(key)
+        if cached is None:
+            return None
+        if cached[2] <= self.clock():
+            del self._results[key]
+            return None
+
+        return cached[1]
+
+    def _store_result(self, key: bytes, user_id: int, rotation: asyncio.Task):
+        del self._in_flight[key]
+        # NOTE: `exception()` also marks the exception as retrieved.
+        if rotation.cancelled() or rotation.exception() is not None or self.grace_seconds <= 0:
+            return
+
+        self._results[key] = (user_id, rotation.result(), self.clock() + self.grace_seconds)
+        while len(self._results) > self.max_size:
+            self._results.popitem(last=False)
+
+    async def rotate(
+        self,
+        user_id:        int,
+        refresh_token:  str,
+        rotate:         Callable[[], Awaitable[TokensDTO]],
+    ) -> TokensDTO:
+        key = self._get_key(refresh_token)
+        tokens = self._get_result(key)
+        if tokens is not None:
+            logger.debug(f"Refresh token of User(id={user_id}) was just rotated, reusing the new pair")
+            return tokens
+
+        rotation = self._in_flight.get(key)
+        if rotation is None:
+            # NOTE: Runs in its own task and is awaited shielded, so a cancelled
+            # request (client gone) doesn't cancel the rotation of the others.
+            rotation = self._in_flight[key] = asyncio.ensure_future(rotate())
+            rotation.add_done_callback(partial(self._store_result, key, user_id))
+        else:
+            logger.debug(f"Refresh token of User(id={user_id}) is being rotated, waiting for the new pair")
+
+        return await asyncio.shield(rotation)
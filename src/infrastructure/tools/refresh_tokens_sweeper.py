@@ -0,0 +1,49 @@
+import asyncio
+from typing import Callable
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+from loguru import logger
+
+from src.domain.uof.abstract import IUnitOfWork
+
+
+@dataclass
+class RefreshTokensSweeper:
+    # NOTE: Expired refresh tokens are deleted by small batches in separate
+    # transactions with a pause between them, so the sweep never holds long
+    # locks and leaves room for vacuum and for the regular traffic.
+    batch_size:             int = 1000
+    batch_pause_seconds:    float = 0.1
+
+    async def sweep(self, unit_of_work_factory: Callable[[], IUnitOfWork]) -> int:
+        now = datetime.now(timezone.utc)
+        deleted_total = 0
+        while True:
+            async with unit_of_work_factory() as uof:
+                deleted_count = await uof.users.delete_expired_refresh_tokens(
+                    now=now,
+                    limit=self.batch_size,
+                )
+
+            deleted_total += deleted_count
+            if deleted_count < self.batch_size:
+                break
+
+            await asyncio.sleep(self.batch_pause_seconds)
+
+        logger.info(f"Expired refresh tokens sweep finished: {deleted_total} deleted")
+        return deleted_total
+
+    async def run_sweep_loop(
+        self,
+        unit_of_work_factory:   Callable[[], IUnitOfWork],
+        interval_seconds:       float,
+    ):
+        while True:
+            try:
+                await self.sweep(unit_of_work_factory)
+            except Exception as ex:
+                logger.error(f"Expired refresh tokens sweep failed: {type(ex)}: {ex}")
+
+            await asyncio.sleep(interval_seconds)
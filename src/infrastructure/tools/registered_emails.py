@@ -0,0 +1,71 @@
+import asyncio
+from typing import Callable
+from dataclasses import dataclass, field
+
+from loguru import logger
+
+from src.domain.uof.abstract import IUnitOfWork
+from src.infrastructure.tools.bloom_filter import BloomFilter
+
+
+@dataclass
+class RegisteredEmailsFilter:
+    # NOTE: In-process Bloom filter of the normalized emails of all users.
+    # Most checked emails are free, the filter answers "definitely free"
+    # for them without a query, only possible hits are checked in the
+    # database. Until the first load every email is checked in the database.
+    # Registrations of other processes are picked up on the periodic reload,
+    # meanwhile they may be reported free (registration checks the database).
+    capacity:           int = 1_000_000
+    error_rate:         float = 0.01
+    load_batch_size:    int = 10_000
+    ready:              bool = field(init=False, default=False)
+    _filter:            BloomFilter = field(init=False, repr=False)
+    _added:             list[str] = field(init=False, repr=False, default_factory=list)
+
+    def __post_init__(self):
+        self._filter = BloomFilter(capacity=self.capacity, error_rate=self.error_rate)
+
+    def add(self, email: str):
+        self._filter.add(email)
+        self._added.append(email)
+
+    async def is_registered(self, email: str, unit_of_work: IUnitOfWork) -> bool:
+        if self.ready and email not in self._filter:
+            return False
+
+        async with unit_of_work as uof:
+            return bool(await uof.users.get_existing_emails(emails=[email]))
+
+    async def load(self, unit_of_work: IUnitOfWork):
+        # NOTE: The filter is built aside and swapped in, emails added by this
+        # process while the table was streamed are added again.
+        self._added = []
+        async with unit_of_work as uof:
+            users_count = await uof.users.count_users()
+            emails_filter = BloomFilter(
+                capacity=max(self.capacity, 2 * users_count),
+                error_rate=self.error_rate,
+            )
+            async for email in uof.users.stream_emails(batch_size=self.load_batch_size):
+                emails_filter.add(email)
+
+        for email in self._added:
+            emails_filter.add(email)
+        self._filter = emails_filter
+        self._added = []
+        self.ready = True
+        logger.debug(f"Registered emails filter loaded: {users_count} users")
+
+    async def run_load_loop(
+        self,
+        unit_of_work_factory:   Callable[[], IUnitOfWork],
+        interval_seconds:       float,
+    ):
+        while True:
+            try:
+                await self.load(unit_of_work_factory())
+            except Exception as ex:
+                logger.error(f"Registered emails filter load failed: {type(ex)}: {ex}")
+
+            await asyncio.sleep(interval_seconds)
@@ -0,0 +1,218 @@
+import os
+import time
+import mmap
+import fcntl
+import struct
+import hashlib
+from typing import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+
+
+HEADER = struct.Struct("<8sIII")
+MAGIC = b"JWTSHM01"
+KEY_SIZE = 16
+SLOT_HEADER = struct.Struct(f"<{KEY_SIZE}sd")
+EMPTY_KEY = bytes(KEY_SIZE)
+
+
+@dataclass
+class SharedStateStore:
+    # NOTE: Fixed-size hash table in a shared memory mapped file, shared by
+    # all worker processes of a host (put the file on tmpfs, e.g. /dev/shm).
+    # Keys are stored as 16 bytes digests, values are up to `value_size`
+    # bytes and every entry has an expiration time. The table is split into
+    # `stripes`, each guarded by its own `fcntl` record lock, a key is looked
+    # up in a window of `probe_length` slots of its stripe. When the window
+    # is full the entry expiring first is evicted, so the table never grows.
+    # Expiration times use `time.monotonic`, which is system-wide on Linux.
+    path:           str
+    slots:          int = 262_144
+    stripes:        int = 64
+    value_size:     int = 16
+    probe_length:   int = 8
+    clock:          Callable[[], float] = time.monotonic
+    _fd:            int = field(init=False, repr=False, default=-1)
+    _mmap:          mmap.mmap | None = field(init=False, repr=False, default=None)
+    _slot_size:     int = field(init=False, repr=False, default=0)
+    _stripe_slots:  int = field(init=False, repr=False, default=0)
+
+    def __post_init__(self):
+        if self.slots % self.stripes:
+            raise ValueError("Slots count must be a multiple of stripes count")
+
+        self._slot_size = SLOT_HEADER.size + self.value_size
+        self._stripe_slots = self.slots // self.stripes
+        self.probe_length = min(self.probe_length, self._stripe_slots)
+
+    def open(self):
+        # NOTE: Called by the app lifespan of every worker (and on first use),
+        # never at import, so the supervisor can remove the file of the
+        # previous run before any worker maps it.
+        if self._mmap is not None:
+            return
+
+        size = HEADER.size + self.slots * self._slot_size
+
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        # NOTE: The first process initializes the file, others wait for it on
+        # the lock of the header (stripe locks are taken on bytes after it).
+        fcntl.lockf(self._fd, fcntl.LOCK_EX, HEADER.size, 0)
+        try:
+            if os.fstat(self._fd).st_size == 0:
+                os.ftruncate(self._fd, size)
+                os.pwrite(self._fd, HEADER.pack(MAGIC, self.slots, self.stripes, self.value_size), 0)
+
+            header = HEADER.unpack(os.pread(self._fd, HEADER.size, 0))
+        finally:
+            fcntl.lockf(self._fd, fcntl.LOCK_UN, HEADER.size, 0)
+
+        if header != (MAGIC, self.slots, self.stripes, self.value_size):
+            os.close(self._fd)
+            raise ValueError(f"Shared state file '{self.path}' has another layout, remove it to recreate")
+
+        self._mmap = mmap.mmap(self._fd, size)
+
+    def close(self):
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+            os.close(self._fd)
+
+    @staticmethod
+    def remove(path: str):
+        # NOTE: Called by the supervisor before workers are started,
+        # so every run starts with an empty table.
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+
+    @contextmanager
+    def _lock_stripe(self, stripe: int) -> Iterator[None]:
+        # NOTE: Record locks are per process, that's enough as the store is
+        # only used from the event loop thread of every worker.
+        self.open()
+        fcntl.lockf(self._fd, fcntl.LOCK_EX, 1, HEADER.size + stripe)
+        try:
+            yield
+        finally:
+            fcntl.lockf(self._fd, fcntl.LOCK_UN, 1, HEADER.size + stripe)
+
+    def _locate(self, key: str) -> tuple[bytes, int, list[int]]:
+        digest = hashlib.blake2b(key.encode(), digest_size=KEY_SIZE).digest()
+        if digest == EMPTY_KEY:
+            digest = b"\x01" + digest[1:]
+
+        key_hash = int.from_bytes(digest[:8], "little")
+        stripe = key_hash % self.stripes
+        first_slot = stripe * self._stripe_slots
+        start = (key_hash // self.stripes) % self._stripe_slots
+        return digest, stripe, [
+            HEADER.size + (first_slot + offset % self._stripe_slots) * self._slot_size
+            for offset in range(start, start + self.probe_length)
+        ]
+
+    def _find(self, digest: bytes, slot_offsets: list[int], now: float) -> tuple[int | None, int]:
+        # NOTE: Returns the offset of the live entry of the key (if any)
+        # and the offset to write a new entry to: a free or expired slot,
+        # otherwise the one expiring first.
+        found, free, free_expires_at = None, slot_offsets[0], float("inf")
+        for slot_offset in slot_offsets:
+            slot_key, expires_at = SLOT_HEADER.unpack_from(self._mmap, slot_offset)
+            if slot_key == digest and expires_at > now:
+                found = slot_offset
+            if expires_at <= now:
+                expires_at = float("-inf")
+            if expires_at < free_expires_at:
+                free, free_expires_at = slot_offset, expires_at
+
+        return found, found if found is not None else free
+
+    def _read_value(self, slot_offset: int) -> bytes:
+        value_offset = slot_offset + SLOT_HEADER.size
+        return self._mmap[value_offset:value_offset + self.value_size]
+
+    def _write(self, slot_offset: int, digest: bytes, value: bytes, expires_at: float):
+        SLOT_HEADER.pack_into(self._mmap, slot_offset, digest, expires_at)
+        value_offset = slot_offset + SLOT_HEADER.size
+        self._mmap[value_offset:value_offset + self.value_size] = value.ljust(self.value_size, b"\x00")
+
+    def get(self, key: str) -> bytes | None:
+        digest, stripe, slot_offsets = self._locate(key)
+        with self._lock_stripe(stripe):
+            found, _ = self._find(digest, slot_offsets, self.clock())
+            return None if found is None else self._read_value(found)
+
+    def set(self, key: str, value: bytes, ttl_seconds: float):
+        if len(value) > self.value_size:
+            raise ValueError(f"Value is longer than {self.value_size} bytes")
+
+        digest, stripe, slot_offsets = self._locate(key)
+        with self._lock_stripe(stripe):
+            now = self.clock()
+            _, slot_offset = self._find(digest, slot_offsets, now)
+            self._write(slot_offset, digest, value, now + ttl_seconds)
+
+    def update(
+        self,
+        key:    str,
+        update: Callable[[bytes | None], tuple[bytes, float]],
+    ) -> bytes:
+        # NOTE: Atomic read-modify-write, `update` gets the current value
+        # (None if missing or expired) and returns the new one with its TTL.
+        digest, stripe, slot_offsets = self._locate(key)
+        with self._lock_stripe(stripe):
+            now = self.clock()
+            found, slot_offset = self._find(digest, slot_offsets, now)
+            value, ttl_seconds = update(None if found is None else self._read_value(found))
+            if len(value) > self.value_size:
+                raise ValueError(f"Value is longer than {self.value_size} bytes")
+
+            self._write(slot_offset, digest, value, now + ttl_seconds)
+            return value
+
+    def delete(self, key: str):
+        digest, stripe, slot_offsets = self._locate(key)
+        with self._lock_stripe(stripe):
+            found, _ = self._find(digest, slot_offsets, self.clock())
+            if found is not None:
+                SLOT_HEADER.pack_into(self._mmap, found, EMPTY_KEY, 0)
+
+    def view(self, prefix: str, value_struct: struct.Struct) -> "SharedStateView":
+        if value_struct.size > self.value_size:
+            raise ValueError(f"Values of {value_struct.format} are longer than {self.value_size} bytes")
+
+        return SharedStateView(store=self, prefix=prefix, value_struct=value_struct)
+
+
+@dataclass
+class SharedStateView:
+    # NOTE: Namespaced and typed access to a store, values are tuples
+    # packed with `value_struct`.
+    store:          SharedStateStore
+    prefix:         str
+    value_struct:   struct.Struct
+
+    def _unpack(self, value: bytes | None) -> tuple | None:
+        return None if value is None else self.value_struct.unpack_from(value)
+
+    def get(self, key: str) -> tuple | None:
+        return self._unpack(self.store.get(self.prefix + key))
+
+    def set(self, key: str, value: tuple, ttl_seconds: float):
+        self.store.set(self.prefix + key, self.value_struct.pack(*value), ttl_seconds)
+
+    def update(
+        self,
+        key:    str,
+        update: Callable[[tuple | None], tuple[tuple, float]],
+    ) -> tuple:
+        def update_packed(value: bytes | None) -> tuple[bytes, float]:
+            new_value, ttl_seconds = update(self._unpack(value))
+            return self.value_struct.pack(*new_value), ttl_seconds
+
+        return self._unpack(self.store.update(self.prefix + key, update_packed))
+
+    def delete(self, key: str):
+        self.store.delete(self.prefix + key)
@@ -0,0 +1,94 @@
+import time
+import asyncio
+from typing import Awaitable, Callable
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+from loguru import logger
+
+from src.domain.uof.abstract import IUnitOfWork
+from src.domain.repositories.exc import UserNotFound
+from src.infrastructure.tools.tokens_tools import InvalidToken, TokenRevoked
+
+
+@dataclass
+class TokenVersionsCache:
+    # NOTE: Per-process cache of `users.token_version`. Every token carries
+    # the version of its user at issue time (`ver` claim), bumping the version
+    # revokes all tokens of the user. Versions are refreshed by events
+    # (`set` by this process, `handle_notification` for other processes)
+    # and `ttl_seconds` bounds the staleness when an event is missed.
+    ttl_seconds:    float = 30
+    max_size:       int = 100_000
+    clock:          Callable[[], float] = time.monotonic
+    _versions:      OrderedDict[int, tuple[int, float]] = field(init=False, repr=False, default_factory=OrderedDict)
+
+    def __len__(self) -> int:
+        return len(self._versions)
+
+    def set(self, user_id: int, token_version: int):
+        # NOTE: Versions only grow, a late event never lowers the cached one.
+        cached = self._versions.get(user_id)
+        if cached is not None and cached[0] > token_version:
+            token_version = cached[0]
+
+        self._versions[user_id] = (token_version, self.clock() + self.ttl_seconds)
+        self._versions.move_to_end(user_id)
+        while len(self._versions) > self.max_size:
+            self._versions.popitem(last=False)
+
+    def clear(self):
+        self._versions.clear()
+
+    def handle_notification(self, payload: str):
+        # NOTE: Payload is "<user_id>:<token_version>".
+        try:
+            user_id, token_version = map(int, payload.split(":"))
+        except ValueError:
+            logger.warning(f"Invalid token version notification '{payload}'")
+            return
+
+        self.set(user_id, token_version)
+
+    async def get(self, user_id: int, unit_of_work: IUnitOfWork) -> int:
+        cached = self._versions.get(user_id)
+        if cached is not None and cached[1] > self.clock():
+            return cached[0]
+
+        logger.debug(f"Token version of User(id={user_id}) is not cached, loading from database")
+        async with unit_of_work as uof:
+            token_version = await uof.users.get_token_version(user_id=user_id)
+
+        self.set(user_id, token_version)
+        return token_version
+
+    async def check(self, payload: dict, unit_of_work: IUnitOfWork):
+        user_id, token_version = int(payload["sub"]), payload.get("ver", 0)
+        try:
+            current_version = await self.get(user_id, unit_of_work)
+        except UserNotFound:
+            raise InvalidToken
+
+        if token_version < current_version:
+            raise TokenRevoked
+        if token_version > current_version:
+            # NOTE: Tokens are signed by us, so a newer version means the
+            # cached one is stale (the bump event was not received yet).
+            self.set(user_id, token_version)
+
+    async def run_listen_loop(
+        self,
+        listen:                 Callable[[Callable[[str], None]], Awaitable[None]],
+        retry_interval_seconds: float,
+    ):
+        # NOTE: `listen` subscribes the callback and waits while subscribed.
+        # Events missed while not subscribed are unknown, so the cache is
+        # cleared before every (re)subscription.
+        while True:
+            self.clear()
+            try:
+                await listen(self.handle_notification)
+            except Exception as ex:
+                logger.error(f"Token versions listener failed: {type(ex)}: {ex}")
+
+            await asyncio.sleep(retry_interval_seconds)
@@ -0,0 +1,69 @@
+import asyncio
+from typing import Callable
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+
+from loguru import logger
+
+from src.domain.uof.abstract import IUnitOfWork
+from src.infrastructure.tools.bloom_filter import BloomFilter
+
+
+@dataclass
+class TokensDenylist:
+    # NOTE: In-process Bloom filter in front of the `revoked_tokens` table.
+    # Almost every verified token is not revoked, the filter answers
+    # "definitely not revoked" for them without a query, only possible
+    # hits are checked in the database. Until the first sync every token
+    # is checked in the database, so a restart doesn't forget revocations.
+    capacity:   int = 100_000
+    error_rate: float = 0.001
+    ready:      bool = field(init=False, default=False)
+    _filter:    BloomFilter = field(init=False, repr=False)
+    _added:     list[str] = field(init=False, repr=False, default_factory=list)
+
+    def __post_init__(self):
+        self._filter = BloomFilter(capacity=self.capacity, error_rate=self.error_rate)
+
+    def add(self, jti: str):
+        self._filter.add(jti)
+        self._added.append(jti)
+
+    async def is_revoked(self, jti: str, unit_of_work: IUnitOfWork) -> bool:
+        if self.ready and jti not in self._filter:
+            return False
+
+        logger.debug(f"Token(jti='{jti}') may be revoked, checking in database")
+        async with unit_of_work as uof:
+            return await uof.users.is_token_revoked(jti=jti)
+
+    async def sync(self, unit_of_work: IUnitOfWork):
+        now = datetime.now(timezone.utc)
+        self._added = []
+        async with unit_of_work as uof:
+            deleted_count = await uof.users.delete_expired_revoked_tokens(now=now)
+            revoked_jtis = await uof.users.get_revoked_tokens(now=now)
+
+        # NOTE: The filter is rebuilt from scratch, so expired tokens leave it.
+        # Tokens revoked by this process while the query was running are
+        # added again, rebinding the attribute is atomic for concurrent readers.
+        self._filter = BloomFilter.from_items(
+            [*revoked_jtis, *self._added],
+            capacity=max(self.capacity, 2 * len(revoked_jtis)),
+            error_rate=self.error_rate,
+        )
+        self.ready = True
+        logger.debug(f"Tokens denylist synced: {len(revoked_jtis)} revoked, {deleted_count} expired deleted")
+
+    async def run_sync_loop(
+        self,
+        unit_of_work_factory:   Callable[[], IUnitOfWork],
+        interval_seconds:       float,
+    ):
+        while True:
+            try:
+                await self.sync(unit_of_work_factory())
+            except Exception as ex:
+                logger.error(f"Tokens denylist sync failed: {type(ex)}: {ex}")
+
+            await asyncio.sleep(interval_seconds)
@@ -0,0 +1,125 @@
+import os
+import struct
+import asyncio
+from enum import IntEnum
+from typing import Callable
+from dataclasses import dataclass
+
+import orjson
+from loguru import logger
+
+from src.domain.uof.abstract import IUnitOfWork
+from src.infrastructure.tools.tokens_denylist import TokensDenylist
+from src.infrastructure.tools.token_versions_cache import TokenVersionsCache
+from src.infrastructure.tools.tokens_tools import InvalidToken, JWTTokensValidator, TokenExpired, TokenRevoked
+
+
+# NOTE: Protocol. Every frame is a 4 bytes big-endian length and a body.
+# Request body is an access token, response body is a status byte followed
+# by JSON claims (status OK) or nothing. A client may pipeline any number
+# of requests on a connection, responses are sent in the requests order.
+FRAME_HEADER = struct.Struct(">I")
+
+
+class SidecarStatuses(IntEnum):
+    OK:             int = 0
+    INVALID_TOKEN:  int = 1
+    TOKEN_EXPIRED:  int = 2
+    TOKEN_REVOKED:  int = 3
+    BAD_REQUEST:    int = 4
+    INTERNAL_ERROR: int = 5
+
+
+def encode_frame(body: bytes) -> bytes:
+    return FRAME_HEADER.pack(len(body)) + body
+
+
+async def read_frame(reader: asyncio.StreamReader, max_size: int) -> bytes | None:
+    # NOTE: `None` on a clean end of the stream between frames.
+    try:
+        header = await reader.readexactly(FRAME_HEADER.size)
+    except asyncio.IncompleteReadError as ex:
+        if ex.partial:
+            raise
+        return None
+
+    (size,) = FRAME_HEADER.unpack(header)
+    if size > max_size:
+        raise ValueError(f"Frame of {size} bytes exceeds {max_size} bytes")
+
+    return await reader.readexactly(size)
+
+
+def dump_claims(claims: dict) -> bytes:
+    return orjson.dumps(claims)
+
+
+@dataclass
+class TokensSidecarServer:
+    # NOTE: Local verification of access tokens for co-located services
+    # without the HTTP stack. Revocation is checked when `tokens_denylist`
+    # and `token_versions_cache` are given, possible hits and cache misses
+    # are checked in the database by `unit_of_work_factory`.
+    tokens_validator:       JWTTokensValidator
+    tokens_denylist:        TokensDenylist | None = None
+    unit_of_work_factory:   Callable[[], IUnitOfWork] | None = None
+    token_versions_cache:   TokenVersionsCache | None = None
+    max_token_size:         int = 8192
+
+    async def verify(self, token: bytes) -> bytes:
+        try:
+            payload = self.tokens_validator.validate_access_token(token.decode("utf-8"))
+            if self.tokens_denylist is not None and "jti" in payload and await self.tokens_denylist.is_revoked(
+                payload["jti"],
+                self.unit_of_work_factory(),
+            ):
+                return bytes((SidecarStatuses.TOKEN_REVOKED,))
+            if self.token_versions_cache is not None:
+                await self.token_versions_cache.check(payload, self.unit_of_work_factory())
+        except TokenExpired:
+            return bytes((SidecarStatuses.TOKEN_EXPIRED,))
+        except TokenRevoked:
+            return bytes((SidecarStatuses.TOKEN_REVOKED,))
+        except (InvalidToken, UnicodeDecodeError):
+            return bytes((SidecarStatuses.INVALID_TOKEN,))
+        except Exception as ex:
+            logger.error(f"{type(ex)}: {ex}")
+            return bytes((SidecarStatuses.INTERNAL_ERROR,))
+
+        return bytes((SidecarStatuses.OK,)) + dump_claims(payload)
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                try:
+                    token = await read_frame(reader, max_size=self.max_token_size)
+                except ValueError as ex:
+                    logger.warning(f"Sidecar bad request: {ex}")
+                    writer.write(encode_frame(bytes((SidecarStatuses.BAD_REQUEST,))))
+                    break
+                if token is None:
+                    break
+
+                # NOTE: `drain` only waits when the client doesn't read
+                # the responses of its pipelined requests.
+                writer.write(encode_frame(await self.verify(token)))
+                await writer.drain()
+            await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, socket_path: str):
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+
+        server = await asyncio.start_unix_server(self.handle_connection, path=socket_path)
+        os.chmod(socket_path, 0o660)
+        logger.info(f"Tokens sidecar is listening on {socket_path}")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            if os.path.exists(socket_path):
+                os.unlink(socket_path)
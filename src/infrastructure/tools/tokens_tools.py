@@ -1,5 +1,7 @@
+import secrets
+from uuid import uuid4
 from dataclasses import dataclass
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from enum import Enum
 import jwt
 from loguru import logger
@@ -10,6 +12,29 @@ class TokensTypes(Enum):
     REFRESH: str = "refresh"
     
     
+class TokensProfiles(Enum):
+    DEFAULT: str = "default"
+    COMPACT: str = "compact"
+
+
+# NOTE: Compact profile claims: `u` - user id (int), `t` - token type,
+# `jti` - 96 bits id, `exp`, `v` - token version (omitted when 0).
+# `iat` is not used by anything and is dropped.
+# With `type_in_header` the type is in the `typ` header instead of `t`.
+COMPACT_TOKENS_TYPES = {
+    TokensTypes.ACCESS.value: 0,
+    TokensTypes.REFRESH.value: 1,
+}
+HEADER_TOKENS_TYPES = {
+    TokensTypes.ACCESS.value: "at+jwt",
+    TokensTypes.REFRESH.value: "rt+jwt",
+}
+COMPACT_TOKENS_TYPES_NAMES = {
+    **{value: key for key, value in COMPACT_TOKENS_TYPES.items()},
+    **{value: key for key, value in HEADER_TOKENS_TYPES.items()},
+}
+    
+    
 class InvalidTokenType(Exception):
     ...
 
@@ -21,6 +46,10 @@ class InvalidToken(Exception):
 class TokenExpired(Exception):
     ...
     
+    
+class TokenRevoked(Exception):
+    ...
+    
 
 @dataclass
 class JWTTokensGenerator:
@@ -28,48 +57,81 @@ class JWTTokensGenerator:
     access_token_exp_minutes: int
     refresh_token_exp_minutes: int
     algorithm: str = "HS256"
+    profile: TokensProfiles = TokensProfiles.DEFAULT
+    type_in_header: bool = False
         
-    def _generate_jwt(self, payload: dict) -> str:
+    def _generate_jwt(self, payload: dict, headers: dict | None = None) -> str:
         return jwt.encode(
             payload=payload,
             key=self.secret_key,
-            algorithm=self.algorithm
+            algorithm=self.algorithm,
+            headers=headers,
         )
         
     def _generate_token(
         self,
         sub: int | str,
         token_type: TokensTypes,
-        expire_minutes: int
+        expire_minutes: int,
+        token_version: int = 0,
     ):
         current_timestamp = datetime.now()
+        if self.profile == TokensProfiles.COMPACT:
+            return self._generate_compact_token(
+                sub=sub,
+                token_type=token_type,
+                exp=int((current_timestamp + timedelta(minutes=expire_minutes)).timestamp()),
+                token_version=token_version,
+            )
+
         return self._generate_jwt(
             payload={
                 "sub": str(sub),
+                "jti": uuid4().hex,
                 "token_type": token_type,
+                "ver": token_version,
                 "iat": int(current_timestamp.timestamp()),
                 "exp": int((current_timestamp + timedelta(minutes=expire_minutes)).timestamp()),
             }
         )
         
+    def _generate_compact_token(self, sub: int | str, token_type: str, exp: int, token_version: int):
+        payload = {"u": int(sub), "jti": secrets.token_urlsafe(12), "exp": exp}
+        if token_version:
+            payload["v"] = token_version
+        if self.type_in_header:
+            return self._generate_jwt(
+                payload=payload,
+                headers={"typ": HEADER_TOKENS_TYPES[token_type]},
+            )
+
+        return self._generate_jwt(payload={**payload, "t": COMPACT_TOKENS_TYPES[token_type]})
+        
     def generate_access_token(
         self,
         sub: str,
+        token_version: int = 0,
     ):
         return self._generate_token(
             sub=sub,
             token_type=TokensTypes.ACCESS.value,
-            expire_minutes=self.access_token_exp_minutes
+            expire_minutes=self.access_token_exp_minutes,
+            token_version=token_version,
         )
         
+    def get_refresh_token_expiration(self) -> datetime:
+        return datetime.now(timezone.utc) + timedelta(minutes=self.refresh_token_exp_minutes)
+        
     def generate_refresh_token(
         self,
         sub: int | str,
+        token_version: int = 0,
     ):
         return self._generate_token(
             sub=sub,
             token_type=TokensTypes.REFRESH.value,
-            expire_minutes=self.refresh_token_exp_minutes
+            expire_minutes=self.refresh_token_exp_minutes,
+            token_version=token_version,
         )
         
 
@@ -79,13 +141,32 @@ class JWTTokensValidator:
     algorithm: str = "HS256"
     
     def _decode_jwt(self, token: str) -> dict:
-        return jwt.decode(
+        decoded = jwt.decode_complete(
             token,
             key=self.secret_key,
             algorithms=[self.algorithm],
         )
+        return self._normalize_payload(header=decoded["header"], payload=decoded["payload"])
     
-    def _validate_token(self, token: str, expected_token_type: TokensTypes) -> dict:
+    def _normalize_payload(self, header: dict, payload: dict) -> dict:
+        # NOTE: Both profiles are accepted, compact payloads are converted
+        # to the default claims (`sub`, `token_type`, `jti`, `exp`, `ver`).
+        if "token_type" in payload:
+            return payload
+        
+        try:
+            return {
+                "sub": str(payload["u"]),
+                "token_type": COMPACT_TOKENS_TYPES_NAMES[payload["t"] if "t" in payload else header.get("typ")],
+                "jti": payload["jti"],
+                "exp": payload["exp"],
+                "ver": payload.get("v", 0),
+            }
+        except (KeyError, TypeError) as ex:
+            logger.error(f"Invalid compact token payload: {type(ex)}: {ex}")
+            raise InvalidToken
+    
+    def decode_token(self, token: str) -> dict:
         try:
             payload = self._decode_jwt(token=token)
         except jwt.ExpiredSignatureError:
@@ -94,6 +175,11 @@ class JWTTokensValidator:
             logger.error(f"{type(ex)}: {ex}")
             raise InvalidToken
         
+        return payload
+    
+    def _validate_token(self, token: str, expected_token_type: TokensTypes) -> dict:
+        payload = self.decode_token(token=token)
+        
         logger.debug(payload)
         if payload["token_type"] != expected_token_type.value:
             raise InvalidToken
@@ -0,0 +1,117 @@
+import os
+import csv
+import json
+import asyncio
+from enum import Enum
+from dataclasses import asdict, dataclass
+from typing import AsyncIterable, AsyncIterator
+
+from loguru import logger
+
+from src.services.users.dto import ImportReportDTO, ImportUserDTO
+
+
+class ImportFormats(Enum):
+    NDJSON: str = "ndjson"
+    CSV: str = "csv"
+
+
+async def read_file_chunks(path: str, chunk_size: int = 1024 * 1024) -> AsyncIterator[bytes]:
+    with open(path, "rb") as file:
+        while chunk := await asyncio.to_thread(file.read, chunk_size):
+            yield chunk
+
+
+async def iter_lines(chunks: AsyncIterable[bytes]) -> AsyncIterator[str]:
+    buffer = b""
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield line.decode("utf-8").rstrip("\r")
+
+    if buffer:
+        yield buffer.decode("utf-8").rstrip("\r")
+
+
+def _to_import_user(row: dict) -> ImportUserDTO | None:
+    email = row.get("email")
+    if not isinstance(email, str):
+        return None
+
+    return ImportUserDTO(
+        email=email.strip(),
+        password=row.get("password") or None,
+        password_hash=row.get("password_hash") or None,
+    )
+
+
+async def parse_ndjson(lines: AsyncIterable[str]) -> AsyncIterator[ImportUserDTO | None]:
+    async for line in lines:
+        if not line.strip():
+            continue
+
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError as ex:
+            logger.warning(f"Invalid NDJSON line: {ex}")
+            yield None
+            continue
+
+        yield _to_import_user(row) if isinstance(row, dict) else None
+
+
+async def parse_csv(lines: AsyncIterable[str]) -> AsyncIterator[ImportUserDTO | None]:
+    # NOTE: Rows are parsed line by line to keep memory constant,
+    # so quoted values with line breaks are not supported.
+    header = None
+    async for line in lines:
+        if not line.strip():
+            continue
+
+        values = next(csv.reader([line]))
+        if header is None:
+            header = [column.strip() for column in values]
+            continue
+
+        if len(values) != len(header):
+            yield None
+            continue
+
+        yield _to_import_user(dict(zip(header, values)))
+
+
+def parse_users(
+    chunks: AsyncIterable[bytes],
+    import_format: ImportFormats,
+) -> AsyncIterator[ImportUserDTO | None]:
+    lines = iter_lines(chunks)
+    if import_format == ImportFormats.CSV:
+        return parse_csv(lines)
+
+    return parse_ndjson(lines)
+
+
+@dataclass
+class ImportCheckpoint:
+    path: str
+
+    def load(self) -> ImportReportDTO | None:
+        if not os.path.exists(self.path):
+            return None
+
+        with open(self.path) as file:
+            return ImportReportDTO(**json.load(file))
+
+    async def save(self, report: ImportReportDTO):
+        await asyncio.to_thread(self._write, report)
+
+    def _write(self, report: ImportReportDTO):
+        # NOTE: Write + rename, so a crash never leaves a torn checkpoint.
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as file:
+            json.dump(asdict(report), file)
+            file.flush()
+            os.fsync(file.fileno())
+
+        os.replace(tmp_path, self.path)
@@ -1,7 +1,9 @@
 from dataclasses import dataclass
+from datetime import datetime, timezone
 
 from loguru import logger
-from src.domain.entities.users import User
+from src.domain.entities.users import User, normalize_email
+from src.domain.entities.audit import AuditEvent, AuditEventTypes
 from src.domain.repositories.exc import (
     UserNotFound as UserNotFoundDB,
     RefreshTokenNotFound as RefreshTokenNotFoundDB,
@@ -10,6 +12,11 @@ from src.domain.repositories.exc import (
 from src.domain.uof.abstract import IUnitOfWork
 from src.infrastructure.tools.tokens_tools import JWTTokensGenerator
 from src.infrastructure.tools.password_manager import PasswordManager
+from src.infrastructure.tools.tokens_denylist import TokensDenylist
+from src.infrastructure.tools.token_versions_cache import TokenVersionsCache
+from src.infrastructure.tools.refresh_coalescer import RefreshCoalescer
+from src.infrastructure.tools.audit_log import AuditLog
+from src.infrastructure.tools.registered_emails import RegisteredEmailsFilter
 
 from .dto import TokensDTO
 from ..exc import InvalidPassword, UserAlreadyRegistred, UserNotFound, RefreshTokenNotFound
@@ -37,44 +44,103 @@ class AuthService:
     # Rationale: YAGNI principle.
     tokens_generator: JWTTokensGenerator
     
+    # NOTE: Optional to keep local denylist filter in sync with revocations made
+    # by this process, other processes pick them up on the periodic sync.
+    tokens_denylist: TokensDenylist | None = None
+    
+    # NOTE: Optional to update the local token versions cache right away
+    # when sessions are revoked by this process.
+    token_versions_cache: TokenVersionsCache | None = None
+    
+    # NOTE: Optional to coalesce parallel refreshes with the same token
+    # onto one rotation, see `rotate_refresh_token`.
+    refresh_coalescer: RefreshCoalescer | None = None
+    
+    # NOTE: Optional write-behind audit trail, events are queued
+    # and written outside of the request transaction.
+    audit_log: AuditLog | None = None
+    
+    # NOTE: Optional filter answering most availability checks without
+    # a query, kept in sync with registrations made by this process.
+    registered_emails: RegisteredEmailsFilter | None = None
+    
+    def _audit(
+        self,
+        event_type: AuditEventTypes,
+        user_id:    int | None = None,
+        email:      str | None = None,
+        client_ip:  str | None = None,
+    ):
+        if self.audit_log is None:
+            return
+        
+        self.audit_log.record(
+            AuditEvent(
+                event_type=event_type,
+                created_at=datetime.now(timezone.utc),
+                user_id=user_id,
+                email=email,
+                client_ip=client_ip,
+            )
+        )
+    
     async def login_user(
         self,
         email:      str,
         password:   str,
+        client_ip:  str | None = None,
     ) -> TokensDTO:
         try:
             logger.debug(f"Trying find user with email='{email}' in database")
             async with self.unit_of_work as uof:
                 user = await uof.users.get_by_email(
-                    email=email,
+                    email=normalize_email(email),
                 )
                 
                 is_valid_password = self.password_manager.verify_password(password, user.password_hash)
                 logger.debug(f"{is_valid_password=}")
                 if not is_valid_password:
                     logger.debug(f"User(email='{email}') invalid password")
+                    self._audit(AuditEventTypes.LOGIN_FAILED, user_id=user.id, email=email, client_ip=client_ip)
                     raise InvalidPassword
                 
+                if self.password_manager.needs_rehash(user.password_hash):
+                    logger.debug(f"Rehash password of User(id={user.id}) with current scheme")
+                    await uof.users.update_password_hash(
+                        user_id=user.id,
+                        password_hash=self.password_manager.hash_password(password),
+                    )
+                
                 logger.debug("Generating pair of JWT-tokens")
-                refresh_token = self.tokens_generator.generate_refresh_token(sub=user.id)
-                access_token = self.tokens_generator.generate_access_token(sub=user.id)
+                refresh_token = self.tokens_generator.generate_refresh_token(
+                    sub=user.id,
+                    token_version=user.token_version,
+                )
+                refresh_token_expires_at = self.tokens_generator.get_refresh_token_expiration()
+                access_token = self.tokens_generator.generate_access_token(
+                    sub=user.id,
+                    token_version=user.token_version,
+                )
                 
                 try:
                     logger.debug(f"Try update refresh token User(id={user.id})")
                     await uof.users.update_refresh_token(
                         user_id=user.id,
-                        refresh_token=refresh_token
+                        refresh_token=refresh_token,
+                        expires_at=refresh_token_expires_at,
                     )
                 except RefreshTokenNotFoundDB:
                     logger.debug(f"Refresh token not found User(id={user.id})")
                     logger.debug(f"Add refresh token User(id={user.id})")
                     await uof.users.add_refresh_token(
                         user_id=user.id,
-                        refresh_token=refresh_token
+                        refresh_token=refresh_token,
+                        expires_at=refresh_token_expires_at,
                     )
                     
         except UserNotFoundDB:
             logger.debug(f"User email='{email}' not found")
+            self._audit(AuditEventTypes.LOGIN_FAILED, email=email, client_ip=client_ip)
             raise UserNotFound
         
         except Exception as ex:
@@ -82,6 +148,7 @@ class AuthService:
             raise ex
                 
         logger.info(f"Login user with email='{email}'.")
+        self._audit(AuditEventTypes.LOGIN, user_id=user.id, email=email, client_ip=client_ip)
         return TokensDTO(
             access_token=access_token,
             refresh_token=refresh_token
@@ -91,12 +158,13 @@ class AuthService:
         self,
         email:      str,
         password:   str,
+        client_ip:  str | None = None,
     ) -> User:
         try:
             logger.debug(f"Trying find User(email='{email}') in database.")
             async with self.unit_of_work as uof:
                 await uof.users.get_by_email(
-                    email=email
+                    email=normalize_email(email)
                 )
         except UserNotFoundDB:
             try:
@@ -108,42 +176,62 @@ class AuthService:
                         user=User(
                             id=0,
                             email=email,
+                            email_normalized=normalize_email(email),
                             password_hash=self.password_manager.hash_password(password)
                         )
                     )
                                         
                     logger.info(f"New User(email='{email}') succesfully added.")
-                    return User(
-                        id=new_user.id,
-                        email=new_user.email,
-                        password_hash=new_user.password_hash
-                    )
+                if self.registered_emails is not None:
+                    self.registered_emails.add(new_user.email_normalized)
             except Exception as ex:
                 logger.error(f"User registration failed User(email='{email}'. Error: {str(ex)})")
                 raise ex
+            
+            self._audit(AuditEventTypes.REGISTER, user_id=new_user.id, email=email, client_ip=client_ip)
+            return User(
+                id=new_user.id,
+                email=new_user.email,
+                password_hash=new_user.password_hash,
+                email_normalized=new_user.email_normalized,
+            )
         else:
             logger.debug(f"User(email='{email}') already registred.")
             raise UserAlreadyRegistred
         
+    async def is_email_available(self, email: str) -> bool:
+        email_normalized = normalize_email(email)
+        if self.registered_emails is None:
+            async with self.unit_of_work as uof:
+                return not await uof.users.get_existing_emails(emails=[email_normalized])
+        
+        return not await self.registered_emails.is_registered(email_normalized, self.unit_of_work)
+        
     async def check_refresh_token(self, user_id: int, refresh_token: str):
-        async with self.unit_of_work as uof:
-            db_refresh_token = await uof.users.get_refresh_token(
-                user_id=user_id
-            )
+        try:
+            async with self.unit_of_work as uof:
+                db_refresh_token = await uof.users.get_refresh_token(
+                    user_id=user_id
+                )
+        except RefreshTokenNotFoundDB:
+            raise RefreshTokenNotFound
             
         if not db_refresh_token == refresh_token:
             raise RefreshTokenNotFound
         
-    async def refresh_tokens(self, user_id: int) -> TokensDTO:
+    async def refresh_tokens(self, user_id: int, token_version: int = 0) -> TokensDTO:
+        # NOTE: `token_version` of the checked refresh token is current.
         logger.debug("Generating pair of JWT-tokens")
-        refresh_token = self.tokens_generator.generate_refresh_token(sub=user_id)
-        access_token = self.tokens_generator.generate_access_token(sub=user_id)
+        refresh_token = self.tokens_generator.generate_refresh_token(sub=user_id, token_version=token_version)
+        refresh_token_expires_at = self.tokens_generator.get_refresh_token_expiration()
+        access_token = self.tokens_generator.generate_access_token(sub=user_id, token_version=token_version)
         
         try:
             async with self.unit_of_work as uof:
                 await uof.users.update_refresh_token(
                     user_id=user_id,
-                    refresh_token=refresh_token
+                    refresh_token=refresh_token,
+                    expires_at=refresh_token_expires_at,
                 )
         except RefreshTokenNotFoundDB:
             raise RefreshTokenNotFound
@@ -155,3 +243,79 @@ class AuthService:
             refresh_token=refresh_token,
             access_token=access_token
         )
+        
+    async def rotate_refresh_token(
+        self,
+        user_id:        int,
+        refresh_token:  str,
+        token_version:  int = 0,
+        client_ip:      str | None = None,
+    ) -> TokensDTO:
+        async def rotate() -> TokensDTO:
+            await self.check_refresh_token(user_id=user_id, refresh_token=refresh_token)
+            tokens = await self.refresh_tokens(user_id=user_id, token_version=token_version)
+            self._audit(AuditEventTypes.REFRESH, user_id=user_id, client_ip=client_ip)
+            return tokens
+        
+        if self.refresh_coalescer is None:
+            return await rotate()
+        
+        return await self.refresh_coalescer.rotate(
+            user_id=user_id,
+            refresh_token=refresh_token,
+            rotate=rotate,
+        )
+        
+    async def revoke_token(self, jti: str, expires_at: datetime):
+        logger.debug(f"Revoke Token(jti='{jti}')")
+        async with self.unit_of_work as uof:
+            await uof.users.revoke_token(
+                jti=jti,
+                expires_at=expires_at,
+            )
+        
+        if self.tokens_denylist:
+            self.tokens_denylist.add(jti)
+        
+    async def logout_user(self, user_id: int, jti: str | None, expires_at: datetime):
+        # NOTE: Tokens issued before the jti claim can't be denylisted,
+        # they expire on their own.
+        logger.debug(f"Logout User(id={user_id})")
+        async with self.unit_of_work as uof:
+            if jti is not None:
+                await uof.users.revoke_token(
+                    jti=jti,
+                    expires_at=expires_at,
+                )
+            await uof.users.delete_refresh_token(
+                user_id=user_id
+            )
+        
+        if self.tokens_denylist and jti is not None:
+            self.tokens_denylist.add(jti)
+        if self.refresh_coalescer is not None:
+            self.refresh_coalescer.discard_user(user_id)
+        
+        logger.info(f"Logout User(id={user_id}).")
+        
+    async def revoke_sessions(self, user_id: int) -> int:
+        # NOTE: Incrementing the token version revokes every token of the user.
+        logger.debug(f"Revoke all sessions of User(id={user_id})")
+        try:
+            async with self.unit_of_work as uof:
+                token_version = await uof.users.increment_token_version(
+                    user_id=user_id
+                )
+                await uof.users.delete_refresh_token(
+                    user_id=user_id
+                )
+        except UserNotFoundDB:
+            raise UserNotFound
+        
+        if self.token_versions_cache is not None:
+            self.token_versions_cache.set(user_id, token_version)
+        if self.refresh_coalescer is not None:
+            self.refresh_coalescer.discard_user(user_id)
+        
+        logger.info(f"All sessions of User(id={user_id}) revoked, token version {token_version}.")
+        return token_version
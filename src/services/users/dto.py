@@ -8,3 +8,35 @@ class UserDTO:
     
     def asdict(self):
         return asdict(self)
+
+
+@dataclass
+class UsersPageDTO:
+    items:          list[UserDTO]
+    next_after_id:  int | None
+
+
+@dataclass
+class UsersBatchDTO:
+    # NOTE: JSON object keys are strings.
+    items:          dict[str, UserDTO]
+    not_found:      list[int]
+
+
+@dataclass
+class ImportUserDTO:
+    email:          str
+    password:       str | None = None
+    password_hash:  str | None = None
+
+
+@dataclass
+class ImportReportDTO:
+    processed:          int = 0
+    imported:           int = 0
+    duplicates:         int = 0
+    existing:           int = 0
+    invalid:            int = 0
+    
+    def asdict(self):
+        return asdict(self)
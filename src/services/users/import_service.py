@@ -0,0 +1,130 @@
+import asyncio
+from typing import AsyncIterable, Awaitable, Callable
+from concurrent.futures import Executor
+from dataclasses import dataclass, replace
+
+from loguru import logger
+
+from .dto import ImportReportDTO, ImportUserDTO
+
+from src.domain.entities.users import User, normalize_email
+from src.domain.uof.abstract import IUnitOfWork
+from src.infrastructure.tools.password_manager import PasswordManager
+
+
+@dataclass
+class UsersImportService:
+    unit_of_work: IUnitOfWork
+    password_manager: PasswordManager
+
+    # NOTE: Hashing is the most expensive part of an import, so plaintext
+    # passwords are hashed in the given executor (a process pool in production).
+    # Without one the default thread pool of the event loop is used.
+    hashing_executor: Executor | None = None
+    batch_size: int = 1000
+
+    async def import_users(
+        self,
+        records:        AsyncIterable[ImportUserDTO | None],
+        report:         ImportReportDTO | None = None,
+        on_checkpoint:  Callable[[ImportReportDTO], Awaitable[None]] | None = None,
+    ) -> ImportReportDTO:
+        # NOTE: `None` records are unparsable rows and are counted as invalid.
+        # If `report` of the previous run is given, the first `report.processed`
+        # records are skipped and its counters are continued, so `on_checkpoint`
+        # (called after every committed batch) is enough to resume an import.
+        report = replace(report) if report else ImportReportDTO()
+        skip = report.processed
+
+        seen_emails: set[str] = set()
+        batch: list[ImportUserDTO] = []
+        position = 0
+
+        async for record in records:
+            position += 1
+            if position <= skip:
+                continue
+
+            if not self._is_valid_record(record):
+                report.invalid += 1
+            elif normalize_email(record.email) in seen_emails:
+                report.duplicates += 1
+            else:
+                seen_emails.add(normalize_email(record.email))
+                batch.append(record)
+
+            if len(batch) >= self.batch_size:
+                await self._import_batch(batch, report)
+                batch = []
+                await self._checkpoint(report, position, on_checkpoint)
+
+        if batch:
+            await self._import_batch(batch, report)
+        if position > report.processed:
+            await self._checkpoint(report, position, on_checkpoint)
+
+        logger.info(f"Users import finished: {report}")
+        return report
+
+    def _is_valid_record(self, record: ImportUserDTO | None) -> bool:
+        if record is None or not record.email:
+            return False
+
+        if record.password_hash is not None:
+            return self.password_manager.is_password_hash(record.password_hash)
+
+        return bool(record.password)
+
+    async def _checkpoint(
+        self,
+        report:         ImportReportDTO,
+        position:       int,
+        on_checkpoint:  Callable[[ImportReportDTO], Awaitable[None]] | None,
+    ):
+        report.processed = position
+        if on_checkpoint:
+            await on_checkpoint(replace(report))
+
+    async def _import_batch(self, batch: list[ImportUserDTO], report: ImportReportDTO):
+        async with self.unit_of_work as uof:
+            existing_emails = await uof.users.get_existing_emails(
+                emails=[normalize_email(record.email) for record in batch]
+            )
+
+        new_records = [record for record in batch if normalize_email(record.email) not in existing_emails]
+        report.existing += len(batch) - len(new_records)
+        if not new_records:
+            return
+
+        # NOTE: Hashing is done outside of the transaction so the connection
+        # is not held while the CPU-bound work is running.
+        password_hashes = await self._hash_passwords(new_records)
+
+        async with self.unit_of_work as uof:
+            report.imported += await uof.users.add_users(
+                users=[
+                    User(
+                        id=0,
+                        email=record.email,
+                        email_normalized=normalize_email(record.email),
+                        password_hash=password_hash,
+                    )
+                    for record, password_hash in zip(new_records, password_hashes)
+                ]
+            )
+        logger.debug(f"Imported batch of {len(new_records)} users")
+
+    async def _hash_passwords(self, records: list[ImportUserDTO]) -> list[str]:
+        loop = asyncio.get_running_loop()
+
+        async def hash_password(record: ImportUserDTO) -> str:
+            if record.password_hash is not None:
+                return record.password_hash
+
+            return await loop.run_in_executor(
+                self.hashing_executor,
+                self.password_manager.hash_password,
+                record.password,
+            )
+
+        return await asyncio.gather(*(hash_password(record) for record in records))
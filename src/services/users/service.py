@@ -1,7 +1,8 @@
+from typing import AsyncIterator
 from loguru import logger
 from dataclasses import dataclass
 
-from .dto import UserDTO
+from .dto import UserDTO, UsersBatchDTO, UsersPageDTO
 from ..exc import UserNotFound
 
 from src.domain.uof.abstract import IUnitOfWork
@@ -34,3 +35,52 @@ class UsersService:
             id=user.id,
             email=user.email
         )
+    
+    async def get_users(
+        self,
+        ids: list[int],
+    ) -> UsersBatchDTO:
+        # NOTE: One query for the whole batch instead of `get_user` per id.
+        ids = list(dict.fromkeys(ids))
+        logger.debug(f"Getting {len(ids)} users by ids")
+        async with self.unit_of_work as uof:
+            users = await uof.users.get_many(ids=ids)
+        
+        found = {user.id: UserDTO(id=user.id, email=user.email) for user in users}
+        
+        return UsersBatchDTO(
+            items={str(id): found[id] for id in ids if id in found},
+            not_found=[id for id in ids if id not in found],
+        )
+    
+    async def list_users(
+        self,
+        after_id:   int | None,
+        limit:      int,
+    ) -> UsersPageDTO:
+        logger.debug(f"Getting users page {after_id=}, {limit=}")
+        async with self.unit_of_work as uof:
+            # NOTE: One extra row is requested to know if there is a next page.
+            users = await uof.users.list_users(
+                after_id=after_id,
+                limit=limit + 1,
+            )
+        
+        has_next_page = len(users) > limit
+        users = users[:limit]
+        
+        return UsersPageDTO(
+            items=[UserDTO(id=user.id, email=user.email) for user in users],
+            next_after_id=users[-1].id if has_next_page else None,
+        )
+    
+    async def export_users(
+        self,
+        batch_size: int,
+    ) -> AsyncIterator[UserDTO]:
+        async with self.unit_of_work as uof:
+            async for user in uof.users.stream_users(batch_size=batch_size):
+                yield UserDTO(
+                    id=user.id,
+                    email=user.email
+                )
@@ -0,0 +1,42 @@
+from src.domain.uof.abstract import IUnitOfWork
+
+
+class MockUnitOfWork(IUnitOfWork):
+    def __init__(
+        self,
+        users_repo,
+        audit_repo=None,
+        idempotency_repo=None,
+    ):
+        self._users = users_repo
+        self._audit = audit_repo
+        self._idempotency = idempotency_repo
+
+    @property
+    def users(self,):
+        return self._users
+    
+    @property
+    def audit(self,):
+        return self._audit
+    
+    @property
+    def idempotency(self,):
+        return self._idempotency
+    
+    async def commit(self,):
+        ...
+    
+    async def rollback(self,):
+        ...
+    
+    async def __aenter__(self,) -> "IUnitOfWork":
+        return self
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+    
+    def __call__(self) -> float:
+        return self.now
@@ -0,0 +1,81 @@
+from typing import Callable
+
+import pytest
+import pytest_asyncio
+from httpx import ASGITransport
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from src.infrastructure.api.app import app, api
+from src.infrastructure.api.dependencies import get_session_maker, refresh_coalescer, token_versions_cache
+from src.infrastructure.database.models import Base
+from src.infrastructure.database.uof import SQLAlchemyUnitOfWork
+from src.infrastructure.database.repositories.users import SqlAlchemyUsersRepo
+from src.infrastructure.database.query_counter import install_query_counter
+
+
+SQLALCHEMY_DATABASE_URL = "sqlite+aiosqlite:///:memory:"
+
+engine = create_async_engine(
+    SQLALCHEMY_DATABASE_URL,
+)
+# NOTE: Queries are counted only inside `track_queries`, other tests don't see it.
+install_query_counter(engine)
+
+sessionmaker_test = async_sessionmaker(
+    autocommit=False,
+    autoflush=False,
+    bind=engine
+)
+
+
+@pytest.fixture
+def session_maker() -> async_sessionmaker:
+    return sessionmaker_test
+
+
+@pytest_asyncio.fixture
+async def init_db():
+    async with engine.begin() as conn:
+        # создаём схему
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    yield
+    # чистим
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+
+
+@pytest.fixture
+def unit_of_work_factory(session_maker) -> Callable[[], SQLAlchemyUnitOfWork]:
+    def create_unit_of_work() -> SQLAlchemyUnitOfWork:
+        return SQLAlchemyUnitOfWork(
+            async_session_maker=session_maker,
+            users_repo_class=SqlAlchemyUsersRepo,
+        )
+
+    return create_unit_of_work
+
+
+@pytest.fixture
+def override_session_maker():
+    # NOTE: Both apps, the mounted API has its own overrides.
+    def override(session_maker: async_sessionmaker):
+        app.dependency_overrides[get_session_maker] = lambda: session_maker
+        api.dependency_overrides[get_session_maker] = lambda: session_maker
+        # NOTE: Users ids are reused by the recreated database.
+        token_versions_cache.clear()
+        refresh_coalescer.clear()
+
+    yield override
+    app.dependency_overrides.pop(get_session_maker, None)
+    api.dependency_overrides.pop(get_session_maker, None)
+
+
+@pytest.fixture
+def override_deps(session_maker, override_session_maker):
+    override_session_maker(session_maker)
+
+
+@pytest.fixture
+def get_transport(init_db, override_deps) -> ASGITransport:
+    return ASGITransport(app=app)
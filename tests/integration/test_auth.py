@@ -1,59 +1,14 @@
+import time
 import asyncio
 import pytest
-import pytest_asyncio
 from loguru import logger
 from fastapi.datastructures import FormData
-from httpx import ASGITransport, AsyncClient
-from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from httpx import AsyncClient
 
-from src.infrastructure.api.app import app, api
-from src.infrastructure.database.models import Base
-from src.infrastructure.api.dependencies import get_session_maker
+from settings import settings
+from src.infrastructure.api.dependencies import get_tokens_generator, refresh_coalescer
 
 
-SQLALCHEMY_DATABASE_URL = "sqlite+aiosqlite:///:memory:"
-
-engine = create_async_engine(
-    SQLALCHEMY_DATABASE_URL,
-)
-
-sessionmaker_test = async_sessionmaker(
-    autocommit=False,
-    autoflush=False,
-    bind=engine
-)
-
-
-@pytest_asyncio.fixture
-async def init_db():
-    async with engine.begin() as conn:
-        # создаём схему
-        await conn.run_sync(Base.metadata.drop_all)
-        await conn.run_sync(Base.metadata.create_all)
-    yield
-    # чистим
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.drop_all)
-
-
-def get_test_session_maker():
-    return sessionmaker_test
-
-
-@pytest.fixture
-def override_deps():
-    app.dependency_overrides[get_session_maker] = get_test_session_maker
-    api.dependency_overrides[get_session_maker] = get_test_session_maker
-    app.mount('/api', api, 'API')
-
-    
-@pytest.fixture
-def get_transport(init_db, override_deps):
-    print(f"Overrides deps: {app.dependency_overrides.get(get_session_maker)}")
-    transport = ASGITransport(app=app)
-    return transport
-        
-
 # Основной тест
 @pytest.mark.asyncio
 async def test_full_auth_flow(get_transport):
@@ -107,7 +62,15 @@ async def test_full_auth_flow(get_transport):
         assert new_access_token != access_token
         assert new_refresh_token != refresh_token
         
+        logger.debug("5. Repeat with the old refresh token within the grace window (same pair)")
+        repeated_response = await client.post("/api/v1/auth/refresh", headers=refresh_headers)
+        
+        assert repeated_response.status_code == 200
+        assert repeated_response.json() == new_tokens
+        
         logger.debug("5. Attempt to use an old refresh token (expecting an error)")
+        # NOTE: Simulates the end of the grace window.
+        refresh_coalescer.clear()
         expired_response = await client.post("/api/v1/auth/refresh", headers=refresh_headers)
         
         assert expired_response.status_code == 401
@@ -122,3 +85,145 @@ async def test_full_auth_flow(get_transport):
         new_me_data = new_me_response.json()
         assert new_me_data["id"] == user_id
         assert new_me_data["email"] == email
+
+
+@pytest.mark.asyncio
+async def test_logout(get_transport):
+    async with AsyncClient(transport=get_transport, base_url="http://test") as client:
+        email = "test_user@example.co"
+        password = "securepassword123"
+
+        await client.post("/api/v1/auth/register", json={"email": email, "password": password})
+        login_response = await client.post("/api/v1/auth/login", json={"username": email, "password": password})
+        tokens = login_response.json()
+        headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+        
+        logger.debug("1. Logout")
+        logout_response = await client.post("/api/v1/auth/logout", headers=headers)
+        
+        assert logout_response.status_code == 204
+        
+        logger.debug("2. Attempt to use a revoked access token (expecting an error)")
+        me_response = await client.get("/api/v1/users/me", headers=headers)
+        
+        assert me_response.status_code == 401
+        assert me_response.json()["detail"] == "Token revoked"
+        
+        logger.debug("3. Attempt to use a refresh token after logout (expecting an error)")
+        refresh_headers = {"Authorization": f"Bearer {tokens['refresh_token']}"}
+        refresh_response = await client.post("/api/v1/auth/refresh", headers=refresh_headers)
+        
+        assert refresh_response.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_logout_token_without_jti(get_transport):
+    async with AsyncClient(transport=get_transport, base_url="http://test") as client:
+        email = "legacy_user@example.co"
+        password = "securepassword123"
+
+        register_response = await client.post("/api/v1/auth/register", json={"email": email, "password": password})
+        login_response = await client.post("/api/v1/auth/login", json={"username": email, "password": password})
+        tokens = login_response.json()
+        
+        logger.debug("1. Logout with a token issued before the jti claim")
+        tokens_generator = get_tokens_generator()
+        access_token = tokens_generator._generate_jwt(payload={
+            "sub": str(register_response.json()["id"]),
+            "token_type": "access",
+            "ver": 0,
+            "exp": int(time.time()) + 60,
+        })
+        logout_response = await client.post("/api/v1/auth/logout", headers={"Authorization": f"Bearer {access_token}"})
+        
+        assert logout_response.status_code == 204
+        
+        logger.debug("2. The refresh token is deleted anyway")
+        refresh_headers = {"Authorization": f"Bearer {tokens['refresh_token']}"}
+        refresh_response = await client.post("/api/v1/auth/refresh", headers=refresh_headers)
+        
+        assert refresh_response.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_users_batch(get_transport, monkeypatch):
+    async with AsyncClient(transport=get_transport, base_url="http://test") as client:
+        email = "batch_user@example.co"
+        password = "securepassword123"
+
+        user_id = (await client.post("/api/v1/auth/register", json={"email": email, "password": password})).json()["id"]
+        login_response = await client.post("/api/v1/auth/login", json={"username": email, "password": password})
+        headers = {"Authorization": f"Bearer {login_response.json()['access_token']}"}
+        
+        logger.debug("Attempt to get users by a non-admin user (expecting an error)")
+        batch_response = await client.post("/api/v1/users/batch", json={"ids": [user_id, 9999]}, headers=headers)
+        
+        assert batch_response.status_code == 403
+        
+        monkeypatch.setattr(settings, "ADMIN_USER_IDS", [user_id])
+        batch_response = await client.post("/api/v1/users/batch", json={"ids": [user_id, 9999]}, headers=headers)
+        
+        assert batch_response.status_code == 200
+        assert batch_response.json() == {
+            "items": {str(user_id): {"id": user_id, "email": email}},
+            "not_found": [9999],
+        }
+        
+        logger.debug("Attempt to get more users than allowed per call (expecting an error)")
+        batch_response = await client.post("/api/v1/users/batch", json={"ids": list(range(1000))}, headers=headers)
+        
+        assert batch_response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_email_availability(get_transport):
+    async with AsyncClient(transport=get_transport, base_url="http://test") as client:
+        email = "availability_user@example.co"
+        password = "securepassword123"
+
+        await client.post("/api/v1/auth/register", json={"email": email, "password": password})
+        
+        taken_response = await client.get("/api/v1/auth/availability", params={"email": email.upper()})
+        free_response = await client.get("/api/v1/auth/availability", params={"email": "free@example.co"})
+        
+        assert taken_response.status_code == 200
+        assert taken_response.json() == {"email": email.upper(), "available": False}
+        assert free_response.json() == {"email": "free@example.co", "available": True}
+
+
+@pytest.mark.asyncio
+async def test_logout_all(get_transport):
+    async with AsyncClient(transport=get_transport, base_url="http://test") as client:
+        email = "test_user@example.co"
+        password = "securepassword123"
+
+        await client.post("/api/v1/auth/register", json={"email": email, "password": password})
+        first_tokens = (await client.post("/api/v1/auth/login", json={"username": email, "password": password})).json()
+        second_tokens = (await client.post("/api/v1/auth/login", json={"username": email, "password": password})).json()
+        
+        logger.debug("1. Logout from all sessions")
+        logout_response = await client.post(
+            "/api/v1/auth/logout-all",
+            headers={"Authorization": f"Bearer {second_tokens['access_token']}"},
+        )
+        
+        assert logout_response.status_code == 204
+        
+        logger.debug("2. Attempt to use tokens of every session (expecting an error)")
+        for tokens in (first_tokens, second_tokens):
+            me_response = await client.get(
+                "/api/v1/users/me",
+                headers={"Authorization": f"Bearer {tokens['access_token']}"},
+            )
+            
+            assert me_response.status_code == 401
+            assert me_response.json()["detail"] == "Token revoked"
+        
+        logger.debug("3. New login gets tokens of the new version")
+        tokens = (await client.post("/api/v1/auth/login", json={"username": email, "password": password})).json()
+        me_response = await client.get(
+            "/api/v1/users/me",
+            headers={"Authorization": f"Bearer {tokens['access_token']}"},
+        )
+        
+        assert me_response.status_code == 200
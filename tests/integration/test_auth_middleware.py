@@ -0,0 +1,76 @@
+import pytest
+from loguru import logger
+from httpx import ASGITransport, AsyncClient
+
+from src.infrastructure.api.app import app, api
+from src.infrastructure.api.auth_middleware import AccessTokenMiddleware
+from src.infrastructure.api.dependencies import (
+    get_access_token_claims,
+    get_tokens_validator,
+    token_versions_cache,
+    tokens_denylist,
+    verify_access_token,
+)
+
+
+@pytest.fixture
+def override_access_token(override_deps):
+    api.dependency_overrides[verify_access_token] = get_access_token_claims
+    yield
+    del api.dependency_overrides[verify_access_token]
+
+
+@pytest.fixture
+def get_transport(init_db, override_access_token, unit_of_work_factory):
+    return ASGITransport(
+        app=AccessTokenMiddleware(
+            app,
+            tokens_validator=get_tokens_validator(),
+            tokens_denylist=tokens_denylist,
+            unit_of_work_factory=unit_of_work_factory,
+            token_versions_cache=token_versions_cache,
+            exclude_paths=["/api/v1/auth/refresh"],
+        )
+    )
+
+
+@pytest.mark.asyncio
+async def test_auth_middleware(get_transport):
+    async with AsyncClient(transport=get_transport, base_url="http://test") as client:
+        email = "test_user@example.co"
+        password = "securepassword123"
+
+        await client.post("/api/v1/auth/register", json={"email": email, "password": password})
+        login_response = await client.post("/api/v1/auth/login", json={"username": email, "password": password})
+        tokens = login_response.json()
+        headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+        refresh_headers = {"Authorization": f"Bearer {tokens['refresh_token']}"}
+
+        logger.debug("1. Claims are passed to the route by the middleware")
+        me_response = await client.get("/api/v1/users/me", headers=headers)
+
+        assert me_response.status_code == 200
+        assert me_response.json()["email"] == email
+
+        logger.debug("2. Requests without a token are rejected by the route")
+        me_response = await client.get("/api/v1/users/me")
+
+        assert me_response.status_code == 403
+
+        logger.debug("3. Invalid tokens are rejected by the middleware")
+        me_response = await client.get("/api/v1/users/me", headers=refresh_headers)
+
+        assert me_response.status_code == 401
+        assert me_response.json()["detail"] == "Invalid token"
+
+        logger.debug("4. Excluded paths are not checked")
+        refresh_response = await client.post("/api/v1/auth/refresh", headers=refresh_headers)
+
+        assert refresh_response.status_code == 200
+
+        logger.debug("5. Revoked tokens are rejected by the middleware")
+        await client.post("/api/v1/auth/logout", headers=headers)
+        me_response = await client.get("/api/v1/users/me", headers=headers)
+
+        assert me_response.status_code == 401
+        assert me_response.json()["detail"] == "Token revoked"
@@ -0,0 +1,75 @@
+import pytest
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy.exc import IntegrityError, OperationalError
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from src.domain.repositories.exc import DatabaseUnavailable
+from src.infrastructure.api.app import app
+from src.infrastructure.api.dependencies import (
+    db_circuit_breaker,
+    get_tokens_generator,
+)
+from src.infrastructure.database.uof import SQLAlchemyUnitOfWork
+from src.infrastructure.database.repositories.users import SqlAlchemyUsersRepo
+from src.infrastructure.tools.circuit_breaker import CircuitBreaker, CircuitStates
+
+
+# NOTE: Connecting fails, the directory doesn't exist.
+unreachable_engine = create_async_engine("sqlite+aiosqlite:////nonexistent/directory/auth.db")
+unreachable_session_maker = async_sessionmaker(bind=unreachable_engine)
+
+
+@pytest.fixture
+def unreachable_database(override_session_maker):
+    override_session_maker(unreachable_session_maker)
+    yield
+    db_circuit_breaker.record_success()
+
+
+def create_unit_of_work(circuit_breaker: CircuitBreaker) -> SQLAlchemyUnitOfWork:
+    return SQLAlchemyUnitOfWork(
+        async_session_maker=unreachable_session_maker,
+        users_repo_class=SqlAlchemyUsersRepo,
+        circuit_breaker=circuit_breaker,
+    )
+
+
+@pytest.mark.asyncio
+async def test_unit_of_work_fails_fast_when_open():
+    circuit_breaker = CircuitBreaker(name="test", failure_threshold=2)
+    for _ in range(2):
+        with pytest.raises(OperationalError):
+            async with create_unit_of_work(circuit_breaker) as uof:
+                await uof.users.get_by_id(id=1)
+    
+    assert circuit_breaker.state == CircuitStates.OPEN
+    with pytest.raises(DatabaseUnavailable):
+        async with create_unit_of_work(circuit_breaker):
+            pass
+
+
+@pytest.mark.asyncio
+async def test_request_errors_are_not_failures():
+    circuit_breaker = CircuitBreaker(name="test", failure_threshold=1)
+    with pytest.raises(IntegrityError):
+        async with create_unit_of_work(circuit_breaker):
+            raise IntegrityError("INSERT", {}, Exception("duplicate"))
+    
+    assert circuit_breaker.state == CircuitStates.CLOSED
+
+
+@pytest.mark.asyncio
+async def test_open_circuit_answers_503(unreachable_database):
+    access_token = get_tokens_generator().generate_access_token(sub=1, token_version=0)
+    headers = {"Authorization": f"Bearer {access_token}"}
+    
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        for _ in range(db_circuit_breaker.failure_threshold):
+            response = await client.get("/api/v1/users/me", headers=headers)
+            assert response.status_code == 500
+        
+        # NOTE: The token is accepted without the version check,
+        # reading the user is what fails fast.
+        response = await client.get("/api/v1/users/me", headers=headers)
+        assert response.status_code == 503
+        assert int(response.headers["Retry-After"]) >= 1
@@ -0,0 +1,35 @@
+import time
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+
+from settings import settings
+from src.infrastructure.api.app import app
+from src.infrastructure.database.models import Base
+
+
+@pytest.fixture
+def sqlite_dsn(tmp_path, monkeypatch):
+    db_path = tmp_path / "test.db"
+    Base.metadata.create_all(create_engine(f"sqlite:///{db_path}"))
+    
+    dsn = f"sqlite+aiosqlite:///{db_path}"
+    monkeypatch.setattr(settings, "POSTGRES_DSN", dsn)
+    return dsn
+
+
+def test_ready_after_warm_up(sqlite_dsn):
+    with TestClient(app) as client:
+        for _ in range(100):
+            ready_response = client.get("/health/ready")
+            if ready_response.status_code == 200:
+                break
+            
+            assert ready_response.status_code == 503
+            time.sleep(0.05)
+        
+        assert ready_response.status_code == 200
+        
+        live_response = client.get("/health/live")
+        assert live_response.status_code == 200
+        assert live_response.json()["status"] == "ok"
@@ -0,0 +1,74 @@
+import uuid
+
+import pytest
+from httpx import AsyncClient
+
+from src.infrastructure.tools.idempotency_cache import IdempotencyCache
+
+
+@pytest.mark.asyncio
+async def test_register_and_login_retries(get_transport):
+    async with AsyncClient(transport=get_transport, base_url="http://test") as client:
+        email = "idempotent_user@example.co"
+        password = "securepassword123"
+        headers = {"Idempotency-Key": str(uuid.uuid4())}
+        
+        register_response = await client.post("/api/v1/auth/register", json={"email": email, "password": password}, headers=headers)
+        retry_response = await client.post("/api/v1/auth/register", json={"email": email, "password": password}, headers=headers)
+        
+        assert register_response.status_code == retry_response.status_code == 200
+        assert retry_response.json() == register_response.json()
+        assert retry_response.headers["idempotent-replayed"] == "true"
+        
+        headers = {"Idempotency-Key": str(uuid.uuid4())}
+        login_response = await client.post("/api/v1/auth/login", json={"username": email, "password": password}, headers=headers)
+        retry_response = await client.post("/api/v1/auth/login", json={"username": email, "password": password}, headers=headers)
+        
+        assert login_response.status_code == 200
+        assert retry_response.json() == login_response.json()
+        
+        reused_response = await client.post("/api/v1/auth/login", json={"username": email, "password": "other"}, headers=headers)
+        
+        assert reused_response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_keys_scoped_to_caller(get_transport):
+    async with AsyncClient(transport=get_transport, base_url="http://test") as client:
+        password = "securepassword123"
+        headers = {"Idempotency-Key": "shared-key"}
+        
+        first_response = await client.post("/api/v1/auth/register", json={"email": "first_caller@example.co", "password": password}, headers=headers)
+        second_response = await client.post("/api/v1/auth/register", json={"email": "second_caller@example.co", "password": password}, headers=headers)
+        
+        assert first_response.status_code == second_response.status_code == 200
+        assert "idempotent-replayed" not in second_response.headers
+        assert second_response.json()["email"] == "second_caller@example.co"
+        
+        retry_response = await client.post("/api/v1/auth/register", json={"email": " First_Caller@example.co", "password": password}, headers=headers)
+        
+        assert retry_response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_responses_shared_through_database(init_db, unit_of_work_factory):
+    # NOTE: Two caches stand for two workers.
+    first_worker = IdempotencyCache(unit_of_work_factory=unit_of_work_factory)
+    second_worker = IdempotencyCache(unit_of_work_factory=unit_of_work_factory)
+    response = first_worker.create_response(
+        key="/api/v1/auth/register:caller:key",
+        fingerprint="fingerprint",
+        status_code=200,
+        content_type="application/json",
+        body=b'{"id":1}',
+    )
+    
+    assert await first_worker.acquire(response.key, response.fingerprint) is None
+    await first_worker.release(response.key, response)
+    
+    stored_response = await second_worker.acquire(response.key, response.fingerprint)
+    
+    assert stored_response.body == response.body
+    assert stored_response.status_code == 200
+    async with unit_of_work_factory() as uof:
+        assert not await uof.idempotency.add_response(response=response, now=response.expires_at.replace(year=2000))
@@ -0,0 +1,144 @@
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import text
+
+from src.infrastructure.api.metrics import QueryCounterMiddleware, QueryMetrics
+from src.infrastructure.database.query_counter import assert_max_queries
+from src.infrastructure.tools.audit_log import AuditLog
+from src.infrastructure.tools.password_manager import PasswordManager
+from src.infrastructure.tools.registered_emails import RegisteredEmailsFilter
+from src.infrastructure.tools.tokens_tools import JWTTokensGenerator
+from src.services.auth.service import AuthService
+from src.services.users.service import UsersService
+
+
+class MockData:
+    EMAIL:      str = "test_user@example.co"
+    PASSWORD:   str = "securepassword123"
+
+
+@pytest.fixture
+def auth_service(init_db, unit_of_work_factory):
+    return AuthService(
+        unit_of_work=unit_of_work_factory(),
+        password_manager=PasswordManager(rounds=4),
+        tokens_generator=JWTTokensGenerator(
+            secret_key="secret",
+            access_token_exp_minutes=1,
+            refresh_token_exp_minutes=5,
+        ),
+    )
+
+
+@pytest.fixture
+def users_service(init_db, unit_of_work_factory):
+    return UsersService(
+        unit_of_work=unit_of_work_factory(),
+    )
+
+
+@pytest.mark.asyncio
+async def test_auth_flow_query_budgets(auth_service: AuthService):
+    # NOTE: SELECT, ROLLBACK (not found), INSERT, SELECT (refresh), COMMIT
+    with assert_max_queries(5):
+        user = await auth_service.register_user(email=MockData.EMAIL, password=MockData.PASSWORD)
+    
+    # NOTE: SELECT, UPDATE (no refresh token yet), INSERT, COMMIT
+    with assert_max_queries(4):
+        await auth_service.login_user(email=MockData.EMAIL, password=MockData.PASSWORD)
+    
+    with assert_max_queries(3):
+        tokens = await auth_service.login_user(email=MockData.EMAIL, password=MockData.PASSWORD)
+    
+    with assert_max_queries(2):
+        await auth_service.check_refresh_token(user_id=user.id, refresh_token=tokens.refresh_token)
+    
+    with assert_max_queries(2):
+        await auth_service.refresh_tokens(user_id=user.id)
+    
+    with assert_max_queries(3):
+        await auth_service.revoke_sessions(user_id=user.id)
+
+
+@pytest.mark.asyncio
+async def test_users_query_budgets(
+    auth_service: AuthService,
+    users_service: UsersService,
+):
+    for number in range(5):
+        await auth_service.register_user(email=f"{number}-{MockData.EMAIL}", password=MockData.PASSWORD)
+    
+    with assert_max_queries(2):
+        await users_service.get_user(id=1)
+    
+    with assert_max_queries(2):
+        await users_service.list_users(after_id=None, limit=10)
+    
+    with assert_max_queries(2):
+        users_batch = await users_service.get_users(ids=[1, 2, 3, 42])
+    assert list(users_batch.items) == ["1", "2", "3"] and users_batch.not_found == [42]
+    
+    with assert_max_queries(2):
+        assert len([user async for user in users_service.export_users(batch_size=2)]) == 5
+
+
+@pytest.mark.asyncio
+async def test_availability_query_budget(auth_service: AuthService, unit_of_work_factory):
+    auth_service.registered_emails = RegisteredEmailsFilter(capacity=100)
+    await auth_service.register_user(email=MockData.EMAIL, password=MockData.PASSWORD)
+    await auth_service.registered_emails.load(unit_of_work_factory())
+    
+    # NOTE: Free emails are answered by the filter, taken ones by the index.
+    with assert_max_queries(0):
+        assert await auth_service.is_email_available(email="free@example.co")
+    
+    with assert_max_queries(2):
+        assert not await auth_service.is_email_available(email=MockData.EMAIL.upper())
+    
+    await auth_service.register_user(email=f"new-{MockData.EMAIL}", password=MockData.PASSWORD)
+    assert not await auth_service.is_email_available(email=f"new-{MockData.EMAIL}")
+
+
+@pytest.mark.asyncio
+async def test_audit_batch_query_budget(auth_service: AuthService, unit_of_work_factory):
+    auth_service.audit_log = AuditLog()
+    for number in range(3):
+        await auth_service.register_user(email=f"{number}-{MockData.EMAIL}", password=MockData.PASSWORD)
+    
+    # NOTE: One multi-row INSERT and COMMIT for the whole batch.
+    with assert_max_queries(2):
+        await auth_service.audit_log.flush(unit_of_work_factory)
+    
+    assert auth_service.audit_log.written == 3
+
+
+@pytest.mark.asyncio
+async def test_assert_max_queries_exceeded(users_service: UsersService):
+    with pytest.raises(AssertionError, match="2 queries executed, 1 expected at most"):
+        with assert_max_queries(1):
+            await users_service.list_users(after_id=None, limit=10)
+
+
+@pytest.mark.asyncio
+async def test_query_counter_middleware(init_db, session_maker):
+    metrics = QueryMetrics()
+    app = FastAPI()
+    
+    @app.get("/items/{item_id}")
+    async def get_item(item_id: int) -> dict:
+        async with session_maker() as session:
+            await session.execute(text("SELECT 1"))
+            await session.execute(text("SELECT 2"))
+        return {}
+    
+    transport = ASGITransport(app=QueryCounterMiddleware(app, metrics=metrics, debug_headers=True))
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.get("/items/1")
+        await client.get("/items/2")
+    
+    assert response.headers["x-db-queries"] == "3"
+    assert float(response.headers["x-db-time-ms"]) > 0
+    assert metrics.routes["/items/{item_id}"].requests == 2
+    assert metrics.routes["/items/{item_id}"].max_queries == 3
+    assert 'db_queries_total{route="/items/{item_id}"} 6' in metrics.render()
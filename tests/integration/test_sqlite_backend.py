@@ -0,0 +1,76 @@
+import asyncio
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from src.infrastructure import database
+from src.infrastructure.database.models import Base
+from src.infrastructure.database.uof import SQLAlchemyUnitOfWork
+from src.infrastructure.database.repositories.users import SqlAlchemyUsersRepo
+from src.infrastructure.tools.password_manager import PasswordManager
+from src.infrastructure.tools.tokens_tools import JWTTokensGenerator
+from src.services.auth.service import AuthService
+
+
+@pytest_asyncio.fixture
+async def sqlite_engine(tmp_path):
+    dsn = f"sqlite+aiosqlite:///{tmp_path / 'auth.db'}"
+    engine = create_async_engine(dsn)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    await engine.dispose()
+    
+    yield database.init_engine(dsn)
+    await database.dispose_engine()
+
+
+def create_unit_of_work():
+    return SQLAlchemyUnitOfWork(
+        async_session_maker=database.async_session_maker,
+        users_repo_class=SqlAlchemyUsersRepo,
+    )
+
+
+def create_auth_service() -> AuthService:
+    return AuthService(
+        unit_of_work=create_unit_of_work(),
+        password_manager=PasswordManager(rounds=4),
+        tokens_generator=JWTTokensGenerator(
+            secret_key="secret",
+            access_token_exp_minutes=1,
+            refresh_token_exp_minutes=5,
+        ),
+    )
+
+
+@pytest.mark.asyncio
+async def test_pragmas(sqlite_engine):
+    async with database.engine.connect() as connection:
+        assert (await connection.execute(text("PRAGMA journal_mode"))).scalar() == "wal"
+        assert (await connection.execute(text("PRAGMA synchronous"))).scalar() == 1
+        assert (await connection.execute(text("PRAGMA query_only"))).scalar() == 1
+    
+    async with database.writer_engine.connect() as connection:
+        assert (await connection.execute(text("PRAGMA query_only"))).scalar() == 0
+
+
+@pytest.mark.asyncio
+async def test_concurrent_writes_and_reads(sqlite_engine):
+    emails = [f"user-{number}@example.co" for number in range(20)]
+    await asyncio.gather(*(
+        create_auth_service().register_user(email=email, password="password")
+        for email in emails
+    ))
+    
+    # NOTE: Logins read the user and write the refresh token, they
+    # interleave on the readers pool and queue for the writer.
+    tokens = await asyncio.gather(*(
+        create_auth_service().login_user(email=email, password="password")
+        for email in emails * 2
+    ))
+    
+    assert len(tokens) == 40
+    async with create_unit_of_work() as uof:
+        assert len(await uof.users.list_users(after_id=None, limit=100)) == 20
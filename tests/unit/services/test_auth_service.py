@@ -1,15 +1,22 @@
+import asyncio
+from datetime import datetime, timezone
 import pytest
 from unittest.mock import AsyncMock, Mock, create_autospec
 
 from src.domain.entities.users import User
 from src.services.auth.dto import TokensDTO
-from src.domain.uof.abstract import IUnitOfWork
 from src.services.auth.service import AuthService
 from src.domain.repositories.users.interface import IUsersRepo
+from src.domain.repositories.audit.interface import IAuditRepo
 from src.infrastructure.tools.tokens_tools import JWTTokensGenerator
 from src.infrastructure.tools.password_manager import PasswordManager
+from src.infrastructure.tools.token_versions_cache import TokenVersionsCache
+from src.infrastructure.tools.refresh_coalescer import RefreshCoalescer
+from src.infrastructure.tools.audit_log import AuditLog
+from src.domain.entities.audit import AuditEventTypes
 from src.domain.repositories.exc import UserNotFound as UserNotFoundDB
-from src.services.exc import UserAlreadyRegistred, UserNotFound, InvalidPassword
+from src.services.exc import UserAlreadyRegistred, UserNotFound, InvalidPassword, RefreshTokenNotFound
+from tests.helpers import MockUnitOfWork
 
 
 class MockData:
@@ -21,27 +28,6 @@ class MockData:
     HASHED_PASSWORD: str = "hashed_password"
     
 
-class MockUnitOfWork(IUnitOfWork):
-    def __init__(
-        self,
-        users_repo,
-    ):
-        self._users = users_repo
-
-    @property
-    def users(self,):
-        return self._users
-    
-    async def commit(self,):
-        ...
-    
-    async def rollback(self,):
-        ...
-    
-    async def __aenter__(self,) -> "IUnitOfWork":
-        return self
-    
-
 @pytest.fixture
 def users_repo_mock():
     return create_autospec(IUsersRepo, instance=True)
@@ -59,6 +45,7 @@ def tokens_generator_mock():
 def password_manager_mock():
     pmm = create_autospec(PasswordManager, instance=True)
     pmm.hash_password = Mock(return_value=MockData.HASHED_PASSWORD)
+    pmm.needs_rehash = Mock(return_value=False)
     return pmm
 
 
@@ -95,6 +82,51 @@ async def test_login_user_success(
         refresh_token=MockData.REFRESH_TOKEN
     )
 
+
+@pytest.mark.asyncio
+async def test_login_user_token_version(
+    auth_service: AuthService,
+    users_repo_mock,
+    tokens_generator_mock,
+):
+    users_repo_mock.get_by_email = AsyncMock(
+        return_value=User(
+            id=1,
+            email=MockData.EMAIL,
+            password_hash=MockData.HASHED_PASSWORD,
+            token_version=3,
+        )
+    )
+    
+    await auth_service.login_user(
+        email=MockData.EMAIL,
+        password=MockData.PASSWORD
+    )
+    
+    tokens_generator_mock.generate_access_token.assert_called_once_with(sub=1, token_version=3)
+    tokens_generator_mock.generate_refresh_token.assert_called_once_with(sub=1, token_version=3)
+
+
+@pytest.mark.asyncio
+async def test_login_user_normalized_email(
+    auth_service: AuthService,
+    users_repo_mock,
+):
+    users_repo_mock.get_by_email = AsyncMock(
+        return_value=User(
+            id=1,
+            email=MockData.EMAIL,
+            password_hash=MockData.HASHED_PASSWORD
+        )
+    )
+
+    await auth_service.login_user(
+        email=f" {MockData.EMAIL.upper()} ",
+        password=MockData.PASSWORD
+    )
+
+    users_repo_mock.get_by_email.assert_awaited_once_with(email=MockData.EMAIL)
+
         
 @pytest.mark.asyncio
 async def test_login_user_invalid_password(
@@ -118,6 +150,32 @@ async def test_login_user_invalid_password(
         )
         
     
+@pytest.mark.asyncio
+async def test_login_user_rehash_password(
+    auth_service: AuthService,
+    users_repo_mock,
+    password_manager_mock,
+):
+    users_repo_mock.get_by_email = AsyncMock(
+        return_value=User(
+            id=1,
+            email=MockData.EMAIL,
+            password_hash=MockData.HASHED_PASSWORD
+        )
+    )
+    password_manager_mock.needs_rehash = Mock(return_value=True)
+    
+    await auth_service.login_user(
+        email=MockData.EMAIL,
+        password=MockData.PASSWORD
+    )
+    
+    users_repo_mock.update_password_hash.assert_awaited_once_with(
+        user_id=1,
+        password_hash=MockData.HASHED_PASSWORD,
+    )
+        
+    
 @pytest.mark.asyncio
 async def test_login_user_not_found_user(
     auth_service: AuthService,
@@ -178,3 +236,98 @@ async def test_register_user_already_registred(
             email=MockData.EMAIL,
             password=MockData.PASSWORD
         )
+
+
+@pytest.mark.asyncio
+async def test_logout_user_without_jti(
+    auth_service: AuthService,
+    users_repo_mock,
+):
+    await auth_service.logout_user(
+        user_id=1,
+        jti=None,
+        expires_at=datetime.now(timezone.utc),
+    )
+    
+    users_repo_mock.revoke_token.assert_not_called()
+    users_repo_mock.delete_refresh_token.assert_awaited_once_with(user_id=1)
+
+
+@pytest.mark.asyncio
+async def test_revoke_sessions(
+    auth_service: AuthService,
+    users_repo_mock,
+):
+    auth_service.token_versions_cache = TokenVersionsCache()
+    users_repo_mock.increment_token_version = AsyncMock(return_value=2)
+    
+    token_version = await auth_service.revoke_sessions(user_id=1)
+    
+    assert token_version == 2
+    users_repo_mock.delete_refresh_token.assert_awaited_once_with(user_id=1)
+    assert await auth_service.token_versions_cache.get(1, auth_service.unit_of_work) == 2
+    users_repo_mock.get_token_version.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_revoke_sessions_user_not_found(
+    auth_service: AuthService,
+    users_repo_mock,
+):
+    users_repo_mock.increment_token_version = AsyncMock(side_effect=UserNotFoundDB)
+    
+    with pytest.raises(UserNotFound):
+        await auth_service.revoke_sessions(user_id=1)
+
+
+@pytest.mark.asyncio
+async def test_rotate_refresh_token_coalesced(
+    auth_service: AuthService,
+    users_repo_mock,
+):
+    auth_service.refresh_coalescer = RefreshCoalescer()
+    users_repo_mock.get_refresh_token = AsyncMock(return_value=MockData.REFRESH_TOKEN)
+    
+    results = await asyncio.gather(*(
+        auth_service.rotate_refresh_token(user_id=1, refresh_token=MockData.REFRESH_TOKEN)
+        for _ in range(3)
+    ))
+    
+    assert results == [TokensDTO(access_token=MockData.ACCESS_TOKEN, refresh_token=MockData.REFRESH_TOKEN)] * 3
+    users_repo_mock.get_refresh_token.assert_awaited_once_with(user_id=1)
+    users_repo_mock.update_refresh_token.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_rotate_refresh_token_reused(
+    auth_service: AuthService,
+    users_repo_mock,
+):
+    users_repo_mock.get_refresh_token = AsyncMock(return_value="new_refresh_token")
+    
+    with pytest.raises(RefreshTokenNotFound):
+        await auth_service.rotate_refresh_token(user_id=1, refresh_token=MockData.REFRESH_TOKEN)
+    users_repo_mock.update_refresh_token.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_login_user_audit(
+    auth_service: AuthService,
+    users_repo_mock,
+    password_manager_mock,
+):
+    auth_service.audit_log = AuditLog()
+    users_repo_mock.get_by_email = AsyncMock(
+        return_value=User(id=1, email=MockData.EMAIL, password_hash=MockData.HASHED_PASSWORD)
+    )
+    password_manager_mock.verify_password = Mock(side_effect=[False, True])
+    
+    with pytest.raises(InvalidPassword):
+        await auth_service.login_user(email=MockData.EMAIL, password=MockData.PASSWORD, client_ip="10.0.0.1")
+    await auth_service.login_user(email=MockData.EMAIL, password=MockData.PASSWORD, client_ip="10.0.0.1")
+    
+    audit_repo_mock = create_autospec(IAuditRepo, instance=True)
+    await auth_service.audit_log.flush(lambda: MockUnitOfWork(users_repo=users_repo_mock, audit_repo=audit_repo_mock))
+    events = audit_repo_mock.add_events.await_args.kwargs["events"]
+    assert [event.event_type for event in events] == [AuditEventTypes.LOGIN_FAILED, AuditEventTypes.LOGIN]
+    assert all(event.user_id == 1 and event.client_ip == "10.0.0.1" for event in events)
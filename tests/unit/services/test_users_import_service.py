@@ -0,0 +1,101 @@
+import pytest
+from unittest.mock import AsyncMock, Mock, create_autospec
+
+from src.domain.entities.users import User
+from src.domain.repositories.users.interface import IUsersRepo
+from src.services.users.dto import ImportReportDTO, ImportUserDTO
+from src.services.users.import_service import UsersImportService
+from src.infrastructure.tools.password_manager import PasswordManager
+from tests.helpers import MockUnitOfWork
+
+
+class MockData:
+    EMAIL:              str = "test@email.com"
+    PASSWORD:           str = "password"
+    HASHED_PASSWORD:    str = "hashed_password"
+    BCRYPT_HASH:        str = "$2b$12$" + "a" * 53
+
+
+async def as_stream(records):
+    for record in records:
+        yield record
+
+
+@pytest.fixture
+def users_repo_mock():
+    repo = create_autospec(IUsersRepo, instance=True)
+    repo.get_existing_emails = AsyncMock(return_value=set())
+    repo.add_users = AsyncMock(side_effect=lambda users: len(users))
+    return repo
+
+
+@pytest.fixture
+def users_import_service(users_repo_mock):
+    return UsersImportService(
+        unit_of_work=MockUnitOfWork(users_repo=users_repo_mock),
+        password_manager=Mock(
+            wraps=PasswordManager(),
+            hash_password=Mock(return_value=MockData.HASHED_PASSWORD),
+        ),
+        batch_size=2,
+    )
+
+
+@pytest.mark.asyncio
+async def test_import_users_success(
+    users_import_service: UsersImportService,
+    users_repo_mock,
+):
+    users_repo_mock.get_existing_emails = AsyncMock(return_value={"existing@email.com"})
+
+    report = await users_import_service.import_users(
+        records=as_stream([
+            ImportUserDTO(email=MockData.EMAIL, password=MockData.PASSWORD),
+            ImportUserDTO(email=f" {MockData.EMAIL.upper()}", password=MockData.PASSWORD),
+            ImportUserDTO(email="Existing@email.com", password=MockData.PASSWORD),
+            ImportUserDTO(email="hashed@email.com", password_hash=MockData.BCRYPT_HASH),
+            ImportUserDTO(email="invalid@email.com", password_hash=MockData.HASHED_PASSWORD),
+            None,
+        ])
+    )
+
+    assert report == ImportReportDTO(
+        processed=6,
+        imported=2,
+        duplicates=1,
+        existing=1,
+        invalid=2,
+    )
+    imported_users = [
+        user
+        for call in users_repo_mock.add_users.await_args_list
+        for user in call.kwargs["users"]
+    ]
+    assert imported_users == [
+        User(id=0, email=MockData.EMAIL, password_hash=MockData.HASHED_PASSWORD, email_normalized=MockData.EMAIL),
+        User(id=0, email="hashed@email.com", password_hash=MockData.BCRYPT_HASH, email_normalized="hashed@email.com"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_import_users_resume_from_checkpoint(
+    users_import_service: UsersImportService,
+    users_repo_mock,
+):
+    checkpoints = []
+
+    async def save_checkpoint(report: ImportReportDTO):
+        checkpoints.append(report)
+
+    report = await users_import_service.import_users(
+        records=as_stream([
+            ImportUserDTO(email=f"user{i}@email.com", password=MockData.PASSWORD)
+            for i in range(5)
+        ]),
+        report=ImportReportDTO(processed=2, imported=2),
+        on_checkpoint=save_checkpoint,
+    )
+
+    assert report == ImportReportDTO(processed=5, imported=5)
+    assert [checkpoint.processed for checkpoint in checkpoints] == [4, 5]
+    assert users_repo_mock.add_users.await_count == 2
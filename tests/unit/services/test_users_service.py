@@ -2,12 +2,12 @@ import pytest
 from unittest.mock import AsyncMock, create_autospec
 
 from src.services.exc import UserNotFound
-from src.services.users.dto import UserDTO
+from src.services.users.dto import UserDTO, UsersBatchDTO, UsersPageDTO
 from src.services.users.service import UsersService
 from src.domain.repositories.exc import UserNotFound as UserNotFoundDB
 from src.domain.entities.users import User
 from src.domain.repositories.users.interface import IUsersRepo
-from src.domain.uof.abstract import IUnitOfWork
+from tests.helpers import MockUnitOfWork
 
 
 class MockData:
@@ -17,27 +17,6 @@ class MockData:
     ID:                 int = 1
 
 
-class MockUnitOfWork(IUnitOfWork):
-    def __init__(
-        self,
-        users_repo,
-    ):
-        self._users = users_repo
-
-    @property
-    def users(self,):
-        return self._users
-    
-    async def commit(self,):
-        ...
-    
-    async def rollback(self,):
-        ...
-    
-    async def __aenter__(self,) -> "IUnitOfWork":
-        return self
-    
-
 @pytest.fixture
 def users_repo_mock():
     return create_autospec(IUsersRepo, instance=True)
@@ -87,3 +66,70 @@ async def test_get_user_not_found(
         await users_service.get_user(
             id=MockData.ID,
         )
+
+        
+@pytest.mark.asyncio
+async def test_list_users_has_next_page(
+    users_service: UsersService,
+    users_repo_mock,
+):
+    users_repo_mock.list_users = AsyncMock(
+        return_value=[
+            User(id=id, email=MockData.EMAIL, password_hash=MockData.HASHED_PASSWORD)
+            for id in (2, 3, 4)
+        ]
+    )
+    
+    users_page = await users_service.list_users(after_id=1, limit=2)
+    
+    users_repo_mock.list_users.assert_awaited_once_with(after_id=1, limit=3)
+    assert users_page == UsersPageDTO(
+        items=[
+            UserDTO(id=2, email=MockData.EMAIL),
+            UserDTO(id=3, email=MockData.EMAIL),
+        ],
+        next_after_id=3,
+    )
+    
+    
+@pytest.mark.asyncio
+async def test_list_users_last_page(
+    users_service: UsersService,
+    users_repo_mock,
+):
+    users_repo_mock.list_users = AsyncMock(
+        return_value=[
+            User(id=MockData.ID, email=MockData.EMAIL, password_hash=MockData.HASHED_PASSWORD)
+        ]
+    )
+    
+    users_page = await users_service.list_users(after_id=None, limit=2)
+    
+    assert users_page == UsersPageDTO(
+        items=[UserDTO(id=MockData.ID, email=MockData.EMAIL)],
+        next_after_id=None,
+    )
+
+    
+@pytest.mark.asyncio
+async def test_get_users(
+    users_service: UsersService,
+    users_repo_mock,
+):
+    users_repo_mock.get_many = AsyncMock(
+        return_value=[
+            User(id=id, email=MockData.EMAIL, password_hash=MockData.HASHED_PASSWORD)
+            for id in (3, 1)
+        ]
+    )
+    
+    users_batch = await users_service.get_users(ids=[1, 2, 3, 1])
+    
+    users_repo_mock.get_many.assert_awaited_once_with(ids=[1, 2, 3])
+    assert users_batch == UsersBatchDTO(
+        items={
+            "1": UserDTO(id=1, email=MockData.EMAIL),
+            "3": UserDTO(id=3, email=MockData.EMAIL),
+        },
+        not_found=[2],
+    )
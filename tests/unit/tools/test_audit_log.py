@@ -0,0 +1,106 @@
+import asyncio
+from datetime import datetime, timezone
+
+import pytest
+from unittest.mock import AsyncMock, create_autospec
+
+from src.domain.entities.audit import AuditEvent, AuditEventTypes
+from src.domain.repositories.audit.interface import IAuditRepo
+from src.domain.repositories.users.interface import IUsersRepo
+from src.infrastructure.tools.audit_log import AuditLog
+from tests.helpers import MockUnitOfWork
+
+
+def create_event(user_id: int) -> AuditEvent:
+    return AuditEvent(
+        event_type=AuditEventTypes.LOGIN,
+        created_at=datetime.now(timezone.utc),
+        user_id=user_id,
+    )
+
+
+@pytest.fixture
+def audit_repo_mock():
+    audit_repo = create_autospec(IAuditRepo, instance=True)
+    audit_repo.add_events = AsyncMock(side_effect=lambda events: len(events))
+    return audit_repo
+
+
+@pytest.fixture
+def unit_of_work_factory(audit_repo_mock):
+    return lambda: MockUnitOfWork(
+        users_repo=create_autospec(IUsersRepo, instance=True),
+        audit_repo=audit_repo_mock,
+    )
+
+
+def get_written_batches(audit_repo_mock) -> list[list[int]]:
+    return [
+        [event.user_id for event in call.kwargs["events"]]
+        for call in audit_repo_mock.add_events.await_args_list
+    ]
+
+
+@pytest.mark.asyncio
+async def test_flush_by_size(audit_repo_mock, unit_of_work_factory):
+    audit_log = AuditLog(batch_size=2, flush_interval_seconds=10)
+    for user_id in range(5):
+        audit_log.record(create_event(user_id))
+    
+    flush_task = asyncio.create_task(audit_log.run_flush_loop(unit_of_work_factory))
+    await asyncio.sleep(0.01)
+    
+    assert get_written_batches(audit_repo_mock) == [[0, 1], [2, 3]]
+    assert audit_log.written == 4
+    
+    flush_task.cancel()
+    await asyncio.gather(flush_task, return_exceptions=True)
+    await audit_log.flush(unit_of_work_factory)
+    
+    assert get_written_batches(audit_repo_mock)[-1] == [4]
+    assert audit_log.written == 5
+    assert len(audit_log) == 0
+
+
+@pytest.mark.asyncio
+async def test_flush_by_time(audit_repo_mock, unit_of_work_factory):
+    audit_log = AuditLog(batch_size=100, flush_interval_seconds=0.05)
+    flush_task = asyncio.create_task(audit_log.run_flush_loop(unit_of_work_factory))
+    
+    audit_log.record(create_event(1))
+    await asyncio.sleep(0.01)
+    audit_log.record(create_event(2))
+    await asyncio.sleep(0.01)
+    assert get_written_batches(audit_repo_mock) == []
+    
+    await asyncio.sleep(0.1)
+    assert get_written_batches(audit_repo_mock) == [[1, 2]]
+    
+    flush_task.cancel()
+    await asyncio.gather(flush_task, return_exceptions=True)
+
+
+@pytest.mark.asyncio
+async def test_full_queue_drops_events(audit_repo_mock, unit_of_work_factory):
+    audit_log = AuditLog(max_queue_size=2)
+    for user_id in range(5):
+        audit_log.record(create_event(user_id))
+    
+    await audit_log.flush(unit_of_work_factory)
+    
+    assert get_written_batches(audit_repo_mock) == [[0, 1]]
+    assert audit_log.dropped == 3
+    assert "audit_events_dropped_total 3" in audit_log.render()
+
+
+@pytest.mark.asyncio
+async def test_failed_write_drops_batch(audit_repo_mock, unit_of_work_factory):
+    audit_repo_mock.add_events = AsyncMock(side_effect=RuntimeError("database is down"))
+    audit_log = AuditLog()
+    audit_log.record(create_event(1))
+    
+    await audit_log.flush(unit_of_work_factory)
+    
+    assert audit_log.written == 0
+    assert audit_log.dropped == 1
+    assert len(audit_log) == 0
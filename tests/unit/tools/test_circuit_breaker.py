@@ -0,0 +1,69 @@
+import pytest
+
+from src.infrastructure.tools.circuit_breaker import CircuitBreaker, CircuitOpen, CircuitStates
+from tests.helpers import FakeClock
+
+
+@pytest.fixture
+def circuit_breaker(clock):
+    return CircuitBreaker(name="test", failure_threshold=3, reset_timeout_seconds=10, clock=clock)
+
+
+def fail(circuit_breaker: CircuitBreaker, times: int):
+    for _ in range(times):
+        circuit_breaker.before_call()
+        circuit_breaker.record_failure()
+
+
+def test_opens_after_consecutive_failures(circuit_breaker: CircuitBreaker, clock: FakeClock):
+    fail(circuit_breaker, 2)
+    circuit_breaker.before_call()
+    circuit_breaker.record_success()
+    fail(circuit_breaker, 2)
+    assert circuit_breaker.state == CircuitStates.CLOSED
+    
+    fail(circuit_breaker, 1)
+    assert circuit_breaker.state == CircuitStates.OPEN
+    
+    clock.now = 4
+    with pytest.raises(CircuitOpen) as ex:
+        circuit_breaker.before_call()
+    assert ex.value.retry_after == 6
+
+
+def test_single_probe_when_half_open(circuit_breaker: CircuitBreaker, clock: FakeClock):
+    fail(circuit_breaker, 3)
+    
+    clock.now = 10
+    circuit_breaker.before_call()
+    assert circuit_breaker.state == CircuitStates.HALF_OPEN
+    with pytest.raises(CircuitOpen):
+        circuit_breaker.before_call()
+    
+    circuit_breaker.record_success()
+    assert circuit_breaker.state == CircuitStates.CLOSED
+    circuit_breaker.before_call()
+
+
+def test_failed_probe_opens_again(circuit_breaker: CircuitBreaker, clock: FakeClock):
+    fail(circuit_breaker, 3)
+    
+    clock.now = 10
+    fail(circuit_breaker, 1)
+    assert circuit_breaker.state == CircuitStates.OPEN
+    
+    clock.now = 19
+    with pytest.raises(CircuitOpen):
+        circuit_breaker.before_call()
+    clock.now = 20
+    circuit_breaker.before_call()
+
+
+def test_cancelled_probe_lets_another_one(circuit_breaker: CircuitBreaker, clock: FakeClock):
+    fail(circuit_breaker, 3)
+    
+    clock.now = 10
+    circuit_breaker.before_call()
+    circuit_breaker.record_cancel()
+    circuit_breaker.before_call()
+    assert circuit_breaker.state == CircuitStates.HALF_OPEN
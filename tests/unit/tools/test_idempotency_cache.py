@@ -0,0 +1,67 @@
+import asyncio
+
+import pytest
+
+from src.infrastructure.tools.idempotency_cache import IdempotencyCache, IdempotencyKeyReused
+from tests.helpers import FakeClock
+
+
+@pytest.fixture
+def idempotency_cache(clock):
+    return IdempotencyCache(ttl_seconds=60, clock=clock)
+
+
+def create_response(idempotency_cache: IdempotencyCache, key: str = "key", fingerprint: str = "fingerprint"):
+    return idempotency_cache.create_response(
+        key=key,
+        fingerprint=fingerprint,
+        status_code=200,
+        content_type="application/json",
+        body=b'{"id":1}',
+    )
+
+
+@pytest.mark.asyncio
+async def test_duplicates_wait_for_the_original(idempotency_cache: IdempotencyCache):
+    assert await idempotency_cache.acquire("key", "fingerprint") is None
+    
+    duplicates = [asyncio.create_task(idempotency_cache.acquire("key", "fingerprint")) for _ in range(3)]
+    await asyncio.sleep(0)
+    assert not any(duplicate.done() for duplicate in duplicates)
+    
+    response = create_response(idempotency_cache)
+    await idempotency_cache.release("key", response)
+    
+    assert await asyncio.gather(*duplicates) == [response] * 3
+
+
+@pytest.mark.asyncio
+async def test_failed_request_is_run_by_a_duplicate(idempotency_cache: IdempotencyCache):
+    assert await idempotency_cache.acquire("key", "fingerprint") is None
+    duplicate = asyncio.create_task(idempotency_cache.acquire("key", "fingerprint"))
+    await asyncio.sleep(0)
+    
+    await idempotency_cache.release("key", None)
+    
+    assert await duplicate is None
+    await idempotency_cache.release("key", create_response(idempotency_cache))
+
+
+@pytest.mark.asyncio
+async def test_key_reused_with_another_request(idempotency_cache: IdempotencyCache):
+    await idempotency_cache.acquire("key", "fingerprint")
+    await idempotency_cache.release("key", create_response(idempotency_cache))
+    
+    with pytest.raises(IdempotencyKeyReused):
+        await idempotency_cache.acquire("key", "other-fingerprint")
+
+
+@pytest.mark.asyncio
+async def test_response_expires(idempotency_cache: IdempotencyCache, clock: FakeClock):
+    await idempotency_cache.acquire("key", "fingerprint")
+    await idempotency_cache.release("key", create_response(idempotency_cache))
+    
+    clock.now = 59.9
+    assert await idempotency_cache.acquire("key", "fingerprint") is not None
+    clock.now = 60
+    assert await idempotency_cache.acquire("key", "fingerprint") is None
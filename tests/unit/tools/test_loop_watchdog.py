@@ -0,0 +1,56 @@
+import time
+import asyncio
+
+import pytest
+import pytest_asyncio
+
+from src.infrastructure.tools.loop_watchdog import LoopWatchdog
+
+
+def block_loop(seconds: float):
+    time.sleep(seconds)
+
+
+@pytest_asyncio.fixture
+async def loop_watchdog():
+    loop_watchdog = LoopWatchdog(threshold_seconds=0.05, interval_seconds=0.005)
+    loop_watchdog.start()
+    yield loop_watchdog
+    loop_watchdog.stop()
+
+
+@pytest.mark.asyncio
+async def test_stall_is_attributed_to_route(loop_watchdog: LoopWatchdog):
+    with loop_watchdog.track_task(lambda: "/api/v1/auth/login"):
+        block_loop(0.2)
+    await asyncio.sleep(0.05)
+    
+    stalls = loop_watchdog.routes["/api/v1/auth/login"]
+    assert stalls.count == 1
+    assert stalls.max_seconds >= 0.15
+    
+    offender, = loop_watchdog.worst_offenders()
+    assert offender.route == "/api/v1/auth/login"
+    assert "in block_loop" in offender.stack[-1]
+    assert 'event_loop_stalls_total{route="/api/v1/auth/login"} 1' in loop_watchdog.render()
+
+
+@pytest.mark.asyncio
+async def test_same_stack_is_counted_once(loop_watchdog: LoopWatchdog):
+    for _ in range(2):
+        with loop_watchdog.track_task(lambda: "/api/v1/auth/register"):
+            block_loop(0.1)
+        await asyncio.sleep(0.05)
+    
+    offender, = loop_watchdog.worst_offenders()
+    assert offender.count == 2
+    assert loop_watchdog.routes["/api/v1/auth/register"].count == 2
+
+
+@pytest.mark.asyncio
+async def test_awaiting_is_not_a_stall(loop_watchdog: LoopWatchdog):
+    with loop_watchdog.track_task(lambda: "/api/v1/users/me"):
+        await asyncio.sleep(0.2)
+    
+    assert loop_watchdog.routes == {}
+    assert loop_watchdog.worst_offenders() == []
@@ -0,0 +1,58 @@
+import pytest
+
+from src.infrastructure.tools.password_manager import PasswordManager
+
+
+class MockData:
+    PASSWORD:       str = "password"
+    WRONG_PASSWORD: str = "wrong_password"
+
+
+@pytest.fixture
+def bcrypt_password_manager():
+    return PasswordManager(rounds=4)
+
+
+@pytest.fixture
+def scrypt_password_manager():
+    return PasswordManager(rounds=4, scheme="scrypt", scrypt_n=2 ** 10, scrypt_r=8, scrypt_p=1)
+
+
+def test_scrypt_hash_and_verify(scrypt_password_manager: PasswordManager):
+    password_hash = scrypt_password_manager.hash_password(MockData.PASSWORD)
+    
+    assert password_hash.startswith("$scrypt$ln=10,r=8,p=1$")
+    assert scrypt_password_manager.verify_password(MockData.PASSWORD, password_hash)
+    assert not scrypt_password_manager.verify_password(MockData.WRONG_PASSWORD, password_hash)
+    assert not scrypt_password_manager.needs_rehash(password_hash)
+
+
+def test_verify_mixed_hash_formats(
+    bcrypt_password_manager: PasswordManager,
+    scrypt_password_manager: PasswordManager,
+):
+    bcrypt_hash = bcrypt_password_manager.hash_password(MockData.PASSWORD)
+    
+    assert scrypt_password_manager.verify_password(MockData.PASSWORD, bcrypt_hash)
+    assert scrypt_password_manager.needs_rehash(bcrypt_hash)
+    assert not scrypt_password_manager.verify_password(MockData.PASSWORD, "unknown_format")
+    
+    
+def test_needs_rehash_on_changed_params(bcrypt_password_manager: PasswordManager):
+    password_hash = bcrypt_password_manager.hash_password(MockData.PASSWORD)
+    
+    assert not bcrypt_password_manager.needs_rehash(password_hash)
+    assert PasswordManager(rounds=5).needs_rehash(password_hash)
+
+
+@pytest.mark.parametrize("password_hash", [
+    "$scrypt$",
+    "$scrypt$ln=10,r=8$c2FsdA$a2V5",
+    "$scrypt$ln=10,r=8,p=1$c2FsdA",
+    "$scrypt$ln=ten,r=8,p=1$c2FsdA$a2V5",
+    "$scrypt$ln=10,r=8,p=1$!$a2V5",
+    "$scrypt$ln=10,r=0,p=1$c2FsdA$a2V5",
+])
+def test_malformed_scrypt_hash(scrypt_password_manager: PasswordManager, password_hash: str):
+    assert not scrypt_password_manager.verify_password(MockData.PASSWORD, password_hash)
+    assert scrypt_password_manager.needs_rehash(password_hash)
@@ -0,0 +1,50 @@
+import pytest
+from fastapi import HTTPException
+
+from src.infrastructure.api.dependencies import check_rate_limits
+from src.infrastructure.tools.rate_limiter import RateLimitExceeded, TokenBucketRateLimiter
+
+
+def test_acquire_exceeded(clock):
+    rate_limiter = TokenBucketRateLimiter(capacity=2, refill_per_second=1, clock=clock)
+    
+    rate_limiter.acquire("key")
+    rate_limiter.acquire("key")
+    with pytest.raises(RateLimitExceeded) as ex:
+        rate_limiter.acquire("key")
+    
+    assert ex.value.retry_after == pytest.approx(1)
+    rate_limiter.acquire("other_key")
+    
+    
+def test_acquire_after_refill(clock):
+    rate_limiter = TokenBucketRateLimiter(capacity=1, refill_per_second=0.5, clock=clock)
+    
+    rate_limiter.acquire("key")
+    clock.now = 2
+    rate_limiter.acquire("key")
+    
+    
+def test_idle_keys_evicted(clock):
+    rate_limiter = TokenBucketRateLimiter(capacity=2, refill_per_second=1, max_keys=2, clock=clock)
+    
+    rate_limiter.acquire("first")
+    rate_limiter.acquire("second")
+    rate_limiter.acquire("third")
+    assert len(rate_limiter) == 2
+    
+    clock.now = 10
+    rate_limiter.acquire("fourth")
+    assert len(rate_limiter) == 1
+    
+    
+def test_rejected_request_takes_no_tokens(clock):
+    ip_rate_limiter = TokenBucketRateLimiter(capacity=2, refill_per_second=1, clock=clock)
+    email_rate_limiter = TokenBucketRateLimiter(capacity=1, refill_per_second=1, name="email", clock=clock)
+    check_rate_limits((ip_rate_limiter, "ip"), (email_rate_limiter, "email"))
+    
+    with pytest.raises(HTTPException) as ex:
+        check_rate_limits((ip_rate_limiter, "ip"), (email_rate_limiter, "email"))
+    
+    assert ex.value.status_code == 429
+    ip_rate_limiter.acquire("ip")
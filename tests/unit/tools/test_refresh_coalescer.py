@@ -0,0 +1,95 @@
+import asyncio
+
+import pytest
+
+from src.services.auth.dto import TokensDTO
+from src.infrastructure.tools.refresh_coalescer import RefreshCoalescer
+from tests.helpers import FakeClock
+
+
+class FakeRotation:
+    def __init__(self, delay: float = 0, error: Exception | None = None):
+        self.delay = delay
+        self.error = error
+        self.calls = 0
+    
+    async def __call__(self) -> TokensDTO:
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return TokensDTO(access_token=f"access-{self.calls}", refresh_token=f"refresh-{self.calls}")
+
+
+@pytest.fixture
+def refresh_coalescer(clock):
+    return RefreshCoalescer(grace_seconds=5, clock=clock)
+
+
+@pytest.mark.asyncio
+async def test_parallel_duplicates_share_one_rotation(refresh_coalescer: RefreshCoalescer):
+    rotation = FakeRotation(delay=0.01)
+    
+    results = await asyncio.gather(*(
+        refresh_coalescer.rotate(user_id=1, refresh_token="token", rotate=rotation)
+        for _ in range(5)
+    ))
+    
+    assert rotation.calls == 1
+    assert all(tokens == results[0] for tokens in results)
+
+
+@pytest.mark.asyncio
+async def test_repeat_within_grace_window(refresh_coalescer: RefreshCoalescer, clock: FakeClock):
+    rotation = FakeRotation()
+    tokens = await refresh_coalescer.rotate(user_id=1, refresh_token="token", rotate=rotation)
+    
+    clock.now = 4.9
+    assert await refresh_coalescer.rotate(user_id=1, refresh_token="token", rotate=rotation) == tokens
+    assert rotation.calls == 1
+    
+    clock.now = 5
+    assert await refresh_coalescer.rotate(user_id=1, refresh_token="token", rotate=rotation) != tokens
+    assert rotation.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_failed_rotation_is_not_cached(refresh_coalescer: RefreshCoalescer):
+    rotation = FakeRotation(delay=0.01, error=RuntimeError("failed"))
+    
+    results = await asyncio.gather(
+        refresh_coalescer.rotate(user_id=1, refresh_token="token", rotate=rotation),
+        refresh_coalescer.rotate(user_id=1, refresh_token="token", rotate=rotation),
+        return_exceptions=True,
+    )
+    
+    assert rotation.calls == 1
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert len(refresh_coalescer) == 0
+
+
+@pytest.mark.asyncio
+async def test_cancelled_request_does_not_cancel_rotation(refresh_coalescer: RefreshCoalescer):
+    rotation = FakeRotation(delay=0.02)
+    first = asyncio.create_task(refresh_coalescer.rotate(user_id=1, refresh_token="token", rotate=rotation))
+    await asyncio.sleep(0)
+    second = asyncio.create_task(refresh_coalescer.rotate(user_id=1, refresh_token="token", rotate=rotation))
+    await asyncio.sleep(0)
+    
+    first.cancel()
+    
+    assert (await second).refresh_token == "refresh-1"
+    assert rotation.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_discard_user(refresh_coalescer: RefreshCoalescer):
+    rotation = FakeRotation()
+    await refresh_coalescer.rotate(user_id=1, refresh_token="token-1", rotate=rotation)
+    await refresh_coalescer.rotate(user_id=2, refresh_token="token-2", rotate=rotation)
+    
+    refresh_coalescer.discard_user(1)
+    
+    assert len(refresh_coalescer) == 1
+    await refresh_coalescer.rotate(user_id=1, refresh_token="token-1", rotate=rotation)
+    assert rotation.calls == 3
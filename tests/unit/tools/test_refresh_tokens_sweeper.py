@@ -0,0 +1,26 @@
+import pytest
+from unittest.mock import AsyncMock, create_autospec
+
+from src.domain.repositories.users.interface import IUsersRepo
+from src.infrastructure.tools.refresh_tokens_sweeper import RefreshTokensSweeper
+from tests.helpers import MockUnitOfWork
+
+
+@pytest.fixture
+def users_repo_mock():
+    return create_autospec(IUsersRepo, instance=True)
+
+
+@pytest.mark.asyncio
+async def test_sweep_deletes_by_batches(users_repo_mock):
+    users_repo_mock.delete_expired_refresh_tokens = AsyncMock(side_effect=[2, 2, 1])
+    refresh_tokens_sweeper = RefreshTokensSweeper(batch_size=2, batch_pause_seconds=0)
+    
+    deleted_count = await refresh_tokens_sweeper.sweep(
+        unit_of_work_factory=lambda: MockUnitOfWork(users_repo=users_repo_mock)
+    )
+    
+    assert deleted_count == 5
+    assert users_repo_mock.delete_expired_refresh_tokens.await_count == 3
+    for call in users_repo_mock.delete_expired_refresh_tokens.await_args_list:
+        assert call.kwargs["limit"] == 2
@@ -0,0 +1,60 @@
+import pytest
+from unittest.mock import AsyncMock, create_autospec
+
+from src.domain.repositories.users.interface import IUsersRepo
+from src.infrastructure.tools.registered_emails import RegisteredEmailsFilter
+from tests.helpers import MockUnitOfWork
+
+
+async def stream_emails(emails: list[str]):
+    for email in emails:
+        yield email
+
+
+@pytest.fixture
+def users_repo_mock():
+    users_repo_mock = create_autospec(IUsersRepo, instance=True)
+    users_repo_mock.count_users = AsyncMock(return_value=2)
+    users_repo_mock.stream_emails = lambda batch_size: stream_emails(["a@example.com", "b@example.com"])
+    users_repo_mock.get_existing_emails = AsyncMock(return_value={"a@example.com"})
+    return users_repo_mock
+
+
+@pytest.fixture
+def unit_of_work(users_repo_mock):
+    return MockUnitOfWork(users_repo=users_repo_mock)
+
+
+@pytest.mark.asyncio
+async def test_checks_database_until_loaded(unit_of_work, users_repo_mock):
+    registered_emails = RegisteredEmailsFilter(capacity=100)
+    
+    assert await registered_emails.is_registered("free@example.com", unit_of_work)
+    users_repo_mock.get_existing_emails.assert_awaited_once_with(emails=["free@example.com"])
+
+
+@pytest.mark.asyncio
+async def test_free_email_skips_database(unit_of_work, users_repo_mock):
+    registered_emails = RegisteredEmailsFilter(capacity=100)
+    await registered_emails.load(unit_of_work)
+    
+    assert not await registered_emails.is_registered("free@example.com", unit_of_work)
+    users_repo_mock.get_existing_emails.assert_not_called()
+    
+    assert await registered_emails.is_registered("a@example.com", unit_of_work)
+    users_repo_mock.get_existing_emails.assert_awaited_once_with(emails=["a@example.com"])
+
+
+@pytest.mark.asyncio
+async def test_added_while_loading_are_kept(unit_of_work, users_repo_mock):
+    registered_emails = RegisteredEmailsFilter(capacity=100)
+    
+    async def stream_and_register(batch_size: int):
+        registered_emails.add("new@example.com")
+        async for email in stream_emails(["a@example.com"]):
+            yield email
+    
+    users_repo_mock.stream_emails = stream_and_register
+    await registered_emails.load(unit_of_work)
+    
+    assert await registered_emails.is_registered("new@example.com", unit_of_work)
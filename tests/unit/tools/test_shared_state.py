@@ -0,0 +1,120 @@
+import struct
+import multiprocessing
+
+import pytest
+
+from src.infrastructure.tools.shared_state import SharedStateStore
+from src.infrastructure.tools.rate_limiter import TOKEN_BUCKET_STRUCT, RateLimitExceeded, TokenBucketRateLimiter
+from tests.helpers import FakeClock
+
+
+COUNTER_STRUCT = struct.Struct("<q")
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "shared-state")
+
+
+@pytest.fixture
+def store(path, clock):
+    store = SharedStateStore(path=path, slots=64, stripes=4, clock=clock)
+    store.open()
+    yield store
+    store.close()
+
+
+def increment(path: str, key: str, count: int):
+    store = SharedStateStore(path=path, slots=64, stripes=4)
+    counters = store.view("counter:", COUNTER_STRUCT)
+    for _ in range(count):
+        counters.update(key, lambda value: (((value[0] if value else 0) + 1,), 60))
+    store.close()
+
+
+def test_set_get_expire(store: SharedStateStore, clock: FakeClock):
+    store.set("key", b"value", ttl_seconds=10)
+    
+    assert store.get("key").rstrip(b"\x00") == b"value"
+    assert store.get("other_key") is None
+    
+    clock.now = 10
+    assert store.get("key") is None
+
+
+def test_delete(store: SharedStateStore):
+    store.set("key", b"value", ttl_seconds=10)
+    store.delete("key")
+    
+    assert store.get("key") is None
+
+
+def test_full_window_evicts_first_expiring(path, clock):
+    store = SharedStateStore(path=path, slots=4, stripes=1, probe_length=4, clock=clock)
+    for number in range(4):
+        store.set(f"key-{number}", b"value", ttl_seconds=10 + number)
+    
+    store.set("new_key", b"value", ttl_seconds=10)
+    
+    assert store.get("key-0") is None
+    assert all(store.get(f"key-{number}") is not None for number in range(1, 4))
+    assert store.get("new_key") is not None
+    store.close()
+
+
+def test_typed_view(store: SharedStateStore):
+    first = store.view("first:", COUNTER_STRUCT)
+    second = store.view("second:", COUNTER_STRUCT)
+    
+    first.set("key", (1,), ttl_seconds=10)
+    
+    assert first.get("key") == (1,)
+    assert second.get("key") is None
+    with pytest.raises(ValueError):
+        store.view("large:", struct.Struct("<qqq"))
+
+
+def test_other_layout_rejected(path, store: SharedStateStore):
+    # NOTE: The file is opened on `open` or first use, not when created,
+    # so it can still be removed by the supervisor.
+    other_store = SharedStateStore(path=path, slots=128, stripes=4)
+    with pytest.raises(ValueError):
+        other_store.open()
+    
+    SharedStateStore.remove(path)
+    other_store.set("key", b"value", ttl_seconds=10)
+    assert other_store.get("key") == b"value".ljust(16, b"\x00")
+    other_store.close()
+
+
+def test_updates_from_processes(path, store: SharedStateStore):
+    context = multiprocessing.get_context("spawn")
+    processes = [context.Process(target=increment, args=(path, "key", 200)) for _ in range(4)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    
+    assert store.view("counter:", COUNTER_STRUCT).get("key") == (800,)
+
+
+def test_shared_rate_limiter(store: SharedStateStore, clock: FakeClock):
+    # NOTE: Two limiters over one view act as two workers of a host.
+    rate_limiters = [
+        TokenBucketRateLimiter(
+            capacity=2,
+            refill_per_second=1,
+            clock=clock,
+            shared_state=store.view("login_ip:", TOKEN_BUCKET_STRUCT),
+        )
+        for _ in range(2)
+    ]
+    
+    rate_limiters[0].acquire("key")
+    rate_limiters[1].acquire("key")
+    with pytest.raises(RateLimitExceeded) as ex:
+        rate_limiters[0].acquire("key")
+    
+    assert ex.value.retry_after == pytest.approx(1)
+    clock.now = 1
+    rate_limiters[1].acquire("key")
@@ -0,0 +1,91 @@
+import pytest
+from unittest.mock import AsyncMock, create_autospec
+
+from src.domain.repositories.exc import UserNotFound
+from src.domain.repositories.users.interface import IUsersRepo
+from src.infrastructure.tools.tokens_tools import InvalidToken, TokenRevoked
+from src.infrastructure.tools.token_versions_cache import TokenVersionsCache
+from tests.helpers import MockUnitOfWork
+
+
+@pytest.fixture
+def users_repo_mock():
+    repo = create_autospec(IUsersRepo, instance=True)
+    repo.get_token_version = AsyncMock(return_value=1)
+    return repo
+
+
+@pytest.fixture
+def unit_of_work(users_repo_mock):
+    return MockUnitOfWork(users_repo=users_repo_mock)
+
+
+@pytest.mark.asyncio
+async def test_check_uses_cache_until_ttl(
+    clock,
+    unit_of_work,
+    users_repo_mock,
+):
+    token_versions_cache = TokenVersionsCache(ttl_seconds=10, clock=clock)
+    
+    await token_versions_cache.check({"sub": "1", "ver": 1}, unit_of_work)
+    await token_versions_cache.check({"sub": "1", "ver": 1}, unit_of_work)
+    assert users_repo_mock.get_token_version.await_count == 1
+    
+    clock.now = 11
+    await token_versions_cache.check({"sub": "1", "ver": 1}, unit_of_work)
+    assert users_repo_mock.get_token_version.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_check_outdated_token_version(
+    clock,
+    unit_of_work,
+):
+    token_versions_cache = TokenVersionsCache(ttl_seconds=10, clock=clock)
+    
+    with pytest.raises(TokenRevoked):
+        await token_versions_cache.check({"sub": "1"}, unit_of_work)
+    
+    token_versions_cache.handle_notification("1:2")
+    with pytest.raises(TokenRevoked):
+        await token_versions_cache.check({"sub": "1", "ver": 1}, unit_of_work)
+    
+    token_versions_cache.set(1, 1)
+    await token_versions_cache.check({"sub": "1", "ver": 2}, unit_of_work)
+
+
+@pytest.mark.asyncio
+async def test_check_newer_token_version_refreshes_cache(
+    clock,
+    unit_of_work,
+    users_repo_mock,
+):
+    token_versions_cache = TokenVersionsCache(ttl_seconds=10, clock=clock)
+    
+    await token_versions_cache.check({"sub": "1", "ver": 3}, unit_of_work)
+    
+    with pytest.raises(TokenRevoked):
+        await token_versions_cache.check({"sub": "1", "ver": 1}, unit_of_work)
+    assert users_repo_mock.get_token_version.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_check_deleted_user(
+    unit_of_work,
+    users_repo_mock,
+):
+    users_repo_mock.get_token_version = AsyncMock(side_effect=UserNotFound)
+    
+    with pytest.raises(InvalidToken):
+        await TokenVersionsCache().check({"sub": "1", "ver": 0}, unit_of_work)
+
+
+def test_max_size():
+    token_versions_cache = TokenVersionsCache(max_size=2)
+    
+    for user_id in range(3):
+        token_versions_cache.set(user_id, 0)
+    token_versions_cache.handle_notification("invalid")
+    
+    assert len(token_versions_cache) == 2
@@ -0,0 +1,69 @@
+import pytest
+from unittest.mock import AsyncMock, create_autospec
+
+from src.domain.repositories.users.interface import IUsersRepo
+from src.infrastructure.tools.bloom_filter import BloomFilter
+from src.infrastructure.tools.tokens_denylist import TokensDenylist
+from tests.helpers import MockUnitOfWork
+
+
+@pytest.fixture
+def users_repo_mock():
+    return create_autospec(IUsersRepo, instance=True)
+
+
+@pytest.fixture
+def unit_of_work(users_repo_mock):
+    return MockUnitOfWork(users_repo=users_repo_mock)
+
+
+def test_bloom_filter_has_no_false_negatives():
+    items = [f"jti-{i}" for i in range(1000)]
+    bloom_filter = BloomFilter.from_items(items, capacity=1000, error_rate=0.01)
+    
+    assert all(item in bloom_filter for item in items)
+    false_positives = sum(f"other-{i}" in bloom_filter for i in range(10000))
+    assert false_positives < 300
+
+
+@pytest.mark.asyncio
+async def test_is_revoked_skips_database_for_unknown_token(
+    unit_of_work,
+    users_repo_mock,
+):
+    users_repo_mock.delete_expired_revoked_tokens = AsyncMock(return_value=0)
+    users_repo_mock.get_revoked_tokens = AsyncMock(return_value=[])
+    tokens_denylist = TokensDenylist()
+    await tokens_denylist.sync(unit_of_work)
+    
+    assert not await tokens_denylist.is_revoked("jti", unit_of_work)
+    users_repo_mock.is_token_revoked.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_is_revoked_checks_database_before_first_sync(
+    unit_of_work,
+    users_repo_mock,
+):
+    users_repo_mock.is_token_revoked = AsyncMock(return_value=True)
+    tokens_denylist = TokensDenylist()
+    
+    assert not tokens_denylist.ready
+    assert await tokens_denylist.is_revoked("jti", unit_of_work)
+    users_repo_mock.is_token_revoked.assert_awaited_once_with(jti="jti")
+
+
+@pytest.mark.asyncio
+async def test_is_revoked_after_sync(
+    unit_of_work,
+    users_repo_mock,
+):
+    users_repo_mock.delete_expired_revoked_tokens = AsyncMock(return_value=0)
+    users_repo_mock.get_revoked_tokens = AsyncMock(return_value=["jti"])
+    users_repo_mock.is_token_revoked = AsyncMock(return_value=True)
+    tokens_denylist = TokensDenylist()
+    
+    await tokens_denylist.sync(unit_of_work)
+    
+    assert await tokens_denylist.is_revoked("jti", unit_of_work)
+    users_repo_mock.is_token_revoked.assert_awaited_once_with(jti="jti")
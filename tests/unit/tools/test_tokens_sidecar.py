@@ -0,0 +1,94 @@
+import asyncio
+import json
+
+import pytest
+from unittest.mock import AsyncMock, create_autospec
+
+from src.domain.repositories.users.interface import IUsersRepo
+from src.infrastructure.tools.tokens_denylist import TokensDenylist
+from src.infrastructure.tools.tokens_sidecar import SidecarStatuses, TokensSidecarServer, encode_frame, read_frame
+from src.infrastructure.tools.tokens_tools import JWTTokensGenerator, JWTTokensValidator
+from tests.helpers import MockUnitOfWork
+
+
+class MockData:
+    SECRET_KEY: str = "secret"
+    USER_ID:    int = 1
+
+
+@pytest.fixture
+def tokens_generator():
+    return JWTTokensGenerator(
+        secret_key=MockData.SECRET_KEY,
+        access_token_exp_minutes=1,
+        refresh_token_exp_minutes=5,
+    )
+
+
+@pytest.fixture
+def users_repo_mock():
+    repo = create_autospec(IUsersRepo, instance=True)
+    repo.is_token_revoked = AsyncMock(return_value=True)
+    repo.delete_expired_revoked_tokens = AsyncMock(return_value=0)
+    repo.get_revoked_tokens = AsyncMock(return_value=[])
+    return repo
+
+
+@pytest.fixture
+def sidecar(users_repo_mock):
+    return TokensSidecarServer(
+        tokens_validator=JWTTokensValidator(secret_key=MockData.SECRET_KEY),
+        tokens_denylist=TokensDenylist(),
+        unit_of_work_factory=lambda: MockUnitOfWork(users_repo=users_repo_mock),
+        max_token_size=1024,
+    )
+
+
+@pytest.mark.asyncio
+async def test_pipelined_requests(
+    sidecar: TokensSidecarServer,
+    tokens_generator: JWTTokensGenerator,
+    tmp_path,
+):
+    socket_path = str(tmp_path / "sidecar.sock")
+    server_task = asyncio.create_task(sidecar.serve(socket_path=socket_path))
+    while not (tmp_path / "sidecar.sock").exists():
+        await asyncio.sleep(0.01)
+
+    revoked_token = tokens_generator.generate_access_token(sub=MockData.USER_ID)
+    revoked_jti = sidecar.tokens_validator.decode_token(revoked_token)["jti"]
+    await sidecar.tokens_denylist.sync(sidecar.unit_of_work_factory())
+    sidecar.tokens_denylist.add(revoked_jti)
+
+    reader, writer = await asyncio.open_unix_connection(socket_path)
+    writer.write(b"".join(
+        encode_frame(token.encode())
+        for token in [
+            tokens_generator.generate_access_token(sub=MockData.USER_ID),
+            tokens_generator.generate_refresh_token(sub=MockData.USER_ID),
+            revoked_token,
+            "invalid",
+        ]
+    ))
+    await writer.drain()
+    responses = [await read_frame(reader, max_size=1024) for _ in range(4)]
+
+    assert responses[0][0] == SidecarStatuses.OK
+    claims = json.loads(responses[0][1:])
+    assert claims["sub"] == str(MockData.USER_ID)
+    assert claims["token_type"] == "access"
+    assert [response[0] for response in responses[1:]] == [
+        SidecarStatuses.INVALID_TOKEN,
+        SidecarStatuses.TOKEN_REVOKED,
+        SidecarStatuses.INVALID_TOKEN,
+    ]
+
+    writer.write(encode_frame(b"x" * 2048))
+    assert await read_frame(reader, max_size=1024) == bytes((SidecarStatuses.BAD_REQUEST,))
+    assert await read_frame(reader, max_size=1024) is None
+
+    writer.close()
+    server_task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await server_task
+    assert not (tmp_path / "sidecar.sock").exists()
@@ -0,0 +1,76 @@
+import jwt
+import pytest
+
+from src.infrastructure.tools.tokens_tools import (
+    InvalidToken,
+    JWTTokensGenerator,
+    JWTTokensValidator,
+    TokensProfiles,
+)
+
+
+class MockData:
+    SECRET_KEY: str = "secret"
+    USER_ID:    int = 1
+
+
+def get_tokens_generator(profile: TokensProfiles, type_in_header: bool = False) -> JWTTokensGenerator:
+    return JWTTokensGenerator(
+        secret_key=MockData.SECRET_KEY,
+        access_token_exp_minutes=1,
+        refresh_token_exp_minutes=5,
+        profile=profile,
+        type_in_header=type_in_header,
+    )
+
+
+@pytest.fixture
+def tokens_validator():
+    return JWTTokensValidator(secret_key=MockData.SECRET_KEY)
+
+
+@pytest.mark.parametrize(
+    "tokens_generator",
+    [
+        get_tokens_generator(TokensProfiles.DEFAULT),
+        get_tokens_generator(TokensProfiles.COMPACT),
+        get_tokens_generator(TokensProfiles.COMPACT, type_in_header=True),
+    ],
+)
+def test_validate_tokens_profiles(
+    tokens_validator: JWTTokensValidator,
+    tokens_generator: JWTTokensGenerator,
+):
+    access_payload = tokens_validator.validate_access_token(
+        tokens_generator.generate_access_token(sub=MockData.USER_ID, token_version=2)
+    )
+    refresh_payload = tokens_validator.validate_refresh_token(
+        tokens_generator.generate_refresh_token(sub=MockData.USER_ID)
+    )
+    
+    assert access_payload["sub"] == refresh_payload["sub"] == str(MockData.USER_ID)
+    assert access_payload["token_type"] == "access"
+    assert refresh_payload["token_type"] == "refresh"
+    assert access_payload["jti"] != refresh_payload["jti"]
+    assert access_payload["ver"] == 2
+    assert refresh_payload["ver"] == 0
+    assert isinstance(access_payload["exp"], int)
+    
+    with pytest.raises(InvalidToken):
+        tokens_validator.validate_refresh_token(
+            tokens_generator.generate_access_token(sub=MockData.USER_ID)
+        )
+
+
+def test_compact_token_is_smaller():
+    default_token = get_tokens_generator(TokensProfiles.DEFAULT).generate_access_token(sub=MockData.USER_ID)
+    compact_token = get_tokens_generator(TokensProfiles.COMPACT).generate_access_token(sub=MockData.USER_ID)
+    
+    assert len(compact_token) < len(default_token)
+
+
+def test_compact_token_without_type(tokens_validator: JWTTokensValidator):
+    token = jwt.encode({"u": MockData.USER_ID, "jti": "jti", "exp": 2 ** 32}, MockData.SECRET_KEY)
+    
+    with pytest.raises(InvalidToken):
+        tokens_validator.validate_access_token(token)